@@ -0,0 +1,168 @@
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.corpus import load_kjv_json
+from common.verse_codec import BOOKS, BOOK_ORDINAL, canonical_book, parse_reference, split_verse_id
+from split_translations import BIBLES_DIR
+
+# ---------------------------------------------
+# Settings
+# ---------------------------------------------
+OUT_DIR = "parallel"
+CHAPTER_SLOTS = len(BOOKS) << 8  # (ordinal - 1) << 8 | chapter
+
+# ---------------------------------------------
+# Verse-aligned columns
+# ---------------------------------------------
+def translation_verses(bible):
+    """{(ordinal, chapter): {verse: text}} of a translation under canonical book ordinals."""
+    aligned = {}
+    for book, chapters in bible.items():
+        canonical = canonical_book(book)
+        if canonical is None:
+            print(f"[WARN] unknown book '{book}', left out")
+            continue
+        for chapter_num, verses in chapters.items():
+            if isinstance(verses, dict):
+                aligned[(BOOK_ORDINAL[canonical], int(chapter_num))] = {int(v): t for v, t in verses.items()}
+    return aligned
+
+def row_layout(columns):
+    """
+    Rows of the store: every chapter found in any translation, in
+    canonical order, with one row per verse number up to the largest one
+    any translation has. Returns ([(ordinal, chapter, first_row, count)], rows).
+    """
+    chapters = sorted({key for col in columns.values() for key in col})
+    layout, row = [], 0
+    for key in chapters:
+        count = max(max(col[key], default=0) for col in columns.values() if key in col)
+        layout.append((key[0], key[1], row, count))
+        row += count
+    return layout, row
+
+def write_store(columns, languages, out_dir):
+    """
+    Write the store:
+
+      chapters.bin           uint32 [CHAPTER_SLOTS, 2] first row and verse count per
+                             (ordinal - 1) << 8 | chapter (count 0 = absent)
+      <name>.offsets.bin     uint32 [rows + 1] byte offsets into <name>.text.bin
+      <name>.text.bin        UTF-8 verse texts back to back; an empty slice is a
+                             verse the translation does not have
+      manifest.json          row count and translations
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    layout, rows = row_layout(columns)
+    chapters = np.zeros((CHAPTER_SLOTS, 2), dtype="<u4")
+    for ordinal, chapter, first, count in layout:
+        chapters[(ordinal - 1) << 8 | chapter] = (first, count)
+    chapters.tofile(os.path.join(out_dir, "chapters.bin"))
+
+    translations = []
+    for name, col in columns.items():
+        offsets = np.zeros(rows + 1, dtype="<u4")
+        pieces, pos, present = [], 0, 0
+        for ordinal, chapter, first, count in layout:
+            verses = col.get((ordinal, chapter), {})
+            for v in range(1, count + 1):
+                text = verses.get(v)
+                if text is not None:
+                    data = text.encode("utf-8")
+                    pieces.append(data)
+                    pos += len(data)
+                    present += 1
+                offsets[first + v] = pos
+        offsets.tofile(os.path.join(out_dir, f"{name}.offsets.bin"))
+        with open(os.path.join(out_dir, f"{name}.text.bin"), 'wb') as f:
+            f.write(b"".join(pieces))
+        translations.append({"name": name, "language": languages[name], "verses": present, "bytes": pos})
+
+    manifest = {"rows": rows, "chapter_slots": CHAPTER_SLOTS, "dtype": "<u4", "translations": translations}
+    with open(os.path.join(out_dir, "manifest.json"), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    return manifest
+
+# ---------------------------------------------
+# Memory-mapped reader
+# ---------------------------------------------
+class ParallelStore:
+    """
+    Reads a store written by write_store() through memory maps: a verse
+    is one lookup in chapters.bin, then two offsets and one text slice per
+    translation, with nothing loaded up front.
+    """
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        with open(os.path.join(store_dir, "manifest.json"), 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        self.names = [t["name"] for t in self.manifest["translations"]]
+        self.chapters = np.memmap(os.path.join(store_dir, "chapters.bin"), dtype="<u4", mode="r",
+                                  shape=(self.manifest["chapter_slots"], 2))
+        self.offsets = {}
+        self.texts = {}
+        for name in self.names:
+            self.offsets[name] = np.memmap(os.path.join(store_dir, f"{name}.offsets.bin"), dtype="<u4", mode="r")
+            path = os.path.join(store_dir, f"{name}.text.bin")
+            self.texts[name] = np.memmap(path, dtype=np.uint8, mode="r") if os.path.getsize(path) else b""
+
+    def row(self, vid):
+        """Row of a verse_id(), or None when no translation has that verse."""
+        ordinal, chapter, verse = vid >> 16, (vid >> 8) & 0xFF, vid & 0xFF
+        if not 1 <= ordinal <= len(BOOKS):
+            return None
+        first, count = self.chapters[(ordinal - 1) << 8 | chapter]
+        return int(first) + verse - 1 if 1 <= verse <= count else None
+
+    def text(self, name, row):
+        a, b = self.offsets[name][row], self.offsets[name][row + 1]
+        return bytes(self.texts[name][a:b]).decode("utf-8") if b > a else None
+
+    def verse(self, vid, names=None):
+        """{translation: text or None} of one verse_id()."""
+        row = self.row(vid)
+        if row is None:
+            return {}
+        return {name: self.text(name, row) for name in names or self.names}
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or read a verse-aligned parallel translation store")
+    sub = parser.add_subparsers(dest="command", required=True)
+    b = sub.add_parser("build", help="align translation JSON files into one store")
+    b.add_argument("bibles", nargs="*", help=f"translation JSON files (default: every {BIBLES_DIR}/<lang>/*.json)")
+    b.add_argument("--out-dir", default=OUT_DIR)
+    r = sub.add_parser("show", help="print one verse in every translation")
+    r.add_argument("reference", help='e.g. "John 3:16" or "Juan 3:16"')
+    r.add_argument("--store", default=OUT_DIR)
+    args = parser.parse_args()
+
+    if args.command == "show":
+        ref = parse_reference(args.reference)
+        if ref is None:
+            parser.error(f"not a reference: {args.reference}")
+        book, chapter, verse = split_verse_id(ref[0])
+        print(f"{book} {chapter}:{verse}")
+        for name, text in ParallelStore(args.store).verse(ref[0]).items():
+            print(f"  {name:10s} {text if text is not None else '-'}")
+        return
+
+    paths = [Path(p) for p in args.bibles] or sorted(Path(BIBLES_DIR).glob("*/*.json"))
+    columns, languages = {}, {}
+    for path in paths:
+        columns[path.stem] = translation_verses(load_kjv_json(path))
+        languages[path.stem] = path.parent.name
+    manifest = write_store(columns, languages, args.out_dir)
+    print(f"{manifest['rows']} rows x {len(columns)} translations in {args.out_dir}")
+    for t in manifest["translations"]:
+        print(f"  {t['name']:10s} {t['verses']:6d} verses, {t['bytes'] / 1024:.0f} KB text")
+
+if __name__ == "__main__":
+    main()
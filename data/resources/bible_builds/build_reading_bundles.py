@@ -0,0 +1,172 @@
+import argparse
+import json
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.corpus import load_kjv_json
+from common.incremental import write_if_changed
+from common.intervals import reference_verses
+from common.verse_codec import BOOKS, SPANISH_BOOKS, canonical_book, format_range, parse_batch, verse_id
+from common.versification import VersificationMap
+from split_translations import BIBLES_DIR, book_slug, encode
+
+# ---------------------------------------------
+# Settings
+# ---------------------------------------------
+RESOURCES_DIR = ".."
+OUT_DIR = "bundles"
+VERSIFICATION_DIR = "versification"  # build_versification_maps.py output
+TOP_K = 5  # cross references kept per verse, by votes
+CROSSREF_DBS = ["cross_refs/crossrefs_ot.db", "cross_refs/crossrefs_nt.db"]
+SPEAKERS = {
+    # flag bit -> references file under RESOURCES_DIR
+    1: "jesus_words/jesus_words_references.json",
+    2: "gods_words/god_words_references.json",
+}
+
+# ---------------------------------------------
+# Sources joined into every bundle
+# ---------------------------------------------
+def load_speakers(resources_dir):
+    """[(flag bit, IntervalSet of verse ids)] for each speaker reference list found."""
+    speakers = []
+    for flag, rel in SPEAKERS.items():
+        path = os.path.join(resources_dir, rel)
+        if not os.path.exists(path):
+            print(f"[WARN] {path} not found; flag {flag} left unset")
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            speakers.append((flag, reference_verses(json.load(f)["references"])))
+    return speakers
+
+def load_crossrefs(resources_dir, top_k=TOP_K):
+    """
+    {from verse id: (count, [(to_start, to_end, votes)] best top_k by votes)}
+    from the OT/NT cross-reference shards; from_verse strings are parsed
+    in one batch.
+    """
+    rows = []
+    for rel in CROSSREF_DBS:
+        path = os.path.join(resources_dir, rel)
+        if not os.path.exists(path):
+            print(f"[WARN] {path} not found; no cross references from it")
+            continue
+        conn = sqlite3.connect(path)
+        rows.extend(conn.execute("SELECT from_verse, to_verse, votes FROM cross_references ORDER BY id"))
+        conn.close()
+    if not rows:
+        return {}
+
+    from_ids, _ = parse_batch([r[0] for r in rows])
+    to_starts, to_ends = parse_batch([r[1] for r in rows])
+    grouped = {}
+    for from_id, start, end, (_, _, votes) in zip(from_ids.tolist(), to_starts.tolist(), to_ends.tolist(), rows):
+        if from_id and start:
+            grouped.setdefault(from_id, []).append((start, end, votes or 0))
+    crossrefs = {}
+    for from_id, targets in grouped.items():
+        targets.sort(key=lambda t: -t[2])
+        crossrefs[from_id] = (len(targets), targets[:top_k])
+    return crossrefs
+
+def load_versification(versification_dir, language, name):
+    """VersificationMap of a translation; an empty one (KJV numbering) when none was built."""
+    path = os.path.join(versification_dir, language, f"{name}.npz")
+    return VersificationMap.load(path) if os.path.exists(path) else VersificationMap()
+
+def load_metadata(resources_dir):
+    with open(os.path.join(resources_dir, "book-metadata.json"), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+# ---------------------------------------------
+# Bundles
+# ---------------------------------------------
+def chapter_bundle(name, book, canonical, chapter_num, verses, speakers, crossrefs, metadata, names, vmap):
+    """
+    One chapter as parallel per-verse columns: verse numbers, text,
+    speaker flags (bit 1 = Jesus' words, 2 = God's words), cross-reference
+    counts and the top references ({verse: [[reference, votes], ...]}),
+    plus the book's metadata. Speakers and cross references are
+    KJV-numbered; vmap projects them onto the translation's numbering.
+    A reference whose first verse the translation lacks is left out; one
+    whose last verse it lacks is cut back to its first verse.
+    """
+    numbers = [int(v) for v in verses]
+    kjv_ids = vmap.to_kjv([verse_id(canonical, chapter_num, v) for v in numbers]).tolist()
+    texts, flags, counts, top = list(verses.values()), [], [], {}
+    for verse_num, vid in zip(numbers, kjv_ids):
+        flags.append(sum(flag for flag, members in speakers if vid in members))
+        count, targets = crossrefs.get(vid, (0, []))
+        counts.append(count)
+        if targets:
+            projected = vmap.to_translation([t[:2] for t in targets]).tolist()
+            refs = [[format_range(start, end if end >= start else start, names=names), votes]
+                    for (start, end), (_, _, votes) in zip(projected, targets) if start]
+            if refs:
+                top[str(verse_num)] = refs
+    return {
+        "translation": name,
+        "book": book,
+        "canonical_book": canonical,
+        "chapter": int(chapter_num),
+        "verses": numbers,
+        "text": texts,
+        "speaker_flags": flags,
+        "crossref_counts": counts,
+        "crossrefs": top,
+        "book_info": metadata.get(canonical, {}),
+    }
+
+def write_bundles(bible, target, name, language, speakers, crossrefs, metadata, vmap):
+    """Write <target>/<book-slug>/<chapter>.json for every chapter; returns (files, rewritten)."""
+    names = SPANISH_BOOKS if language == "es" else BOOKS
+    files = rewritten = 0
+    for book, chapters in bible.items():
+        canonical = canonical_book(book)
+        if canonical is None:
+            print(f"[WARN] unknown book '{book}', no bundles")
+            continue
+        slug = book_slug(book)
+        for chapter_num, verses in chapters.items():
+            if not isinstance(verses, dict):
+                continue
+            bundle = chapter_bundle(name, book, canonical, chapter_num, verses,
+                                    speakers, crossrefs, metadata, names, vmap)
+            files += 1
+            rewritten += write_if_changed(os.path.join(target, slug, f"{chapter_num}.json"), encode(bundle))
+    return files, rewritten
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Write one reading bundle per translation chapter: text, speaker flags, "
+                    "cross references and book metadata")
+    parser.add_argument("bibles", nargs="*",
+                        help=f"translation JSON files (default: every {BIBLES_DIR}/<lang>/*.json)")
+    parser.add_argument("--resources-dir", default=RESOURCES_DIR)
+    parser.add_argument("--out-dir", default=OUT_DIR, help="writes <out-dir>/<lang>/<translation>/<book>/<chapter>.json")
+    parser.add_argument("--top-k", type=int, default=TOP_K, help="cross references kept per verse")
+    parser.add_argument("--versification-dir", default=VERSIFICATION_DIR,
+                        help="mapping tables from build_versification_maps.py (missing = KJV numbering)")
+    args = parser.parse_args()
+
+    speakers = load_speakers(args.resources_dir)
+    crossrefs = load_crossrefs(args.resources_dir, args.top_k)
+    metadata = load_metadata(args.resources_dir)
+    print(f"Speakers: {', '.join(f'{len(m)} verses (flag {f})' for f, m in speakers) or 'none'}; "
+          f"cross references from {len(crossrefs)} verses")
+
+    paths = [Path(p) for p in args.bibles] or sorted(Path(BIBLES_DIR).glob("*/*.json"))
+    for path in paths:
+        language = path.parent.name
+        target = os.path.join(args.out_dir, language, path.stem)
+        vmap = load_versification(args.versification_dir, language, path.stem)
+        files, rewritten = write_bundles(load_kjv_json(path), target, path.stem, language,
+                                         speakers, crossrefs, metadata, vmap)
+        print(f"{language}/{path.stem}: {files} chapter bundles, {rewritten} rewritten")
+
+if __name__ == "__main__":
+    main()
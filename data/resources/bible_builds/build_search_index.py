@@ -0,0 +1,183 @@
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.corpus import load_kjv_json, terms
+from common.verse_codec import canonical_book, split_verse_id, verse_id
+
+# ---------------------------------------------
+# Settings
+# ---------------------------------------------
+BIBLES_DIR = "../../bibles"
+OUT_DIR = "search"
+PREFIX_LENGTH = 2  # shard key: first characters of the folded term
+
+# ---------------------------------------------
+# Term shards (terms folded by common.corpus.fold)
+# ---------------------------------------------
+def shard_key(term, prefix_length=PREFIX_LENGTH):
+    """Shard file stem of a term; anything outside [a-z0-9] is hex-escaped."""
+    prefix = term[:prefix_length]
+    return "".join(ch if ch.isascii() and ch.isalnum() else f"_{ord(ch):x}" for ch in prefix)
+
+# ---------------------------------------------
+# Posting lists
+# ---------------------------------------------
+def delta_encode(ids):
+    """Sorted ids -> first id followed by the gaps between neighbours."""
+    out, prev = [], 0
+    for vid in ids:
+        out.append(vid - prev)
+        prev = vid
+    return out
+
+def delta_decode(deltas):
+    out, total = [], 0
+    for d in deltas:
+        total += d
+        out.append(total)
+    return out
+
+def intersect(postings):
+    """Ids present in every sorted posting list, smallest list first."""
+    postings = sorted(postings, key=len)
+    if not postings:
+        return []
+    result = postings[0]
+    for other in postings[1:]:
+        members = set(other)
+        result = [vid for vid in result if vid in members]
+        if not result:
+            break
+    return result
+
+def build_postings(bible):
+    """
+    {term: sorted verse_id()s} for a {book: {chapter: {verse: text}}}
+    translation. Spanish book names are mapped to the canonical ids, so
+    every translation shares one id space; unknown books are skipped.
+    """
+    postings = {}
+    books = {}
+    verses = 0
+    for book, chapters in bible.items():
+        canonical = canonical_book(book)
+        if canonical is None:
+            print(f"[WARN] unknown book '{book}', not indexed")
+            continue
+        books[canonical] = book
+        for chapter_num, chapter in chapters.items():
+            if not isinstance(chapter, dict):
+                continue
+            for verse_num, text in chapter.items():
+                vid = verse_id(canonical, chapter_num, verse_num)
+                verses += 1
+                for term in set(terms(text)):
+                    postings.setdefault(term, []).append(vid)
+    for ids in postings.values():
+        ids.sort()
+    return postings, books, verses
+
+def write_index(bible, out_dir, name, prefix_length=PREFIX_LENGTH):
+    """
+    Write <out_dir>/<name>/<shard>.json ({term: delta-encoded ids}) and a
+    manifest.json listing the shards, the book names of the translation
+    and the folding used, so a client fetches only the shards of its
+    query terms.
+    """
+    postings, books, verses = build_postings(bible)
+    target = os.path.join(out_dir, name)
+    os.makedirs(target, exist_ok=True)
+
+    shards = {}
+    for term in sorted(postings):
+        shards.setdefault(shard_key(term, prefix_length), {})[term] = delta_encode(postings[term])
+
+    manifest_shards = {}
+    for key, entries in shards.items():
+        path = os.path.join(target, f"{key}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f, ensure_ascii=False, separators=(",", ":"))
+        manifest_shards[key] = {"terms": len(entries), "bytes": os.path.getsize(path)}
+
+    manifest = {
+        "translation": name,
+        "verses": verses,
+        "terms": len(postings),
+        "prefix_length": prefix_length,
+        "folding": "casefold + NFKD, combining marks removed",
+        "verse_id": "book_ordinal << 16 | chapter << 8 | verse",
+        "books": books,
+        "shards": manifest_shards,
+    }
+    with open(os.path.join(target, "manifest.json"), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    return manifest
+
+# ---------------------------------------------
+# Reading an index
+# ---------------------------------------------
+class SearchIndex:
+    """Loads shards of one translation's index on demand."""
+
+    def __init__(self, index_dir):
+        self.index_dir = index_dir
+        with open(os.path.join(index_dir, "manifest.json"), 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        self.shards = {}
+
+    def postings(self, term):
+        key = shard_key(term, self.manifest["prefix_length"])
+        if key not in self.manifest["shards"]:
+            return []
+        if key not in self.shards:
+            with open(os.path.join(self.index_dir, f"{key}.json"), 'r', encoding='utf-8') as f:
+                self.shards[key] = json.load(f)
+        return delta_decode(self.shards[key].get(term, []))
+
+    def search(self, query):
+        """(book, chapter, verse) of verses containing every word of the query."""
+        words = set(terms(query))
+        if not words:
+            return []
+        hits = intersect([self.postings(w) for w in words])
+        books = self.manifest["books"]
+        results = []
+        for vid in hits:
+            book, chapter, verse = split_verse_id(vid)
+            results.append((books.get(book, book), chapter, verse))
+        return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query per-translation inverted search indexes")
+    sub = parser.add_subparsers(dest="command", required=True)
+    b = sub.add_parser("build", help="index one or more translation JSON files")
+    b.add_argument("bibles", nargs="*", help=f"translation JSON files (default: every *.json under {BIBLES_DIR})")
+    b.add_argument("--out-dir", default=OUT_DIR)
+    b.add_argument("--prefix-length", type=int, default=PREFIX_LENGTH)
+    q = sub.add_parser("search", help="query a built index")
+    q.add_argument("index_dir", help="e.g. search/KJV")
+    q.add_argument("query")
+    args = parser.parse_args()
+
+    if args.command == "search":
+        results = SearchIndex(args.index_dir).search(args.query)
+        for book, chapter, verse in results[:50]:
+            print(f"{book} {chapter}:{verse}")
+        print(f"{len(results)} verses")
+        return
+
+    paths = args.bibles or sorted(str(p) for p in Path(BIBLES_DIR).rglob("*.json"))
+    for path in paths:
+        name = Path(path).stem
+        manifest = write_index(load_kjv_json(path), args.out_dir, name, args.prefix_length)
+        size = sum(s["bytes"] for s in manifest["shards"].values())
+        print(f"{name}: {manifest['verses']} verses, {manifest['terms']} terms, "
+              f"{len(manifest['shards'])} shards, {size / 1024:.0f} KB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.corpus import load_kjv_json
+from common.verse_codec import BOOKS, BOOK_ORDINAL, canonical_book
+from common.versification import VersificationMap
+from split_translations import BIBLES_DIR
+
+# ---------------------------------------------
+# Settings
+# ---------------------------------------------
+KJV_PATH = "../../bibles/KJV.json"
+OUT_DIR = "versification"
+WORKERS = os.cpu_count() or 1
+
+# ---------------------------------------------
+# Verse structure
+# ---------------------------------------------
+def structure(bible):
+    """{ordinal: {chapter: [verse numbers, ascending]}} under canonical book ordinals."""
+    books = {}
+    for book, chapters in bible.items():
+        canonical = canonical_book(book)
+        if canonical is None:
+            print(f"[WARN] unknown book '{book}', left out")
+            continue
+        books[BOOK_ORDINAL[canonical]] = {
+            int(c): sorted(map(int, verses)) for c, verses in chapters.items() if isinstance(verses, dict)
+        }
+    return books
+
+def _ids(ordinal, chapter, verses):
+    return [ordinal << 16 | chapter << 8 | v for v in verses]
+
+def align_chapter(ordinal, chapter, kjv, other):
+    """
+    [(kjv id or 0, translation id or 0)] for one chapter numbered with
+    different verse counts. Extra translation verses are taken to be
+    numbered headings at the start (Psalms); missing ones are taken to be
+    merged into the translation's last verse.
+    """
+    k, t = _ids(ordinal, chapter, kjv), _ids(ordinal, chapter, other)
+    if len(t) >= len(k):
+        extra = len(t) - len(k)
+        return [(0, tid) for tid in t[:extra]] + list(zip(k, t[extra:]))
+    pairs = list(zip(k, t))
+    return pairs + [(kid, t[-1] if t else 0) for kid in k[len(t):]]
+
+def align_book(ordinal, kjv, other):
+    """
+    [(kjv id or 0, translation id or 0)] for a book whose numbering
+    differs. When both have the same number of verses the difference is
+    only where chapters break (Joel 2:28-32 / 3:1-5, Malachi 4 / 3:19-24)
+    and verses pair up in reading order; otherwise chapters are aligned
+    one by one.
+    """
+    flat_k = [vid for c in sorted(kjv) for vid in _ids(ordinal, c, kjv[c])]
+    flat_t = [vid for c in sorted(other) for vid in _ids(ordinal, c, other[c])]
+    if len(flat_k) == len(flat_t):
+        return list(zip(flat_k, flat_t))
+    pairs = []
+    for chapter in sorted(set(kjv) | set(other)):
+        k, t = kjv.get(chapter, []), other.get(chapter, [])
+        if k != t:
+            pairs.extend(align_chapter(ordinal, chapter, k, t))
+    return pairs
+
+def diff_translation(kjv, other):
+    """
+    (VersificationMap, {book: verses renumbered}) of a translation's
+    structure against the KJV's. Books with identical structure add
+    nothing; books only one side has map to 0.
+    """
+    forward, reverse, books = {}, {}, {}
+    for ordinal in sorted(set(kjv) | set(other)):
+        k, t = kjv.get(ordinal, {}), other.get(ordinal, {})
+        if k == t:
+            continue
+        changed = 0
+        for kid, tid in align_book(ordinal, k, t):
+            # a verse paired twice (merged verses) keeps its first partner
+            if kid:
+                forward.setdefault(kid, tid)
+            if tid:
+                reverse.setdefault(tid, kid)
+            changed += kid != tid
+        if changed:
+            books[BOOKS[ordinal - 1]] = changed
+    forward = {a: b for a, b in forward.items() if a != b}
+    reverse = {a: b for a, b in reverse.items() if a != b}
+    vmap = VersificationMap(list(forward), list(forward.values()), list(reverse), list(reverse.values()))
+    return vmap, books
+
+def _translation_worker(job):
+    path, kjv = job
+    return diff_translation(kjv, structure(load_kjv_json(path)))
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Diff every translation's verse numbering against the KJV and write "
+                    "KJV <-> translation mapping tables")
+    parser.add_argument("bibles", nargs="*",
+                        help=f"translation JSON files (default: every {BIBLES_DIR}/<lang>/*.json)")
+    parser.add_argument("--kjv", default=KJV_PATH)
+    parser.add_argument("--out-dir", default=OUT_DIR, help="writes <out-dir>/<lang>/<translation>.npz")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    args = parser.parse_args()
+
+    kjv = structure(load_kjv_json(args.kjv))
+    paths = [Path(p) for p in args.bibles] or sorted(Path(BIBLES_DIR).glob("*/*.json"))
+    jobs = [(path, kjv) for path in paths]
+    with ProcessPoolExecutor(max_workers=max(1, min(args.workers, len(jobs)))) as pool:
+        results = list(pool.map(_translation_worker, jobs))
+
+    manifest = {}
+    for path, (vmap, books) in zip(paths, results):
+        language = path.parent.name
+        rel = os.path.join(language, f"{path.stem}.npz")
+        os.makedirs(os.path.join(args.out_dir, language), exist_ok=True)
+        vmap.save(os.path.join(args.out_dir, rel))
+        manifest[f"{language}/{path.stem}"] = {"file": rel, "entries": len(vmap), "books": books}
+        summary = ", ".join(f"{book} ({n})" for book, n in books.items()) or "same as KJV"
+        print(f"{language}/{path.stem}: {summary}")
+    with open(os.path.join(args.out_dir, "manifest.json"), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+if __name__ == "__main__":
+    main()
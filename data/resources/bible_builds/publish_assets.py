@@ -0,0 +1,147 @@
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.incremental import write_if_changed
+
+# ---------------------------------------------
+# Settings
+# ---------------------------------------------
+RESOURCES_DIR = ".."
+OUT_DIR = "publish"
+MANIFEST = "asset-manifest.json"
+HASH_LENGTH = 12
+# Generated outputs served by /api/resources, relative to RESOURCES_DIR
+ASSETS = [
+    "book-metadata.json",
+    "verse_layout.json",
+    "cross_refs/*.db",
+    "gods_words/god_words*.json",
+    "gods_words/*.bitmap",
+    "jesus_words/jesus_words*.json",
+    "jesus_words/*.bitmap",
+]
+# Skip the manifests and caches the extractors keep next to their outputs
+SKIP_SUFFIXES = (".manifest.json", ".lookup.json")
+
+def load_brotli():
+    """The brotli module, or None (then only gzip variants are written)."""
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+# ---------------------------------------------
+# Content-hashed, precompressed copies
+# ---------------------------------------------
+def hashed_name(rel, digest):
+    """gods_words/god_words.json -> gods_words/god_words.<hash>.json"""
+    path = Path(rel)
+    return str(path.with_name(f"{path.stem}.{digest[:HASH_LENGTH]}{path.suffix}"))
+
+def collect(resources_dir, patterns):
+    found = []
+    for pattern in patterns:
+        for path in sorted(Path(resources_dir).glob(pattern)):
+            rel = path.relative_to(resources_dir).as_posix()
+            if path.is_file() and not rel.endswith(SKIP_SUFFIXES) and rel not in found:
+                found.append(rel)
+    return found
+
+def publish_asset(resources_dir, out_dir, rel, brotli=None):
+    """
+    Copy one asset to its content-hashed name with .gz (and .br) variants.
+    Names change exactly when bytes do, so an existing hashed file is
+    left alone and only new content is compressed and uploaded.
+    Returns (manifest entry, newly written).
+    """
+    data = (Path(resources_dir) / rel).read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    name = hashed_name(rel, digest)
+    target = os.path.join(out_dir, name)
+    entry = {"file": name, "bytes": len(data), "sha256": digest, "encodings": {}}
+
+    variants = [("gzip", ".gz", lambda b: gzip.compress(b, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.insert(0, ("br", ".br", lambda b: brotli.compress(b, quality=11)))
+
+    new = not os.path.exists(target)
+    if new:
+        write_if_changed(target, data)
+    for encoding, suffix, compress in variants:
+        path = target + suffix
+        if not os.path.exists(path):
+            write_if_changed(path, compress(data))
+            new = True
+        entry["encodings"][encoding] = {"file": name + suffix, "bytes": os.path.getsize(path)}
+    return entry, new
+
+def publish(resources_dir=RESOURCES_DIR, out_dir=OUT_DIR, patterns=ASSETS, prune=False):
+    """
+    Publish every asset and write <out_dir>/asset-manifest.json mapping
+    logical paths (as requested from /api/resources) to their hashed and
+    precompressed files. Returns (manifest, new assets, stale files).
+    """
+    brotli = load_brotli()
+    if brotli is None:
+        print("[WARN] brotli is not installed; writing gzip variants only")
+
+    manifest_file = os.path.join(out_dir, MANIFEST)
+    previous = {}
+    if os.path.exists(manifest_file):
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            previous = json.load(f).get("assets", {})
+
+    assets, new = {}, []
+    for rel in collect(resources_dir, patterns):
+        assets[rel], written = publish_asset(resources_dir, out_dir, rel, brotli)
+        if written:
+            new.append(rel)
+
+    def files(entries):
+        names = set()
+        for e in entries.values():
+            names.add(e["file"])
+            names.update(v["file"] for v in e["encodings"].values())
+        return names
+
+    stale = sorted(files(previous) - files(assets))
+    if prune:
+        for name in stale:
+            path = os.path.join(out_dir, name)
+            if os.path.exists(path):
+                os.remove(path)
+
+    manifest = {"hash": "sha256", "hash_length": HASH_LENGTH, "assets": assets}
+    write_if_changed(manifest_file, json.dumps(manifest, indent=2, ensure_ascii=False).encode("utf-8"))
+    return manifest, new, stale
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Write content-hashed, gzip/brotli-precompressed copies of the generated assets")
+    parser.add_argument("--resources-dir", default=RESOURCES_DIR)
+    parser.add_argument("--out-dir", default=OUT_DIR)
+    parser.add_argument("--prune", action="store_true", help="delete files the previous manifest listed but this one does not")
+    args = parser.parse_args()
+
+    manifest, new, stale = publish(args.resources_dir, args.out_dir, prune=args.prune)
+    assets = manifest["assets"]
+    raw = sum(e["bytes"] for e in assets.values())
+    smallest = sum(min([e["bytes"]] + [v["bytes"] for v in e["encodings"].values()]) for e in assets.values())
+    print(f"Published {len(assets)} assets to {args.out_dir}: {raw / 1024:.0f} KB raw, "
+          f"{smallest / 1024:.0f} KB precompressed")
+    print(f"  changed since last publish: {len(new)}")
+    for rel in new:
+        print(f"    {rel} -> {assets[rel]['file']}")
+    if stale:
+        print(f"  {'removed' if args.prune else 'no longer referenced'}: {len(stale)} files")
+
+if __name__ == "__main__":
+    main()
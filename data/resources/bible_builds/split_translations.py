@@ -0,0 +1,118 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.corpus import load_kjv_json
+from common.incremental import write_if_changed
+from common.verse_codec import canonical_book
+
+# ---------------------------------------------
+# Settings
+# ---------------------------------------------
+BIBLES_DIR = "../../bibles"
+OUT_DIR = "split"
+
+# ---------------------------------------------
+# Per-book / per-chapter translation files
+# ---------------------------------------------
+def book_slug(name):
+    """File stem of a book: its canonical English name, e.g. "1 Reyes" -> "1-kings"."""
+    return re.sub(r"[^a-z0-9]+", "-", (canonical_book(name) or name).lower()).strip("-")
+
+def encode(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def file_entry(path, data, rel):
+    """Manifest entry of one written file; the file is only rewritten when its bytes change."""
+    written = write_if_changed(path, data)
+    return {"file": rel, "bytes": len(data), "sha256": hashlib.sha256(data).hexdigest()}, written
+
+def prune(target, keep):
+    """Remove .json files under target (other than manifest.json) that are not in keep; returns how many."""
+    removed = 0
+    for root, _, names in os.walk(target, topdown=False):
+        for fname in names:
+            rel = os.path.relpath(os.path.join(root, fname), target).replace(os.sep, "/")
+            if fname.endswith(".json") and rel != "manifest.json" and rel not in keep:
+                os.remove(os.path.join(root, fname))
+                removed += 1
+        if root != target and not os.listdir(root):
+            os.rmdir(root)
+    return removed
+
+def split_translation(bible, target, name, language, per_chapter=False):
+    """
+    Write one JSON per book ({chapter: {verse: text}}), or per chapter
+    ({verse: text}) with per_chapter, under `target`, plus manifest.json
+    with the byte size and sha256 of every file in reading order. Files
+    left from an earlier run that the manifest no longer lists are
+    removed. Returns (manifest, files rewritten, files removed).
+    """
+    books = []
+    rewritten = 0
+    for book, chapters in bible.items():
+        chapters = {c: verses for c, verses in chapters.items() if isinstance(verses, dict)}
+        slug = book_slug(book)
+        entry = {"name": book, "canonical": canonical_book(book), "chapters": len(chapters)}
+        if per_chapter:
+            entry["files"] = []
+            for chapter_num, verses in chapters.items():
+                rel = f"{slug}/{chapter_num}.json"
+                info, written = file_entry(os.path.join(target, rel), encode(verses), rel)
+                entry["files"].append({"chapter": int(chapter_num), **info})
+                rewritten += written
+        else:
+            rel = f"{slug}.json"
+            info, written = file_entry(os.path.join(target, rel), encode(chapters), rel)
+            entry.update(info)
+            rewritten += written
+        books.append(entry)
+
+    manifest = {
+        "translation": name,
+        "language": language,
+        "granularity": "chapter" if per_chapter else "book",
+        "books": books,
+    }
+    write_if_changed(os.path.join(target, "manifest.json"),
+                     json.dumps(manifest, indent=2, ensure_ascii=False).encode("utf-8"))
+    return manifest, rewritten, prune(target, manifest_files(manifest))
+
+def manifest_entries(manifest):
+    if manifest["granularity"] == "book":
+        return manifest["books"]
+    return [f for b in manifest["books"] for f in b["files"]]
+
+def manifest_files(manifest):
+    return {e["file"] for e in manifest_entries(manifest)}
+
+def manifest_bytes(manifest):
+    return [e["bytes"] for e in manifest_entries(manifest)]
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Split translation JSON into per-book or per-chapter files with a manifest")
+    parser.add_argument("bibles", nargs="*",
+                        help=f"translation JSON files (default: every {BIBLES_DIR}/<lang>/*.json)")
+    parser.add_argument("--out-dir", default=OUT_DIR, help="writes <out-dir>/<lang>/<translation>/")
+    parser.add_argument("--per-chapter", action="store_true", help="one file per chapter instead of per book")
+    args = parser.parse_args()
+
+    paths = [Path(p) for p in args.bibles] or sorted(Path(BIBLES_DIR).glob("*/*.json"))
+    for path in paths:
+        language = path.parent.name
+        target = os.path.join(args.out_dir, language, path.stem)
+        manifest, rewritten, removed = split_translation(load_kjv_json(path), target, path.stem,
+                                                         language, args.per_chapter)
+        sizes = manifest_bytes(manifest)
+        print(f"{language}/{path.stem}: {len(sizes)} files, largest {max(sizes, default=0) / 1024:.0f} KB, "
+              f"total {sum(sizes) / 1024:.0f} KB, {rewritten} rewritten, {removed} stale removed")
+
+if __name__ == "__main__":
+    main()
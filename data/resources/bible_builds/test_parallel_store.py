@@ -0,0 +1,33 @@
+from build_parallel_store import ParallelStore, translation_verses, write_store
+from common.verse_codec import canonical_book, verse_id
+
+KJV = {
+    "Genesis": {"1": {"1": "In the beginning God created the heaven and the earth.", "2": "And the earth was without form."}},
+    "Psalms": {"3": {"1": "LORD, how are they increased that trouble me!"}},
+}
+RVR = {
+    "Génesis": {"1": {"1": "En el principio creó Dios los cielos y la tierra."}},
+    "Salmos": {"3": {"1": "Salmo de David.", "2": "¡Oh Jehová, cuánto se han multiplicado mis adversarios!"}},
+}
+
+def store(tmp_path):
+    columns = {"KJV": translation_verses(KJV), "RVR": translation_verses(RVR)}
+    manifest = write_store(columns, {"KJV": "en", "RVR": "es"}, str(tmp_path))
+    return manifest, ParallelStore(str(tmp_path))
+
+def test_every_verse_reads_back_in_every_translation(tmp_path):
+    manifest, reader = store(tmp_path)
+    assert manifest["rows"] == 4
+    for name, bible in (("KJV", KJV), ("RVR", RVR)):
+        for book, chapters in bible.items():
+            for chapter, verses in chapters.items():
+                for verse, text in verses.items():
+                    vid = verse_id(canonical_book(book), chapter, verse)
+                    assert reader.verse(vid, [name]) == {name: text}
+
+def test_missing_verses_and_chapters(tmp_path):
+    _, reader = store(tmp_path)
+    assert reader.verse(verse_id("Genesis", 1, 2)) == {"KJV": "And the earth was without form.", "RVR": None}
+    assert reader.verse(verse_id("Psalms", 3, 2)) == {"KJV": None, "RVR": RVR["Salmos"]["3"]["2"]}
+    assert reader.verse(verse_id("Genesis", 1, 3)) == {}
+    assert reader.verse(verse_id("Exodus", 1, 1)) == {}
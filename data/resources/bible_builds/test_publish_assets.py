@@ -0,0 +1,51 @@
+import gzip
+import os
+
+import pytest
+
+from publish_assets import hashed_name, load_brotli, publish
+
+PATTERNS = ["book-metadata.json", "gods_words/god_words*.json"]
+
+@pytest.fixture
+def resources(tmp_path):
+    root = tmp_path / "resources"
+    (root / "gods_words").mkdir(parents=True)
+    (root / "book-metadata.json").write_text('{"Genesis": {"testament": "OT"}}', encoding="utf-8")
+    (root / "gods_words" / "god_words.json").write_text('{"citations": []}' * 50, encoding="utf-8")
+    (root / "gods_words" / "god_words.manifest.json").write_text("{}", encoding="utf-8")  # skipped
+    return root
+
+def published(resources, out, **kwargs):
+    manifest, new, stale = publish(str(resources), str(out), PATTERNS, **kwargs)
+    return manifest["assets"], new, stale
+
+def test_hashed_names_are_stable(resources, tmp_path):
+    first, new, _ = published(resources, tmp_path / "a")
+    again, unchanged, _ = published(resources, tmp_path / "a")
+    elsewhere, _, _ = published(resources, tmp_path / "b")
+    assert sorted(first) == ["book-metadata.json", "gods_words/god_words.json"]
+    assert first == again == elsewhere
+    assert sorted(new) == sorted(first) and unchanged == []
+    assert hashed_name("gods_words/god_words.json", "0123456789abcdef") == "gods_words/god_words.0123456789ab.json"
+
+def test_precompressed_variants_decompress_to_the_source(resources, tmp_path):
+    out = tmp_path / "out"
+    assets, _, _ = published(resources, out)
+    brotli = load_brotli()
+    for rel, entry in assets.items():
+        source = (resources / rel).read_bytes()
+        assert (out / entry["file"]).read_bytes() == source
+        assert gzip.decompress((out / entry["encodings"]["gzip"]["file"]).read_bytes()) == source
+        if brotli is not None:
+            assert brotli.decompress((out / entry["encodings"]["br"]["file"]).read_bytes()) == source
+
+def test_changed_asset_gets_a_new_name_and_the_old_one_is_pruned(resources, tmp_path):
+    out = tmp_path / "out"
+    before, _, _ = published(resources, out)
+    (resources / "book-metadata.json").write_text('{"Genesis": {"testament": "OT", "chapters": 50}}', encoding="utf-8")
+    after, new, stale = published(resources, out, prune=True)
+    old = before["book-metadata.json"]["file"]
+    assert new == ["book-metadata.json"] and after["book-metadata.json"]["file"] != old
+    assert old in stale and not os.path.exists(out / old)
+    assert after["gods_words/god_words.json"] == before["gods_words/god_words.json"]
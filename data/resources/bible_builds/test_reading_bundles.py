@@ -0,0 +1,40 @@
+from build_reading_bundles import chapter_bundle
+from common.intervals import IntervalSet
+from common.verse_codec import BOOKS, verse_id
+from common.versification import VersificationMap
+
+def psalm_3_with_heading():
+    """Translation numbering Psalm 3's title as verse 1 and leaving out Mark 16:9-20 and Romans 16:24."""
+    kjv = [verse_id("Psalms", 3, v) for v in range(1, 9)]
+    translation = [verse_id("Psalms", 3, v + 1) for v in range(1, 9)]
+    missing = [verse_id("Mark", 16, v) for v in range(9, 21)] + [verse_id("Romans", 16, 24)]
+    return VersificationMap(kjv + missing, translation + [0] * len(missing),
+                            [verse_id("Psalms", 3, 1)] + translation, [0] + kjv)
+
+def bundle(verses, book, chapter, crossrefs, speakers=()):
+    return chapter_bundle("T", book, book, chapter, verses, list(speakers), crossrefs, {}, BOOKS,
+                          psalm_3_with_heading())
+
+def test_crossref_targets_are_given_in_the_translation_numbering():
+    crossrefs = {verse_id("Genesis", 1, 1): (3, [
+        (verse_id("Psalms", 3, 1), verse_id("Psalms", 3, 3), 10),
+        (verse_id("Mark", 16, 9), verse_id("Mark", 16, 20), 5),  # not in the translation
+        (verse_id("Romans", 16, 23), verse_id("Romans", 16, 24), 3),  # last verse not in it
+    ])}
+    b = bundle({"1": "In the beginning"}, "Genesis", "1", crossrefs)
+    assert b["crossrefs"] == {"1": [["Psalms 3:2-4", 10], ["Romans 16:23", 3]]}
+    assert b["crossref_counts"] == [3]
+
+def test_translation_verses_are_joined_on_their_kjv_ids():
+    kjv_first = verse_id("Psalms", 3, 1)
+    crossrefs = {kjv_first: (1, [(kjv_first, kjv_first, 2)])}
+    speakers = [(2, IntervalSet([(kjv_first, kjv_first)]))]
+    b = bundle({"1": "A Psalm of David", "2": "LORD, how are they increased"}, "Psalms", "3", crossrefs, speakers)
+    assert b["speaker_flags"] == [0, 2]
+    assert b["crossref_counts"] == [0, 1]
+    assert b["crossrefs"] == {"2": [["Psalms 3:2", 2]]}
+
+def test_only_targets_without_any_counterpart_leave_no_entry():
+    crossrefs = {verse_id("Genesis", 1, 1): (1, [(verse_id("Mark", 16, 9), verse_id("Mark", 16, 9), 4)])}
+    b = bundle({"1": "In the beginning"}, "Genesis", "1", crossrefs)
+    assert b["crossrefs"] == {} and b["crossref_counts"] == [1]
@@ -0,0 +1,31 @@
+from build_search_index import SearchIndex, build_postings, delta_decode, delta_encode, write_index
+from common.verse_codec import verse_id
+
+BIBLE = {
+    "Génesis": {"1": {"1": "En el principio creó Dios los cielos y la tierra.",
+                      "3": "Y dijo Dios: Sea la luz; y fue la luz."}},
+    "Salmos": {"23": {"1": "Jehová es mi pastor; nada me faltará."}},
+    "Juan": {"1": {"1": "En el principio era el Verbo, y el Verbo era con Dios."}, "intro": "x"},
+    "Libro desconocido": {"1": {"1": "Dios"}},
+}
+
+def test_delta_round_trip():
+    ids = [verse_id("Genesis", 1, 1), verse_id("Genesis", 1, 3), verse_id("John", 1, 1)]
+    assert delta_decode(delta_encode(ids)) == ids
+
+def test_shard_lookups_return_the_indexed_ids(tmp_path):
+    postings, _, verses = build_postings(BIBLE)
+    manifest = write_index(BIBLE, str(tmp_path), "RVR", prefix_length=1)
+    assert manifest["verses"] == verses == 4
+    index = SearchIndex(str(tmp_path / "RVR"))
+    for term, ids in postings.items():
+        assert index.postings(term) == ids
+    assert index.postings("dios") == [verse_id("Genesis", 1, 1), verse_id("Genesis", 1, 3), verse_id("John", 1, 1)]
+    assert index.postings("ausente") == []
+
+def test_search_folds_accents_and_intersects_terms(tmp_path):
+    write_index(BIBLE, str(tmp_path), "RVR")
+    index = SearchIndex(str(tmp_path / "RVR"))
+    assert index.search("PRINCIPIO dios") == [("Génesis", 1, 1), ("Juan", 1, 1)]
+    assert index.search("jehova faltara") == [("Salmos", 23, 1)]
+    assert index.search("luz verbo") == []
@@ -0,0 +1,29 @@
+import json
+
+from split_translations import split_translation
+
+BIBLE = {
+    "Génesis": {"1": {"1": "En el principio", "2": "Y la tierra"}, "2": {"1": "Fueron, pues"}, "notes": "x"},
+    "Éxodo": {"1": {"1": "Estos son los nombres"}},
+}
+
+def listing(target):
+    return sorted(str(p.relative_to(target)) for p in target.rglob("*.json"))
+
+def test_non_chapter_entries_are_not_written(tmp_path):
+    manifest, _, _ = split_translation(BIBLE, str(tmp_path), "RVR", "es", per_chapter=True)
+    assert [b["chapters"] for b in manifest["books"]] == [2, 1]
+    assert listing(tmp_path) == ["exodus/1.json", "genesis/1.json", "genesis/2.json", "manifest.json"]
+    split_translation(BIBLE, str(tmp_path), "RVR", "es")
+    assert json.loads((tmp_path / "genesis.json").read_text(encoding="utf-8")) == \
+        {"1": BIBLE["Génesis"]["1"], "2": BIBLE["Génesis"]["2"]}
+
+def test_files_missing_from_the_manifest_are_pruned(tmp_path):
+    split_translation(BIBLE, str(tmp_path), "RVR", "es", per_chapter=True)
+    shorter = {"Génesis": {"1": BIBLE["Génesis"]["1"]}}
+    _, rewritten, removed = split_translation(shorter, str(tmp_path), "RVR", "es", per_chapter=True)
+    assert (rewritten, removed) == (0, 2)
+    assert listing(tmp_path) == ["genesis/1.json", "manifest.json"]
+    # switching granularity drops the other layout's files
+    _, _, removed = split_translation(shorter, str(tmp_path), "RVR", "es")
+    assert removed == 1 and listing(tmp_path) == ["genesis.json", "manifest.json"]
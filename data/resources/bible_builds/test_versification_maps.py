@@ -0,0 +1,41 @@
+from build_versification_maps import diff_translation, structure
+from common.verse_codec import verse_id
+from common.versification import VersificationMap
+
+def bible(counts):
+    """{book: {chapter: {verse: ""}}} from {book: [verses per chapter]}."""
+    return {book: {str(c): {str(v): "" for v in range(1, n + 1)} for c, n in enumerate(chapters, 1)}
+            for book, chapters in counts.items()}
+
+KJV = structure(bible({"Genesis": [31], "Psalms": [6, 12, 8], "Joel": [20, 32, 21]}))
+# Psalm titles numbered as verse 1; Joel 2:28-32 numbered 3:1-5 and Joel 3 numbered 4
+OTHER = structure(bible({"Génesis": [31], "Salmos": [6, 12, 9], "Joel": [20, 27, 5, 21]}))
+
+def ids(book, *refs):
+    return [verse_id(book, c, v) for c, v in refs]
+
+def test_psalm_heading_offset():
+    vmap, books = diff_translation(KJV, OTHER)
+    assert books["Psalms"] == 9
+    assert vmap.to_translation(ids("Psalms", (3, 1), (3, 8), (2, 12))).tolist() == ids("Psalms", (3, 2), (3, 9), (2, 12))
+    assert vmap.to_kjv(ids("Psalms", (3, 1), (3, 2), (3, 9))).tolist() == [0] + ids("Psalms", (3, 1), (3, 8))
+
+def test_joel_chapter_split():
+    vmap, books = diff_translation(KJV, OTHER)
+    assert books["Joel"] == 26  # 2:28-32 and all of chapter 3
+    kjv = ids("Joel", (2, 27), (2, 28), (2, 32), (3, 1), (3, 21))
+    translation = ids("Joel", (2, 27), (3, 1), (3, 5), (4, 1), (4, 21))
+    assert vmap.to_translation(kjv).tolist() == translation
+    assert vmap.to_kjv(translation).tolist() == kjv
+
+def test_same_numbering_maps_to_itself_and_survives_save(tmp_path):
+    vmap, books = diff_translation(KJV, OTHER)
+    assert "Genesis" not in books
+    genesis = ids("Genesis", (1, 1), (1, 31))
+    assert vmap.to_translation(genesis).tolist() == genesis
+    vmap.save(tmp_path / "map.npz")
+    loaded = VersificationMap.load(tmp_path / "map.npz")
+    probe = ids("Joel", (2, 28), (3, 21)) + ids("Psalms", (3, 1))
+    assert loaded.to_translation(probe).tolist() == vmap.to_translation(probe).tolist()
+    assert len(loaded) == len(vmap)
+    assert len(diff_translation(KJV, KJV)[0]) == 0
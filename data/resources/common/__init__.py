@@ -0,0 +1 @@
+"""Helpers shared by the data pipeline scripts under data/resources."""
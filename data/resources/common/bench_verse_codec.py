@@ -0,0 +1,104 @@
+import argparse
+import random
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+
+from common.verse_codec import (
+    BOOKS, OSIS_BOOKS, SPANISH_BOOKS, format_batch, format_range, format_reference,
+    pack_batch, parse_batch, parse_reference, unpack_batch,
+)
+
+# ---------------------------------------------
+# Throughput of the verse-reference codec
+# ---------------------------------------------
+def synthetic_references(n, seed=0):
+    """Reference strings in every format the codec reads, ~1/3 of them ranges."""
+    rng = random.Random(seed)
+    styles = [
+        lambda b, c, v: f"{BOOKS[b]} {c}:{v}",
+        lambda b, c, v: f"{BOOKS[b]} {c}.{v}",
+        lambda b, c, v: f"{OSIS_BOOKS[b]}.{c}.{v}",
+        lambda b, c, v: f"{SPANISH_BOOKS[b]} {c}:{v}",
+    ]
+    refs = []
+    for _ in range(n):
+        b, c, v = rng.randrange(66), rng.randint(1, 50), rng.randint(1, 40)
+        style = rng.choice(styles)
+        ref = style(b, c, v)
+        roll = rng.random()
+        if roll < 0.15:
+            ref += f"-{style(b, c, v + 3)}"
+        elif roll < 0.3:
+            ref += f"-{v + 2}"
+        refs.append(ref)
+    return refs
+
+def database_references(paths):
+    refs = []
+    for path in paths:
+        conn = sqlite3.connect(path)
+        for from_verse, to_verse in conn.execute("SELECT from_verse, to_verse FROM cross_references"):
+            refs.extend((from_verse, to_verse))
+        conn.close()
+    return refs
+
+def timed(fn, *args, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def report(label, n, seconds):
+    print(f"  {label:34s} {n / seconds / 1e6:8.2f} M/s  ({seconds * 1000:8.1f} ms for {n:,})")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parsing/formatting of verse references")
+    parser.add_argument("--count", type=int, default=200_000, help="synthetic references")
+    parser.add_argument("--distinct", type=int, default=30_000,
+                        help="distinct strings among them (cross-ref columns repeat heavily)")
+    parser.add_argument("--db", nargs="*", help="use from/to_verse of these crossrefs_*.db instead")
+    args = parser.parse_args()
+
+    if args.db:
+        refs = database_references(args.db)
+    else:
+        pool = synthetic_references(args.distinct)
+        rng = random.Random(1)
+        refs = [rng.choice(pool) for _ in range(args.count)]
+    n = len(refs)
+    print(f"{n:,} references, {len(set(refs)):,} distinct")
+
+    seconds, scalar = timed(lambda: [parse_reference(r) for r in refs])
+    report("parse_reference (per string)", n, seconds)
+    seconds, (starts, ends) = timed(parse_batch, refs)
+    report("parse_batch (NumPy, dedup)", n, seconds)
+    failed = sum(1 for r in scalar if r is None)
+    assert [tuple(r) if r else (0, 0) for r in scalar] == list(zip(starts.tolist(), ends.tolist()))
+    print(f"  unparsed: {failed}")
+
+    ids = starts[starts > 0]
+    seconds, _ = timed(lambda: [format_reference(int(i)) for i in ids])
+    report("format_reference (per id)", len(ids), seconds)
+    seconds, formatted = timed(format_batch, ids)
+    report("format_batch (NumPy)", len(ids), seconds)
+    assert formatted[:1000] == [format_reference(int(i)) for i in ids[:1000]]
+    seconds, _ = timed(lambda: [format_range(int(a), int(b)) for a, b in zip(starts, ends) if a])
+    report("format_range (per range)", len(ids), seconds)
+
+    seconds, parts = timed(unpack_batch, ids)
+    report("unpack_batch", len(ids), seconds)
+    seconds, packed = timed(pack_batch, *parts)
+    report("pack_batch", len(ids), seconds)
+    assert np.array_equal(packed, ids)
+
+if __name__ == "__main__":
+    main()
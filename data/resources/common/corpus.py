@@ -0,0 +1,97 @@
+import json
+import re
+import unicodedata
+from bisect import bisect_right
+
+# ---------------------------------------------
+# KJV corpus shared by the speaker extractors
+# ---------------------------------------------
+def load_kjv_json(kjv_path="KJV.json"):
+    """Load the KJV JSON file ({book: {chapter: {verse: text}}})"""
+    with open(kjv_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def normalize_text(text):
+    """Normalize text for comparison - remove punctuation, lowercase, remove extra spaces"""
+    text = text.lower()
+    text = re.sub(r'[^\w\s]', '', text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+WORD = re.compile(r"\w+")
+
+def fold(text):
+    """
+    Case- and accent-insensitive form of a text: casefolded, with
+    combining marks removed after NFKD, so "Señor", "SEÑOR" and "senor"
+    all become "senor" and "Jesús" matches "jesus".
+    """
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+def terms(text):
+    """Folded words of a text, in order (repeats kept)."""
+    return WORD.findall(fold(text))
+
+class Corpus:
+    """
+    Verses joined into one newline-separated text, with an offset index
+    mapping character positions back to (book, chapter, verse). Matches are
+    always bounded by a verse's [start, end) offsets, so patterns written
+    for a single verse never run into the next one.
+
+    Books keep their order and are contiguous, so book_span() gives the
+    verse-index range of each one; normalized() caches normalize_text() per
+    verse for extractors that compare quotes against verses.
+    """
+
+    def __init__(self, kjv_data, books):
+        self.kjv_data = kjv_data
+        self.refs = []
+        self.offsets = []
+        self.spans = {}
+        pieces = []
+        pos = 0
+        for book in books:
+            if book not in kjv_data or book in self.spans:
+                continue
+            first = len(self.refs)
+            for chapter_num, verses in kjv_data[book].items():
+                if not isinstance(verses, dict):
+                    continue
+                for verse_num, text in verses.items():
+                    t = text.strip().replace("\n", " ")
+                    self.refs.append((book, str(chapter_num), int(verse_num)))
+                    self.offsets.append(pos)
+                    pieces.append(t)
+                    pos += len(t) + 1
+            self.spans[book] = (first, len(self.refs))
+        self.books = list(self.spans)
+        self.text = "\n".join(pieces)
+        self._normalized = None
+
+    def verse_at(self, offset):
+        return bisect_right(self.offsets, offset) - 1
+
+    def book_span(self, book):
+        """[first, last) verse indices of a book; (0, 0) when it is not in the corpus."""
+        return self.spans.get(book, (0, 0))
+
+    def verse_text(self, idx):
+        end = self.offsets[idx + 1] - 1 if idx + 1 < len(self.offsets) else len(self.text)
+        return self.text[self.offsets[idx]:end]
+
+    def normalized(self, idx):
+        if self._normalized is None:
+            self._normalized = [None] * len(self.refs)
+        n = self._normalized[idx]
+        if n is None:
+            book, chapter, verse = self.refs[idx]
+            n = self._normalized[idx] = normalize_text(self.kjv_data[book][chapter][str(verse)])
+        return n
+
+    def chapters(self, book):
+        """(chapter, verses) of a book, as stored in the KJV data."""
+        for chapter_num, verses in self.kjv_data.get(book, {}).items():
+            if isinstance(verses, dict):
+                yield chapter_num, verses
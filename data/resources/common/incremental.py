@@ -0,0 +1,80 @@
+import hashlib
+import json
+import os
+
+# ---------------------------------------------
+# Per-book content hashes for incremental extraction
+# ---------------------------------------------
+def content_hash(obj):
+    """sha256 of a JSON-serialisable value (dict key order ignored)."""
+    data = json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+def manifest_path(output_file):
+    """god_words.json -> god_words.manifest.json"""
+    root, _ = os.path.splitext(output_file)
+    return f"{root}.manifest.json"
+
+class BookManifest:
+    """
+    JSON record of what each book of an output was extracted from:
+    {"books": {book: {"input": <hash of its verses>, "rules": <hash of the
+    rule set>}}}. A book needs re-extraction when either hash differs or
+    it is missing.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.books = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.books = json.load(f).get("books", {})
+
+    def changed(self, kjv_data, books, rules_hash):
+        return [
+            book for book in books
+            if self.books.get(book) != {"input": content_hash(kjv_data[book]), "rules": rules_hash}
+        ]
+
+    def update(self, kjv_data, books, rules_hash):
+        for book in books:
+            self.books[book] = {"input": content_hash(kjv_data[book]), "rules": rules_hash}
+
+    def save(self):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({"books": self.books}, f, indent=2, ensure_ascii=False)
+
+def splice_citations(old, fresh, changed_books, book_order, key):
+    """
+    Replace the citations of changed_books in `old` with the `fresh` ones
+    of those books (fresh citations of other books are ignored).
+    Unchanged books keep their citations and ids; a fresh citation takes
+    the id of the old citation with the same key(c) in its book, and new
+    ones get ids above the current maximum. Returned in book_order, each
+    book in its own order.
+    """
+    changed = set(changed_books)
+    reusable = {key(c): c["id"] for c in old if c["book"] in changed}
+    next_id = max((c["id"] for c in old), default=0) + 1
+    spliced = [c for c in old if c["book"] not in changed]
+    for c in fresh:
+        if c["book"] not in changed:
+            continue
+        cid = reusable.pop(key(c), None)
+        if cid is None:
+            cid, next_id = next_id, next_id + 1
+        spliced.append({**c, "id": cid})
+    rank = {b: i for i, b in enumerate(book_order)}
+    spliced.sort(key=lambda c: rank.get(c["book"], len(rank)))
+    return spliced
+
+def write_if_changed(path, data):
+    """Write bytes unless the file already holds exactly them; True when written."""
+    if os.path.exists(path) and os.path.getsize(path) == len(data):
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return True
@@ -0,0 +1,159 @@
+from bisect import bisect_left, bisect_right
+from heapq import merge
+
+from common.verse_codec import split_verse_id, verse_id
+
+# ---------------------------------------------
+# Sets of integer ranges
+# ---------------------------------------------
+def coalesce(ranges):
+    """Sorted, disjoint [start, end] ranges; overlapping or adjacent ones are merged."""
+    merged = []
+    for start, end in sorted(ranges):
+        if end < start:
+            raise ValueError(f"empty range {start}-{end}")
+        if merged and start <= merged[-1][1] + 1:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return [(s, e) for s, e in merged]
+
+class IntervalSet:
+    """
+    A set of integers stored as sorted, disjoint, coalesced closed ranges.
+    Building from n ranges sorts once (O(n log n)); add() finds its place
+    by bisection; union, intersection and difference walk both range lists
+    once. len() is the number of members, not of ranges.
+    """
+
+    __slots__ = ("_starts", "_ends")
+
+    def __init__(self, ranges=()):
+        merged = coalesce(ranges)
+        self._starts = [s for s, _ in merged]
+        self._ends = [e for _, e in merged]
+
+    @classmethod
+    def _from_sorted(cls, ranges):
+        s = cls.__new__(cls)
+        s._starts = [a for a, _ in ranges]
+        s._ends = [b for _, b in ranges]
+        return s
+
+    def add(self, start, end=None):
+        """Insert [start, end] (a single member when end is omitted)."""
+        end = start if end is None else end
+        if end < start:
+            raise ValueError(f"empty range {start}-{end}")
+        # Ranges [i, j) overlap or touch the new one and are absorbed by it
+        i = bisect_left(self._ends, start - 1)
+        j = bisect_right(self._starts, end + 1)
+        if i < j:
+            start = min(start, self._starts[i])
+            end = max(end, self._ends[j - 1])
+        self._starts[i:j] = [start]
+        self._ends[i:j] = [end]
+
+    def ranges(self):
+        return list(zip(self._starts, self._ends))
+
+    def __iter__(self):
+        """Members in ascending order."""
+        for start, end in zip(self._starts, self._ends):
+            yield from range(start, end + 1)
+
+    def __len__(self):
+        return sum(self._ends) - sum(self._starts) + len(self._starts)
+
+    def __bool__(self):
+        return bool(self._starts)
+
+    def __contains__(self, x):
+        i = bisect_right(self._starts, x) - 1
+        return i >= 0 and x <= self._ends[i]
+
+    def __eq__(self, other):
+        if not isinstance(other, IntervalSet):
+            return NotImplemented
+        return self._starts == other._starts and self._ends == other._ends
+
+    def __repr__(self):
+        return f"IntervalSet({self.ranges()!r})"
+
+    def union(self, other):
+        merged = []
+        for start, end in merge(zip(self._starts, self._ends), zip(other._starts, other._ends)):
+            if merged and start <= merged[-1][1] + 1:
+                if end > merged[-1][1]:
+                    merged[-1] = (merged[-1][0], end)
+            else:
+                merged.append((start, end))
+        return IntervalSet._from_sorted(merged)
+
+    def intersection(self, other):
+        out = []
+        a, b = self.ranges(), other.ranges()
+        i = j = 0
+        while i < len(a) and j < len(b):
+            start = max(a[i][0], b[j][0])
+            end = min(a[i][1], b[j][1])
+            if start <= end:
+                out.append((start, end))
+            if a[i][1] < b[j][1]:
+                i += 1
+            else:
+                j += 1
+        return IntervalSet._from_sorted(out)
+
+    def difference(self, other):
+        out = []
+        b = other.ranges()
+        j = 0
+        for start, end in zip(self._starts, self._ends):
+            while j < len(b) and b[j][1] < start:
+                j += 1
+            k = j
+            while k < len(b) and b[k][0] <= end:
+                if b[k][0] > start:
+                    out.append((start, b[k][0] - 1))
+                start = max(start, b[k][1] + 1)
+                k += 1
+            if start <= end:
+                out.append((start, end))
+        return IntervalSet._from_sorted(out)
+
+    __or__ = union
+    __and__ = intersection
+    __sub__ = difference
+
+# ---------------------------------------------
+# Citation lists <-> verse sets
+# ---------------------------------------------
+def citation_verses(citations):
+    """IntervalSet of the verse ids covered by citations that have a book and chapter."""
+    return IntervalSet(
+        (verse_id(c['book'], c['chapter'], c['start_verse']),
+         verse_id(c['book'], c['chapter'], c['end_verse']))
+        for c in citations if c['book'] and c['chapter']
+    )
+
+def reference_map(verses):
+    """{book: {chapter: ["3-5", "9", ...]}} of a verse IntervalSet, in canonical order."""
+    refs = {}
+    for start, end in verses.ranges():
+        book, chapter, first = split_verse_id(start)
+        last = end & 0xFF
+        ranges = refs.setdefault(book, {}).setdefault(str(chapter), [])
+        ranges.append(str(first) if first == last else f"{first}-{last}")
+    return refs
+
+def reference_verses(refs):
+    """Inverse of reference_map(): IntervalSet of a {book: {chapter: ["a-b", ...]}} map."""
+    ranges = []
+    for book, chapters in refs.items():
+        for chapter, chapter_ranges in chapters.items():
+            for r in chapter_ranges:
+                first, _, last = r.partition("-")
+                ranges.append((verse_id(book, chapter, first), verse_id(book, chapter, last or first)))
+    return IntervalSet(ranges)
@@ -0,0 +1,71 @@
+from common.corpus import Corpus
+from common.tracing import span
+
+# ---------------------------------------------
+# One-pass speaker extraction over a shared corpus
+# ---------------------------------------------
+class SpeakerStrategy:
+    """
+    One way of finding who speaks where (verse patterns, ONT red-letter
+    markup, model-refined blocks, ...). The engine calls, in order:
+
+      prepare(corpus)            once, with the shared Corpus
+      book(book, chapters)       once per book in `books`, canonical order;
+                                 chapters is a list of (chapter, verses)
+      finish() -> citations      the strategy's result list
+
+    `name` keys the result; `books` are the books the strategy reads.
+    """
+
+    name = "strategy"
+    books = ()
+
+    def prepare(self, corpus):
+        pass
+
+    def book(self, book, chapters):
+        pass
+
+    def finish(self):
+        return []
+
+class SpeakerEngine:
+    """
+    Builds one Corpus over the union of every strategy's books and walks
+    it once, handing each book to the strategies that read it. Regenerating
+    or comparing several speaker datasets then costs a single load and a
+    single traversal instead of one per script.
+    """
+
+    def __init__(self, kjv_data, strategies, book_order=None):
+        self.kjv_data = kjv_data
+        self.strategies = list(strategies)
+        order = list(book_order) if book_order else list(kjv_data)
+        wanted = {b for s in self.strategies for b in s.books}
+        self.books = [b for b in order if b in wanted and b in kjv_data]
+        self.corpus = None
+
+    def run(self):
+        """{strategy name: citations}, in strategy order."""
+        with span("corpus", "speakers", books=len(self.books)):
+            self.corpus = Corpus(self.kjv_data, self.books)
+        for s in self.strategies:
+            with span("prepare", "speakers", strategy=s.name):
+                s.prepare(self.corpus)
+
+        readers = {b: [s for s in self.strategies if b in s.books] for b in self.books}
+        for book in self.books:
+            chapters = list(self.corpus.chapters(book))
+            for s in readers[book]:
+                with span("book", "speakers", strategy=s.name, book=book):
+                    s.book(book, chapters)
+
+        results = {}
+        for s in self.strategies:
+            with span("finish", "speakers", strategy=s.name):
+                results[s.name] = s.finish()
+        return results
+
+def run_strategy(kjv_data, strategy, book_order=None):
+    """Citations of a single strategy (what the per-dataset scripts use)."""
+    return SpeakerEngine(kjv_data, [strategy], book_order).run()[strategy.name]
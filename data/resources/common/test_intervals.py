@@ -0,0 +1,39 @@
+import pytest
+
+from common.intervals import IntervalSet, coalesce, reference_map, reference_verses
+from common.verse_codec import verse_id
+
+def test_coalesce_merges_overlapping_and_adjacent_ranges():
+    assert coalesce([(10, 12), (1, 3), (4, 5), (11, 20), (30, 30)]) == [(1, 5), (10, 20), (30, 30)]
+    with pytest.raises(ValueError):
+        coalesce([(5, 4)])
+
+def test_add_absorbs_every_range_it_touches():
+    s = IntervalSet([(1, 2), (5, 6), (9, 10), (20, 21)])
+    s.add(3, 8)
+    assert s.ranges() == [(1, 10), (20, 21)]
+    s.add(15)
+    assert s.ranges() == [(1, 10), (15, 15), (20, 21)]
+    assert len(s) == 13
+
+def test_containment():
+    s = IntervalSet([(3, 5), (10, 10)])
+    assert [x for x in range(12) if x in s] == [3, 4, 5, 10]
+    assert list(s) == [3, 4, 5, 10]
+    assert not IntervalSet() and 0 not in IntervalSet()
+
+def test_set_operations_match_python_sets():
+    a = IntervalSet([(1, 10), (20, 30), (40, 40)])
+    b = IntervalSet([(5, 22), (29, 45)])
+    for op in ("__or__", "__and__", "__sub__"):
+        expected = getattr(set(a), op)(set(b))
+        assert set(getattr(a, op)(b)) == expected
+        assert getattr(a, op)(b) == IntervalSet((x, x) for x in expected)
+
+def test_reference_map_round_trip():
+    verses = IntervalSet([(verse_id("Genesis", 1, 3), verse_id("Genesis", 1, 5)),
+                          (verse_id("Genesis", 1, 9), verse_id("Genesis", 1, 9)),
+                          (verse_id("John", 3, 16), verse_id("John", 3, 17))])
+    refs = reference_map(verses)
+    assert refs == {"Genesis": {"1": ["3-5", "9"]}, "John": {"3": ["16-17"]}}
+    assert reference_verses(refs) == verses
@@ -0,0 +1,48 @@
+import pytest
+
+from common.intervals import IntervalSet
+from common.verse_bitmap import VerseBitmap, VerseLayout
+from common.verse_codec import verse_id
+
+LAYOUT = VerseLayout([("Genesis", 1, 31), ("Genesis", 2, 25), ("Exodus", 1, 22)])
+MEMBERS = [0, 7, 8, 30, 31, 55, 56, 77]
+
+def bitmap():
+    b = VerseBitmap(LAYOUT)
+    for pos in MEMBERS:
+        b.set(pos)
+    return b
+
+def test_rank_counts_set_bits_before_each_position():
+    b = bitmap()
+    for pos in range(LAYOUT.total + 1):
+        assert b.rank(pos) == sum(m < pos for m in MEMBERS)
+    assert len(b) == len(MEMBERS)
+
+def test_select_inverts_rank():
+    b = bitmap()
+    assert [b.select(k) for k in range(len(MEMBERS))] == MEMBERS
+    assert all(b.rank(b.select(k)) == k for k in range(len(MEMBERS)))
+    with pytest.raises(IndexError):
+        b.select(len(MEMBERS))
+
+def test_layout_positions_and_membership():
+    b = VerseBitmap.from_verses(LAYOUT, IntervalSet([
+        (verse_id("Genesis", 1, 31), verse_id("Genesis", 2, 2)),
+        (verse_id("Exodus", 1, 22), verse_id("Exodus", 1, 22)),
+        (verse_id("Exodus", 2, 1), verse_id("Exodus", 2, 1)),  # outside the layout
+    ]))
+    assert [b.select(k) for k in range(len(b))] == [30, 31, 32, 77]
+    assert LAYOUT.reference(31) == ("Genesis", 2, 1)
+    assert b.contains("Genesis", 2, 2) and not b.contains("Genesis", 2, 3)
+    assert b.chapter("Genesis", 2) == {1, 2}
+    assert LAYOUT.position("Genesis", 1, 32) is None
+
+def test_save_load_round_trip(tmp_path):
+    b = bitmap()
+    b.save(tmp_path / "x.bin")
+    LAYOUT.save(tmp_path / "layout.json")
+    loaded = VerseBitmap.load(VerseLayout.load(tmp_path / "layout.json"), tmp_path / "x.bin")
+    assert loaded.data == b.data and loaded.layout.total == LAYOUT.total
+    with pytest.raises(ValueError):
+        VerseBitmap(LAYOUT, b"\0")
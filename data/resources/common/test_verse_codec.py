@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from common.verse_codec import (
+    SPANISH_BOOKS, format_batch, format_range, format_reference, pack_batch, parse_batch,
+    parse_reference, split_verse_id, unpack_batch, verse_id,
+)
+
+def test_pack_unpack_round_trip():
+    ordinals, chapters, verses = [1, 19, 66, 43], [1, 119, 22, 3], [1, 176, 21, 16]
+    ids = pack_batch(ordinals, chapters, verses)
+    assert ids.dtype == np.uint32
+    assert [a.tolist() for a in unpack_batch(ids)] == [ordinals, chapters, verses]
+    assert ids.tolist() == [verse_id(b, c, v) for b, c, v in
+                            [("Genesis", 1, 1), ("Psalms", 119, 176), ("Revelation", 22, 21), ("John", 3, 16)]]
+
+@pytest.mark.parametrize("text", [
+    "John 3:16", "John 3.16", "John.3.16", "John .3.16", "Juan 3:16",
+])
+def test_parse_single_reference_formats(text):
+    vid = verse_id("John", 3, 16)
+    assert parse_reference(text) == (vid, vid)
+
+@pytest.mark.parametrize("text, expected", [
+    ("Gen.1.1-Gen.1.3", "Genesis 1:1-3"),
+    ("Genesis 1:1-Genesis 1.3", "Genesis 1:1-3"),
+    ("Genesis 1:31-2:3", "Genesis 1:31-2:3"),
+    ("Gen.50.26-Exod.1.1", "Genesis 50:26-Exodus 1:1"),
+])
+def test_parse_format_range_round_trip(text, expected):
+    assert format_range(*parse_reference(text)) == expected
+    assert parse_reference(expected) == parse_reference(text)
+
+def test_unparseable_references():
+    assert parse_reference("Nothing 1:1") is None
+    assert parse_reference("Genesis") is None
+    starts, ends = parse_batch(["Genesis 1:1", "Nothing 1:1", "Genesis 1:1"])
+    assert starts.tolist() == [verse_id("Genesis", 1, 1), 0, verse_id("Genesis", 1, 1)]
+
+def test_format_batch_matches_format_reference():
+    ids = [verse_id("Genesis", 1, 1), verse_id("Matthew", 5, 3), verse_id("Genesis", 1, 1)]
+    for kwargs in ({}, {"sep": ".", "names": SPANISH_BOOKS}):
+        assert format_batch(ids, **kwargs) == [format_reference(v, **kwargs) for v in ids]
+    assert split_verse_id(ids[1]) == ("Matthew", 5, 3)
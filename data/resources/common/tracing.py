@@ -0,0 +1,131 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+# ---------------------------------------------
+# Lightweight span tracing for the data pipelines
+# ---------------------------------------------
+class _NullSpan:
+    """Returned while tracing is off: entering and leaving it does nothing."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    __slots__ = ("tracer", "name", "cat", "args", "ts", "start")
+
+    def __init__(self, tracer, name, cat, args):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.ts = time.time_ns() // 1000
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        dur = (time.perf_counter_ns() - self.start) // 1000
+        self.tracer._record(self.name, self.cat, self.ts, dur, self.args)
+        return False
+
+    def set(self, **args):
+        """Attach values only known once the span is running (e.g. a block count)."""
+        self.args.update(args)
+
+class Tracer:
+    """
+    Nested spans (book -> chapter -> block -> request, or step -> batch)
+    recorded as Chrome trace "complete" events. Nesting comes from the
+    timestamps, so spans opened in worker threads line up under their
+    thread id. While disabled, span() hands back one shared no-op object.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.events = []
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def span(self, name, cat="pipeline", **args):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, cat, args)
+
+    def _record(self, name, cat, ts, dur, args):
+        event = {
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": ts,
+            "dur": dur,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            self.events.append(event)
+
+    def merge(self, events):
+        """Add events recorded in another process (e.g. a pool worker)."""
+        with self._lock:
+            self.events.extend(events)
+
+    def export_chrome_trace(self, path):
+        """Write a trace that chrome://tracing and ui.perfetto.dev can open."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+        print(f"Wrote {len(self.events)} spans to {path}")
+
+    def summary(self):
+        """Per span name: count, total, mean and max duration in seconds, slowest total first."""
+        stats = defaultdict(lambda: [0, 0, 0])
+        for e in self.events:
+            s = stats[e["name"]]
+            s[0] += 1
+            s[1] += e["dur"]
+            s[2] = max(s[2], e["dur"])
+        rows = [
+            (name, count, total / 1e6, total / count / 1e6, peak / 1e6)
+            for name, (count, total, peak) in stats.items()
+        ]
+        return sorted(rows, key=lambda r: r[2], reverse=True)
+
+    def print_summary(self):
+        print(f"{'stage':<24}{'count':>8}{'total s':>12}{'mean ms':>12}{'max ms':>12}")
+        for name, count, total, mean, peak in self.summary():
+            print(f"{name:<24}{count:>8}{total:>12.3f}{mean * 1000:>12.2f}{peak * 1000:>12.2f}")
+
+    def finish(self, path):
+        """Export and print the summary if tracing was on."""
+        if self.enabled and path:
+            self.export_chrome_trace(path)
+            self.print_summary()
+
+TRACER = Tracer()
+
+def span(name, cat="pipeline", **args):
+    return TRACER.span(name, cat, **args)
+
+# SEEKFIRST_TRACE=<file.json> turns tracing on for scripts without a --trace flag
+TRACE_ENV = "SEEKFIRST_TRACE"
+
+def enable_from_env():
+    path = os.environ.get(TRACE_ENV)
+    if path:
+        TRACER.enable()
+    return path
@@ -0,0 +1,174 @@
+import json
+import os
+from bisect import bisect_right
+
+from common.corpus import load_kjv_json
+from common.verse_codec import BOOKS, split_verse_id
+
+# ---------------------------------------------
+# Canonical verse order
+# ---------------------------------------------
+class VerseLayout:
+    """
+    Every verse of a versification (KJV.json) numbered 0..total-1 in
+    canonical book order. Bit i of a VerseBitmap is the i-th verse here,
+    and a chapter's verses are the contiguous bits chapter_span() returns.
+    """
+
+    def __init__(self, chapters):
+        # chapters: [(book, chapter, verse_count)] in canonical order
+        self.chapters = list(chapters)
+        self.offsets = {}
+        self.starts = []
+        pos = 0
+        for book, chapter, count in self.chapters:
+            self.offsets[(book, int(chapter))] = (pos, count)
+            self.starts.append(pos)
+            pos += count
+        self.total = pos
+
+    @classmethod
+    def from_kjv(cls, kjv_data):
+        chapters = []
+        for book in BOOKS:
+            for chapter_num, verses in kjv_data.get(book, {}).items():
+                if isinstance(verses, dict):
+                    chapters.append((book, int(chapter_num), max(map(int, verses))))
+        return cls(chapters)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls((book, i, count)
+                   for book, counts in data["books"] for i, count in enumerate(counts, 1))
+
+    def save(self, path):
+        """{"total": n, "books": [[book, [verses in chapter 1, 2, ...]]]}"""
+        books = []
+        for book, _, count in self.chapters:
+            if not books or books[-1][0] != book:
+                books.append([book, []])
+            books[-1][1].append(count)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"total": self.total, "books": books}, f, ensure_ascii=False)
+
+    def chapter_span(self, book, chapter):
+        """(first bit, verse count) of a chapter; (0, 0) when unknown."""
+        return self.offsets.get((book, int(chapter)), (0, 0))
+
+    def position(self, book, chapter, verse):
+        """Bit of a verse, or None outside the layout."""
+        first, count = self.chapter_span(book, chapter)
+        verse = int(verse)
+        return first + verse - 1 if 1 <= verse <= count else None
+
+    def reference(self, pos):
+        """position() -> (book, chapter, verse)"""
+        i = bisect_right(self.starts, pos) - 1
+        book, chapter, _ = self.chapters[i]
+        return book, int(chapter), pos - self.starts[i] + 1
+
+# ---------------------------------------------
+# Membership bitmaps with rank / select
+# ---------------------------------------------
+POPCOUNT = bytes(bin(i).count("1") for i in range(256))
+
+class VerseBitmap:
+    """
+    One bit per verse of a VerseLayout, least significant bit first within
+    each byte, written as raw bytes (~4 KB for the KJV's 31,102 verses).
+    Membership and rank are O(1) through a per-byte running count; select
+    bisects that count and scans one byte.
+    """
+
+    def __init__(self, layout, data=None):
+        self.layout = layout
+        size = (layout.total + 7) // 8
+        self.data = bytearray(data) if data is not None else bytearray(size)
+        if len(self.data) != size:
+            raise ValueError(f"bitmap has {len(self.data)} bytes, layout needs {size}")
+        self._ranks = None
+
+    @classmethod
+    def from_verses(cls, layout, verses):
+        """Bitmap of an IntervalSet of verse_id()s; verses outside the layout are skipped."""
+        bitmap = cls(layout)
+        for vid in verses:
+            pos = layout.position(*split_verse_id(vid))
+            if pos is not None:
+                bitmap.set(pos)
+        return bitmap
+
+    @classmethod
+    def load(cls, layout, path):
+        with open(path, 'rb') as f:
+            return cls(layout, f.read())
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.data)
+
+    def set(self, pos):
+        self.data[pos >> 3] |= 1 << (pos & 7)
+        self._ranks = None
+
+    def __getitem__(self, pos):
+        return bool(self.data[pos >> 3] >> (pos & 7) & 1)
+
+    def contains(self, book, chapter, verse):
+        pos = self.layout.position(book, chapter, verse)
+        return pos is not None and self[pos]
+
+    def chapter(self, book, chapter):
+        """Set verse numbers of one chapter."""
+        first, count = self.layout.chapter_span(book, chapter)
+        return {v for v in range(1, count + 1) if self[first + v - 1]}
+
+    def _rank_table(self):
+        if self._ranks is None:
+            ranks = [0] * (len(self.data) + 1)
+            for i, byte in enumerate(self.data):
+                ranks[i + 1] = ranks[i] + POPCOUNT[byte]
+            self._ranks = ranks
+        return self._ranks
+
+    def rank(self, pos):
+        """Set bits before pos."""
+        ranks = self._rank_table()
+        if pos >= self.layout.total:
+            return ranks[-1]
+        return ranks[pos >> 3] + POPCOUNT[self.data[pos >> 3] & ((1 << (pos & 7)) - 1)]
+
+    def select(self, k):
+        """Position of the k-th set bit (0-based); IndexError past the last one."""
+        ranks = self._rank_table()
+        if not 0 <= k < ranks[-1]:
+            raise IndexError(k)
+        i = bisect_right(ranks, k) - 1
+        byte, seen = self.data[i], ranks[i]
+        for bit in range(8):
+            if byte >> bit & 1:
+                if seen == k:
+                    return i * 8 + bit
+                seen += 1
+
+    def __len__(self):
+        """Number of set bits."""
+        return self._rank_table()[-1]
+
+def write_bitmap(verses, bitmap_path, kjv_path="../../bibles/KJV.json",
+                 layout_path="../verse_layout.json"):
+    """
+    Save the bitmap of a verse IntervalSet next to its reference list,
+    plus the KJV layout it is indexed by (shared by every dataset).
+    """
+    if not os.path.exists(kjv_path):
+        print(f"[WARN] {kjv_path} not found; skipping {bitmap_path}")
+        return None
+    layout = VerseLayout.from_kjv(load_kjv_json(kjv_path))
+    layout.save(layout_path)
+    bitmap = VerseBitmap.from_verses(layout, verses)
+    bitmap.save(bitmap_path)
+    print(f"Created {bitmap_path} ({len(bitmap.data)} bytes, {len(bitmap)} of {layout.total} verses)")
+    return bitmap
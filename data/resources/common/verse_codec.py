@@ -0,0 +1,206 @@
+import json
+import re
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+
+# ---------------------------------------------
+# Book table (canonical order from book-metadata.json)
+# ---------------------------------------------
+BOOK_METADATA = Path(__file__).resolve().parent.parent / "book-metadata.json"
+
+def _load_books(path=BOOK_METADATA):
+    with open(path, 'r', encoding='utf-8') as f:
+        books = tuple(json.load(f))
+    if len(books) != 66:
+        raise ValueError(f"{path} lists {len(books)} books, expected 66")
+    return books
+
+BOOKS = _load_books()
+OT_COUNT = 39
+SPANISH_BOOKS = (
+    "Génesis", "Éxodo", "Levítico", "Números", "Deuteronomio", "Josué", "Jueces", "Rut",
+    "1 Samuel", "2 Samuel", "1 Reyes", "2 Reyes", "1 Crónicas", "2 Crónicas", "Esdras",
+    "Nehemías", "Ester", "Job", "Salmos", "Proverbios", "Eclesiastés", "Cantares",
+    "Isaías", "Jeremías", "Lamentaciones", "Ezequiel", "Daniel", "Oseas", "Joel", "Amós",
+    "Abdías", "Jonás", "Miqueas", "Nahúm", "Habacuc", "Sofonías", "Hageo", "Zacarías",
+    "Malaquías",
+    "Mateo", "Marcos", "Lucas", "Juan", "Hechos", "Romanos", "1 Corintios", "2 Corintios",
+    "Gálatas", "Efesios", "Filipenses", "Colosenses", "1 Tesalonicenses",
+    "2 Tesalonicenses", "1 Timoteo", "2 Timoteo", "Tito", "Filemón", "Hebreos", "Santiago",
+    "1 Pedro", "2 Pedro", "1 Juan", "2 Juan", "3 Juan", "Judas", "Apocalipsis",
+)
+# OpenBible.info cross-reference abbreviations (cross_refs/ingest_crossrefs*.py)
+OSIS_BOOKS = (
+    "Gen", "Exod", "Lev", "Num", "Deut", "Josh", "Judg", "Ruth", "1Sam", "2Sam", "1Kgs",
+    "2Kgs", "1Chr", "2Chr", "Ezra", "Neh", "Esth", "Job", "Ps", "Prov", "Eccl", "Song",
+    "Isa", "Jer", "Lam", "Ezek", "Dan", "Hos", "Joel", "Amos", "Obad", "Jonah", "Mic",
+    "Nah", "Hab", "Zeph", "Hag", "Zech", "Mal",
+    "Matt", "Mark", "Luke", "John", "Acts", "Rom", "1Cor", "2Cor", "Gal", "Eph", "Phil",
+    "Col", "1Thess", "2Thess", "1Tim", "2Tim", "Titus", "Phlm", "Heb", "Jas", "1Pet",
+    "2Pet", "1John", "2John", "3John", "Jude", "Rev",
+)
+BOOK_ORDINAL = {book: i for i, book in enumerate(BOOKS, 1)}
+
+def book_key(name):
+    """Lookup form of a book name: casefolded, accents, dots and spaces removed."""
+    decomposed = unicodedata.normalize("NFKD", name.casefold())
+    return "".join(ch for ch in decomposed if ch.isalnum() and not unicodedata.combining(ch))
+
+_ALIASES = {}
+for _names in (BOOKS, SPANISH_BOOKS, OSIS_BOOKS):
+    for _i, _name in enumerate(_names, 1):
+        _ALIASES.setdefault(book_key(_name), _i)
+_ALIASES.update({book_key(n): BOOK_ORDINAL[b] for n, b in [
+    ("Song of Songs", "Song of Solomon"), ("Psalm", "Psalms"), ("Philem", "Philemon"),
+]})
+
+@lru_cache(maxsize=None)
+def book_ordinal(name):
+    """1-based canonical ordinal of a book in any known naming; None when unknown."""
+    return _ALIASES.get(book_key(name))
+
+def canonical_book(name):
+    """English KJV name of a book as named in any translation; None when unknown."""
+    ordinal = book_ordinal(name)
+    return BOOKS[ordinal - 1] if ordinal else None
+
+# ---------------------------------------------
+# Packed ids
+# ---------------------------------------------
+def verse_id(book, chapter, verse):
+    """
+    ordinal << 16 | chapter << 8 | verse, with books numbered from 1 in
+    canonical order. Ids sort in reading order and the verses of one
+    chapter are consecutive integers, so a verse range is an id range.
+    """
+    return BOOK_ORDINAL[book] << 16 | int(chapter) << 8 | int(verse)
+
+def split_verse_id(vid):
+    """verse_id() -> (book, chapter, verse)"""
+    return BOOKS[(vid >> 16) - 1], (vid >> 8) & 0xFF, vid & 0xFF
+
+def testament(vid):
+    return "OT" if vid >> 16 <= OT_COUNT else "NT"
+
+# ---------------------------------------------
+# Reference strings
+# ---------------------------------------------
+# "Genesis 1:1", "Genesis 1.1", "Gen.1.1", "1Sam.3.4", "Job .38.4", "Mateo 5:3",
+# "Psalms 23" (whole chapter); book names may not contain "-"
+SINGLE = re.compile(r"^\s*(?P<book>[^\-]+?)\s*\.?\s*(?P<chapter>\d+)(?:\s*[:.]\s*(?P<verse>\d+))?\s*$")
+# Right-hand side of "a-b" without a book: "3" or "2:4" / "2.4"
+TAIL = re.compile(r"^\s*(\d+)(?:\s*[:.]\s*(\d+))?\s*$")
+
+def _single(text):
+    m = SINGLE.match(text)
+    if not m:
+        return None
+    ordinal = book_ordinal(m["book"])
+    if ordinal is None:
+        return None
+    return ordinal, int(m["chapter"]), int(m["verse"]) if m["verse"] else None
+
+def parse_reference(text):
+    """
+    (start_id, end_id) of a reference in any of the formats the pipelines
+    meet: full or abbreviated English names, Spanish names, ":" or "."
+    separators, and ranges written "Gen.1.1-Gen.1.3",
+    "Genesis 1:1-Genesis 1.3", "Genesis 1:1-3" or "Genesis 1:31-2:3". A
+    chapter without a verse spans the whole chapter (verses 1-255). None
+    when the text is not a reference.
+    """
+    left, _, right = text.partition("-")
+    start = _single(left)
+    if start is None:
+        return None
+    ordinal, chapter, verse = start
+    first = ordinal << 16 | chapter << 8 | (verse or 1)
+    last = ordinal << 16 | chapter << 8 | (verse or 0xFF)
+    if right:
+        tail = TAIL.match(right)
+        if tail:
+            a, b = int(tail[1]), tail[2]
+            if b is not None:
+                last = ordinal << 16 | a << 8 | int(b)
+            elif verse is None:
+                last = ordinal << 16 | a << 8 | 0xFF
+            else:
+                last = ordinal << 16 | chapter << 8 | a
+        else:
+            end = _single(right)
+            if end is None:
+                return None
+            o, c, v = end
+            last = o << 16 | c << 8 | (v or 0xFF)
+    return first, last
+
+def format_reference(vid, sep=":", names=BOOKS):
+    """"Genesis 1:1" (sep="." gives "Genesis 1.1"; names=SPANISH_BOOKS gives "Génesis 1:1")."""
+    return f"{names[(vid >> 16) - 1]} {(vid >> 8) & 0xFF}{sep}{vid & 0xFF}"
+
+def format_range(start, end, sep=":", names=BOOKS):
+    """Shortest display form: "Genesis 1:1", "Genesis 1:1-3", "Genesis 1:31-2:3" or "Genesis 50:26-Exodus 1:1"."""
+    head = format_reference(start, sep, names)
+    if end == start:
+        return head
+    if end >> 16 != start >> 16:
+        return f"{head}-{format_reference(end, sep, names)}"
+    if end >> 8 == start >> 8:
+        return f"{head}-{end & 0xFF}"
+    return f"{head}-{(end >> 8) & 0xFF}{sep}{end & 0xFF}"
+
+# ---------------------------------------------
+# Batch codec (NumPy)
+# ---------------------------------------------
+def pack_batch(ordinals, chapters, verses):
+    import numpy as np
+    return (np.asarray(ordinals, dtype=np.uint32) << 16
+            | np.asarray(chapters, dtype=np.uint32) << 8
+            | np.asarray(verses, dtype=np.uint32))
+
+def unpack_batch(ids):
+    """(ordinals, chapters, verses) arrays of packed ids."""
+    import numpy as np
+    ids = np.asarray(ids, dtype=np.uint32)
+    return ids >> 16, (ids >> 8) & 0xFF, ids & 0xFF
+
+def parse_batch(texts):
+    """
+    (starts, ends) uint32 arrays for a sequence of reference strings; 0
+    marks an unparseable entry. Each distinct string is parsed once, which
+    is what makes cross-reference columns (a few tens of thousands of
+    distinct values over hundreds of thousands of rows) cheap.
+    """
+    import numpy as np
+    codes = {}
+    inverse = np.fromiter((codes.setdefault(t, len(codes)) for t in texts), dtype=np.int64, count=len(texts))
+    parsed = np.zeros((len(codes), 2), dtype=np.uint32)
+    for text, i in codes.items():
+        ref = parse_reference(text)
+        if ref:
+            parsed[i] = ref
+    return parsed[inverse, 0], parsed[inverse, 1]
+
+def format_batch(ids, sep=":", names=BOOKS):
+    """
+    format_reference() of every id. Distinct ids are formatted once from
+    "<book> " and "<chapter><sep><verse>" lookup tables and scattered back,
+    so the cost follows the number of distinct verses.
+    """
+    import numpy as np
+    uniques, inverse = np.unique(np.asarray(ids, dtype=np.uint32), return_inverse=True)
+    heads = [""] + [f"{name} " for name in names]
+    tails = _verse_tails(sep)
+    ordinals = (uniques >> 16).tolist()
+    low = (uniques & 0xFFFF).tolist()
+    formatted = np.array([heads[o] + tails[cv] for o, cv in zip(ordinals, low)], dtype=object)
+    return formatted[inverse].tolist()
+
+_TAILS = {}
+
+def _verse_tails(sep):
+    """"<chapter><sep><verse>" for every chapter << 8 | verse."""
+    if sep not in _TAILS:
+        _TAILS[sep] = [f"{cv >> 8}{sep}{cv & 0xFF}" for cv in range(1 << 16)]
+    return _TAILS[sep]
@@ -0,0 +1,58 @@
+import numpy as np
+
+# ---------------------------------------------
+# KJV <-> translation verse numbering
+# ---------------------------------------------
+class VersificationMap:
+    """
+    Verse ids (verse_codec.verse_id()) that a translation numbers
+    differently from the KJV, as two sorted lookup tables:
+
+      forward   KJV id -> translation id (0 = no counterpart)
+      reverse   translation id -> KJV id (0 = no counterpart)
+
+    Ids missing from a table are numbered the same on both sides, so a
+    translation that follows the KJV has empty tables. Projection is one
+    np.searchsorted over the whole batch.
+    """
+
+    def __init__(self, kjv_ids=(), translation_ids=(), reverse_ids=(), reverse_kjv_ids=()):
+        self.forward = _table(kjv_ids, translation_ids)
+        self.reverse = _table(reverse_ids, reverse_kjv_ids)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["kjv"], data["translation"], data["reverse_translation"], data["reverse_kjv"])
+
+    def save(self, path):
+        np.savez(path, kjv=self.forward[0], translation=self.forward[1],
+                 reverse_translation=self.reverse[0], reverse_kjv=self.reverse[1])
+
+    def __len__(self):
+        return len(self.forward[0]) + len(self.reverse[0])
+
+    def to_translation(self, ids):
+        """Translation ids of KJV-numbered ids (uint32 array; 0 where the translation has no such verse)."""
+        return project(ids, self.forward)
+
+    def to_kjv(self, ids):
+        """KJV ids of translation-numbered ids (uint32 array; 0 where the KJV has no such verse)."""
+        return project(ids, self.reverse)
+
+def _table(keys, values):
+    keys = np.asarray(keys, dtype=np.uint32)
+    values = np.asarray(values, dtype=np.uint32)
+    order = np.argsort(keys, kind="stable")
+    return keys[order], values[order]
+
+def project(ids, table):
+    """ids with every key of a (sorted keys, values) table replaced by its value."""
+    ids = np.asarray(ids, dtype=np.uint32)
+    keys, values = table
+    if not len(keys):
+        return ids.copy()
+    pos = np.searchsorted(keys, ids)
+    pos[pos == len(keys)] = 0
+    hit = keys[pos] == ids
+    return np.where(hit, values[pos], ids)
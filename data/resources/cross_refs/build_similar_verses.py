@@ -0,0 +1,176 @@
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from scipy import sparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.corpus import load_kjv_json, terms
+from common.tracing import TRACER, enable_from_env, span
+from common.verse_codec import canonical_book, format_reference, testament, verse_id
+
+# ---------------------------------------------
+# Settings
+# ---------------------------------------------
+KJV_PATH = "../../bibles/KJV.json"
+OUT_DBS = {"OT": "similar_ot.db", "NT": "similar_nt.db"}
+REASON = "similar-text"
+TOP_K = 10
+MIN_SCORE = 0.2  # cosine similarity below this is not worth showing
+MAX_DF = 0.25  # terms in more verses than this share carry no signal (the, and, of ...)
+BLOCK_ROWS = 1024  # verses per sparse product block; bounds memory to one block's row of scores
+
+# ---------------------------------------------
+# TF-IDF matrix
+# ---------------------------------------------
+def verse_rows(kjv_data):
+    """[(verse id, text)] in canonical order."""
+    rows = []
+    for book, chapters in kjv_data.items():
+        canonical = canonical_book(book)
+        if canonical is None:
+            continue
+        for chapter_num, verses in chapters.items():
+            if isinstance(verses, dict):
+                rows.extend((verse_id(canonical, chapter_num, v), text) for v, text in verses.items())
+    rows.sort(key=lambda r: r[0])
+    return rows
+
+def tfidf_matrix(texts, max_df=MAX_DF):
+    """
+    L2-normalised CSR matrix (verses x terms) with sublinear tf and
+    smoothed idf; terms found in one verse only or in more than max_df of
+    them are dropped, which keeps the products sparse.
+    """
+    vocab = {}
+    indices, indptr, counts = [], [0], []
+    for text in texts:
+        tf = {}
+        for word in terms(text):
+            col = vocab.setdefault(word, len(vocab))
+            tf[col] = tf.get(col, 0) + 1
+        indices.extend(tf.keys())
+        counts.extend(tf.values())
+        indptr.append(len(indices))
+    n = len(texts)
+    tf = sparse.csr_matrix((np.asarray(counts, dtype=np.float32), indices, indptr), shape=(n, len(vocab)))
+    df = np.bincount(tf.indices, minlength=len(vocab))
+    keep = (df > 1) & (df <= max(2, max_df * n))
+    tf = tf[:, np.flatnonzero(keep)].tocsr()
+    idf = np.log((1 + n) / (1 + df[keep])).astype(np.float32) + 1.0
+    tf.data = 1.0 + np.log(tf.data)
+    x = tf @ sparse.diags(idf)
+    norms = np.sqrt(np.asarray(x.multiply(x).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms) @ x, int(keep.sum())
+
+def top_similar(x, k=TOP_K, min_score=MIN_SCORE, block_rows=BLOCK_ROWS):
+    """
+    Yield (row, [(other row, score)]) for every row, best first. Cosine
+    scores come from X[block] @ X.T one block of rows at a time, so peak
+    memory is one sparse block of scores rather than the n x n matrix.
+    """
+    xt = x.T.tocsc()
+    for start in range(0, x.shape[0], block_rows):
+        with span("block", "similar", start=start):
+            scores = (x[start:start + block_rows] @ xt).tocsr()
+            for i in range(scores.shape[0]):
+                row = start + i
+                lo, hi = scores.indptr[i], scores.indptr[i + 1]
+                cols, vals = scores.indices[lo:hi], scores.data[lo:hi]
+                mask = (cols != row) & (vals >= min_score)
+                cols, vals = cols[mask], vals[mask]
+                if len(vals) > k:
+                    part = np.argpartition(-vals, k)[:k]
+                    cols, vals = cols[part], vals[part]
+                order = np.argsort(-vals, kind="stable")
+                yield row, [(int(cols[j]), float(vals[j])) for j in order]
+
+# ---------------------------------------------
+# Output (same table as the cross-reference shards)
+# ---------------------------------------------
+def create_database(path):
+    """cross_references as in ingest_crossrefs_shards.py, plus reason and the raw score."""
+    conn = sqlite3.connect(path)
+    conn.execute("DROP TABLE IF EXISTS cross_references")
+    conn.execute('''
+        CREATE TABLE cross_references (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            from_verse TEXT NOT NULL,
+            to_verse TEXT NOT NULL,
+            votes INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            reason TEXT NOT NULL DEFAULT 'cross-reference',
+            score REAL
+        )
+    ''')
+    conn.execute("CREATE INDEX idx_from_verse ON cross_references(from_verse)")
+    conn.execute("CREATE INDEX idx_to_verse ON cross_references(to_verse)")
+    return conn
+
+def write_similar(rows, pairs, out_dir="."):
+    """
+    Insert every (verse, similar verse) pair into the OT or NT database of
+    its from-verse. votes holds round(score * 100), so code that weighs
+    cross references by votes can rank these the same way.
+    """
+    conns = {t: create_database(os.path.join(out_dir, name)) for t, name in OUT_DBS.items()}
+    totals = dict.fromkeys(conns, 0)
+    batch = {t: [] for t in conns}
+    for row, similar in pairs:
+        from_id = rows[row][0]
+        t = testament(from_id)
+        for other, score in similar:
+            batch[t].append((format_reference(from_id), format_reference(rows[other][0]),
+                             round(score * 100), REASON, round(score, 4)))
+        if len(batch[t]) >= 5000:
+            totals[t] += flush(conns[t], batch[t])
+    for t, conn in conns.items():
+        totals[t] += flush(conn, batch[t])
+        conn.commit()
+        conn.close()
+    return totals
+
+def flush(conn, batch):
+    conn.executemany('''
+        INSERT INTO cross_references (from_verse, to_verse, votes, reason, score)
+        VALUES (?, ?, ?, ?, ?)
+    ''', batch)
+    n = len(batch)
+    batch.clear()
+    return n
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Precompute TF-IDF 'similar verses' into cross-reference style OT/NT databases")
+    parser.add_argument("--kjv", default=KJV_PATH, help="translation JSON to compare verses in")
+    parser.add_argument("--out-dir", default=".")
+    parser.add_argument("--top-k", type=int, default=TOP_K)
+    parser.add_argument("--min-score", type=float, default=MIN_SCORE)
+    parser.add_argument("--max-df", type=float, default=MAX_DF)
+    parser.add_argument("--block-rows", type=int, default=BLOCK_ROWS)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with span("load"):
+        rows = verse_rows(load_kjv_json(args.kjv))
+    with span("tfidf"):
+        x, terms = tfidf_matrix([text for _, text in rows], args.max_df)
+    print(f"{len(rows)} verses, {terms} terms, {x.nnz} non-zeros")
+    with span("similar"):
+        pairs = top_similar(x, args.top_k, args.min_score, args.block_rows)
+        totals = write_similar(rows, pairs, args.out_dir)
+    for t, name in OUT_DBS.items():
+        print(f"  {name}: {totals[t]:,} pairs (reason '{REASON}')")
+    print(f"Done in {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    # Set SEEKFIRST_TRACE=trace.json to get a Chrome/Perfetto trace and per-stage summary
+    trace_path = enable_from_env()
+    main()
+    TRACER.finish(trace_path)
@@ -1,8 +1,15 @@
 import csv
 import os
 import sqlite3
+import sys
 import urllib.request
 import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.tracing import TRACER, enable_from_env, span
+from common.verse_codec import format_reference, parse_reference
 
 def download_and_extract_crossrefs():
     """Download and extract cross-references data if needed"""
@@ -47,126 +54,20 @@ def download_and_extract_crossrefs():
         print(f"Error extracting zip file: {str(e)}")
         return False
 
-def get_book_abbreviations():
-    """Return dictionary mapping abbreviations to full book names"""
-    return {
-        # Old Testament
-        'Gen.': 'Genesis',
-        'Exod.': 'Exodus',
-        'Lev.': 'Leviticus',
-        'Num.': 'Numbers',
-        'Deut.': 'Deuteronomy',
-        'Josh.': 'Joshua',
-        'Judg.': 'Judges',
-        'Ruth': 'Ruth',
-        '1Sam.': '1 Samuel',
-        '2Sam.': '2 Samuel',
-        '1Kgs.': '1 Kings',
-        '2Kgs.': '2 Kings',
-        '1Chr.': '1 Chronicles',
-        '2Chr.': '2 Chronicles',
-        'Ezra': 'Ezra',
-        'Neh.': 'Nehemiah',
-        'Esth.': 'Esther',
-        'Job': 'Job',
-        'Ps.': 'Psalms',
-        'Prov.': 'Proverbs',
-        'Eccl.': 'Ecclesiastes',
-        'Song': 'Song of Solomon',
-        'Isa.': 'Isaiah',
-        'Jer.': 'Jeremiah',
-        'Lam.': 'Lamentations',
-        'Ezek.': 'Ezekiel',
-        'Dan.': 'Daniel',
-        'Hos.': 'Hosea',
-        'Joel': 'Joel',
-        'Amos': 'Amos',
-        'Obad.': 'Obadiah',
-        'Jonah': 'Jonah',
-        'Mic.': 'Micah',
-        'Nah.': 'Nahum',
-        'Hab.': 'Habakkuk',
-        'Zeph.': 'Zephaniah',
-        'Hag.': 'Haggai',
-        'Zech.': 'Zechariah',
-        'Mal.': 'Malachi',
-        
-        # New Testament
-        'Matt.': 'Matthew',
-        'Mark': 'Mark',
-        'Luke': 'Luke',
-        'John': 'John',
-        'Acts': 'Acts',
-        'Rom.': 'Romans',
-        '1Cor.': '1 Corinthians',
-        '2Cor.': '2 Corinthians',
-        'Gal.': 'Galatians',
-        'Eph.': 'Ephesians',
-        'Phil.': 'Philippians',
-        'Col.': 'Colossians',
-        '1Thess.': '1 Thessalonians',
-        '2Thess.': '2 Thessalonians',
-        '1Tim.': '1 Timothy',
-        '2Tim.': '2 Timothy',
-        'Titus': 'Titus',
-        'Philem.': 'Philemon',
-        'Heb.': 'Hebrews',
-        'Jas.': 'James',
-        '1Pet.': '1 Peter',
-        '2Pet.': '2 Peter',
-        '1John': '1 John',
-        '2John': '2 John',
-        '3John': '3 John',
-        'Jude': 'Jude',
-        'Rev.': 'Revelation'
-    }
-
 def expand_verse_reference(verse_ref):
-    """Convert abbreviated verse reference to full book name"""
-    book_map = get_book_abbreviations()
-    
-    # Handle verse ranges (e.g., "Romans 2.12-Rom.2.16")
-    if '-' in verse_ref:
-        parts = verse_ref.split('-')
-        expanded_parts = []
-        
-        for part in parts:
-            part = part.strip()
-            expanded_parts.append(expand_single_reference(part, book_map))
-        
-        return '-'.join(expanded_parts)
-    
-    # Handle single verse reference
-    return expand_single_reference(verse_ref, book_map)
-
-def expand_single_reference(verse_ref, book_map):
-    """Helper function to expand a single verse reference"""
-    verse_ref = verse_ref.strip()
-    
-    # Try exact matches first (with dots)
-    for abbrev, full_name in book_map.items():
-        if verse_ref.startswith(abbrev):
-            remainder = verse_ref[len(abbrev):].lstrip(' .')
-            return full_name + ' ' + remainder
-    
-    # Try matches with space before dot (e.g., "Job .38.4")
-    for abbrev, full_name in book_map.items():
-        book_name = abbrev.rstrip('.')  # Remove trailing dot from abbreviation
-        if verse_ref.startswith(book_name + ' .'):
-            # Found pattern like "Job .38.4"
-            remainder = verse_ref[len(book_name + ' .'):].lstrip()
-            return full_name + ' ' + remainder
-        elif verse_ref.startswith(book_name + '.'):
-            # Found pattern like "Job.38.4"
-            remainder = verse_ref[len(book_name + '.'):].lstrip()
-            return full_name + ' ' + remainder
-        elif verse_ref.startswith(book_name + ' ') and book_name == full_name:
-            # Found non-abbreviated book with space (e.g., "Job 38.4")
-            remainder = verse_ref[len(book_name + ' '):].lstrip()
-            return full_name + ' ' + remainder
-    
-    # If no match found, return original
-    return verse_ref
+    """
+    Stored form of an OpenBible reference, through the shared codec:
+    "Gen.1.1" -> "Genesis 1:1", "Gen.1.1-Gen.1.3" -> "Genesis 1:1-Genesis 1.3"
+    (the range form the front end reads). References the codec cannot
+    parse are kept as they are.
+    """
+    ref = parse_reference(verse_ref)
+    if ref is None:
+        return verse_ref.strip()
+    start, end = ref
+    if '-' not in verse_ref:
+        return format_reference(start)
+    return f"{format_reference(start)}-{format_reference(end, sep='.')}"
 
 def convert_crossrefs_to_csv():
     """Convert cross_references.txt to CSV format"""
@@ -260,27 +161,6 @@ def create_database():
         print(f"Error creating database: {str(e)}")
         return False
 
-def convert_dots_to_colons(verse_ref):
-    """Convert dots to colons in verse references (e.g., Genesis 1.1 -> Genesis 1:1)"""
-    # Replace the first dot after the book name with a colon
-    # This handles cases like "Genesis 1.1" -> "Genesis 1:1"
-    # but leaves ranges like "Genesis 1:1-Genesis 1:3" intact
-    
-    # Find the first space (after book name)
-    space_index = verse_ref.find(' ')
-    if space_index == -1:
-        return verse_ref
-    
-    # Get book name and verse part
-    book_name = verse_ref[:space_index]
-    verse_part = verse_ref[space_index + 1:]
-    
-    # Replace first dot with colon in the verse part
-    if '.' in verse_part:
-        verse_part = verse_part.replace('.', ':', 1)
-    
-    return book_name + ' ' + verse_part
-
 # Update the ingest_csv_to_database function
 def ingest_csv_to_database():
     """Ingest CSV data into SQLite database"""
@@ -313,9 +193,6 @@ def ingest_csv_to_database():
                 if len(first_row) >= 3:
                     from_verse = expand_verse_reference(first_row[0])
                     to_verse = expand_verse_reference(first_row[1])
-                    # Convert dots to colons
-                    from_verse = convert_dots_to_colons(from_verse)
-                    to_verse = convert_dots_to_colons(to_verse)
                     cursor.execute('''
                         INSERT INTO cross_references (from_verse, to_verse, votes)
                         VALUES (?, ?, ?)
@@ -331,17 +208,15 @@ def ingest_csv_to_database():
                     # Convert abbreviations to full book names
                     from_verse = expand_verse_reference(row[0])
                     to_verse = expand_verse_reference(row[1])
-                    # Convert dots to colons
-                    from_verse = convert_dots_to_colons(from_verse)
-                    to_verse = convert_dots_to_colons(to_verse)
                     votes = int(row[2]) if row[2].isdigit() else 0
                     batch.append((from_verse, to_verse, votes))
                     
                     if len(batch) >= batch_size:
-                        cursor.executemany('''
-                            INSERT INTO cross_references (from_verse, to_verse, votes)
-                            VALUES (?, ?, ?)
-                        ''', batch)
+                        with span("insert_batch", "sqlite", rows=len(batch)):
+                            cursor.executemany('''
+                                INSERT INTO cross_references (from_verse, to_verse, votes)
+                                VALUES (?, ?, ?)
+                            ''', batch)
                         total_rows += len(batch)
                         batch = []
                         
@@ -351,10 +226,11 @@ def ingest_csv_to_database():
             
             # Insert remaining batch
             if batch:
-                cursor.executemany('''
-                    INSERT INTO cross_references (from_verse, to_verse, votes)
-                    VALUES (?, ?, ?)
-                ''', batch)
+                with span("insert_batch", "sqlite", rows=len(batch)):
+                    cursor.executemany('''
+                        INSERT INTO cross_references (from_verse, to_verse, votes)
+                        VALUES (?, ?, ?)
+                    ''', batch)
                 total_rows += len(batch)
         
         conn.commit()
@@ -367,6 +243,10 @@ def ingest_csv_to_database():
         print(f"Error ingesting data: {str(e)}")
         return False
 
+def run_step(name, step):
+    with span(name):
+        return step()
+
 def main():
     """Main function to orchestrate the entire process"""
     
@@ -375,25 +255,25 @@ def main():
     
     # Step 0: Download and extract data if needed
     print("Step 0: Checking for data files...")
-    if not download_and_extract_crossrefs():
+    if not run_step("download", download_and_extract_crossrefs):
         print("Download/extraction failed. Stopping process.")
         return
     
     # Step 1: Convert to CSV
     print("\nStep 1: Converting to CSV...")
-    if not convert_crossrefs_to_csv():
+    if not run_step("convert_csv", convert_crossrefs_to_csv):
         print("CSV conversion failed. Stopping process.")
         return
     
     # Step 2: Create database
     print("\nStep 2: Creating SQLite database...")
-    if not create_database():
+    if not run_step("create_db", create_database):
         print("Database creation failed. Stopping process.")
         return
     
     # Step 3: Ingest CSV data
     print("\nStep 3: Ingesting CSV data into database...")
-    if not ingest_csv_to_database():
+    if not run_step("ingest", ingest_csv_to_database):
         print("Data ingestion failed. Stopping process.")
         return
     
@@ -412,4 +292,7 @@ def main():
         print(f"Could not get record count: {str(e)}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Set SEEKFIRST_TRACE=trace.json to get a Chrome/Perfetto trace and per-stage summary
+    trace_path = enable_from_env()
+    main()
+    TRACER.finish(trace_path)
\ No newline at end of file
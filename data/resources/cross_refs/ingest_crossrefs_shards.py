@@ -1,8 +1,15 @@
 import csv
 import os
 import sqlite3
+import sys
 import urllib.request
 import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.tracing import TRACER, enable_from_env, span
+from common.verse_codec import format_reference, parse_reference, testament
 
 def download_and_extract_crossrefs():
     """Download and extract cross-references data if needed"""
@@ -47,182 +54,20 @@ def download_and_extract_crossrefs():
         print(f"Error extracting zip file: {str(e)}")
         return False
 
-def get_book_abbreviations():
-    """Return dictionary mapping abbreviations to full book names"""
-    return {
-        # Old Testament
-        'Gen.': 'Genesis',
-        'Exod.': 'Exodus',
-        'Lev.': 'Leviticus',
-        'Num.': 'Numbers',
-        'Deut.': 'Deuteronomy',
-        'Josh.': 'Joshua',
-        'Judg.': 'Judges',
-        'Ruth': 'Ruth',
-        '1Sam.': '1 Samuel',
-        '2Sam.': '2 Samuel',
-        '1Kgs.': '1 Kings',
-        '2Kgs.': '2 Kings',
-        '1Chr.': '1 Chronicles',
-        '2Chr.': '2 Chronicles',
-        'Ezra': 'Ezra',
-        'Neh.': 'Nehemiah',
-        'Esth.': 'Esther',
-        'Job': 'Job',
-        'Ps.': 'Psalms',
-        'Prov.': 'Proverbs',
-        'Eccl.': 'Ecclesiastes',
-        'Song': 'Song of Solomon',
-        'Isa.': 'Isaiah',
-        'Jer.': 'Jeremiah',
-        'Lam.': 'Lamentations',
-        'Ezek.': 'Ezekiel',
-        'Dan.': 'Daniel',
-        'Hos.': 'Hosea',
-        'Joel': 'Joel',
-        'Amos': 'Amos',
-        'Obad.': 'Obadiah',
-        'Jonah': 'Jonah',
-        'Mic.': 'Micah',
-        'Nah.': 'Nahum',
-        'Hab.': 'Habakkuk',
-        'Zeph.': 'Zephaniah',
-        'Hag.': 'Haggai',
-        'Zech.': 'Zechariah',
-        'Mal.': 'Malachi',
-        
-        # New Testament
-        'Matt.': 'Matthew',
-        'Mark': 'Mark',
-        'Luke': 'Luke',
-        'John': 'John',
-        'Acts': 'Acts',
-        'Rom.': 'Romans',
-        '1Cor.': '1 Corinthians',
-        '2Cor.': '2 Corinthians',
-        'Gal.': 'Galatians',
-        'Eph.': 'Ephesians',
-        'Phil.': 'Philippians',
-        'Col.': 'Colossians',
-        '1Thess.': '1 Thessalonians',
-        '2Thess.': '2 Thessalonians',
-        '1Tim.': '1 Timothy',
-        '2Tim.': '2 Timothy',
-        'Titus': 'Titus',
-        'Philem.': 'Philemon',
-        'Phlm.': 'Philemon',
-        'Heb.': 'Hebrews',
-        'Jas.': 'James',
-        '1Pet.': '1 Peter',
-        '2Pet.': '2 Peter',
-        '1John': '1 John',
-        '2John': '2 John',
-        '3John': '3 John',
-        'Jude': 'Jude',
-        'Rev.': 'Revelation'
-    }
-
-def get_old_testament_books():
-    """Return set of Old Testament book names"""
-    return {
-        'Genesis', 'Exodus', 'Leviticus', 'Numbers', 'Deuteronomy',
-        'Joshua', 'Judges', 'Ruth', '1 Samuel', '2 Samuel', 
-        '1 Kings', '2 Kings', '1 Chronicles', '2 Chronicles',
-        'Ezra', 'Nehemiah', 'Esther', 'Job', 'Psalms', 'Proverbs',
-        'Ecclesiastes', 'Song of Solomon', 'Isaiah', 'Jeremiah',
-        'Lamentations', 'Ezekiel', 'Daniel', 'Hosea', 'Joel',
-        'Amos', 'Obadiah', 'Jonah', 'Micah', 'Nahum', 'Habakkuk',
-        'Zephaniah', 'Haggai', 'Zechariah', 'Malachi'
-    }
-
-def get_new_testament_books():
-    """Return set of New Testament book names"""
-    return {
-        'Matthew', 'Mark', 'Luke', 'John', 'Acts', 'Romans',
-        '1 Corinthians', '2 Corinthians', 'Galatians', 'Ephesians',
-        'Philippians', 'Colossians', '1 Thessalonians', '2 Thessalonians',
-        '1 Timothy', '2 Timothy', 'Titus', 'Philemon', 'Hebrews',
-        'James', '1 Peter', '2 Peter', '1 John', '2 John', '3 John',
-        'Jude', 'Revelation'
-    }
-
-def get_book_testament(book_name):
-    """Determine which testament a book belongs to"""
-    ot_books = get_old_testament_books()
-    nt_books = get_new_testament_books()
-    
-    if book_name in ot_books:
-        return 'OT'
-    elif book_name in nt_books:
-        return 'NT'
-    else:
-        return None
-
-def extract_book_name_from_verse(verse_ref):
-    """Extract book name from a verse reference like 'Genesis 1:1'"""
-    # Handle ranges by taking the first part
-    if '-' in verse_ref:
-        verse_ref = verse_ref.split('-')[0].strip()
-    
-    # Find the first space followed by a number (chapter)
-    import re
-    match = re.match(r'^(.+?)\s+\d+', verse_ref.strip())
-    if match:
-        return match.group(1).strip()
-    
-    # Fallback: return everything before the last space
-    parts = verse_ref.strip().split()
-    if len(parts) > 1:
-        return ' '.join(parts[:-1])
-    
-    return verse_ref.strip()
-
 def expand_verse_reference(verse_ref):
-    """Convert abbreviated verse reference to full book name"""
-    book_map = get_book_abbreviations()
-    
-    # Handle verse ranges (e.g., "Romans 2.12-Rom.2.16")
-    if '-' in verse_ref:
-        parts = verse_ref.split('-')
-        expanded_parts = []
-        
-        for part in parts:
-            part = part.strip()
-            expanded_parts.append(expand_single_reference(part, book_map))
-        
-        return '-'.join(expanded_parts)
-    
-    # Handle single verse reference
-    return expand_single_reference(verse_ref, book_map)
-
-def expand_single_reference(verse_ref, book_map):
-    """Helper function to expand a single verse reference"""
-    verse_ref = verse_ref.strip()
-    
-    # Try exact matches first (with dots)
-    for abbrev, full_name in book_map.items():
-        if verse_ref.startswith(abbrev):
-            remainder = verse_ref[len(abbrev):].lstrip(' .')
-            return full_name + ' ' + remainder
-    
-    # Try matches with space before dot (e.g., "Job .38.4")
-    for abbrev, full_name in book_map.items():
-        book_name = abbrev.rstrip('.')  # Remove trailing dot from abbreviation
-        if verse_ref.startswith(book_name + ' .'):
-            # Found pattern like "Job .38.4"
-            remainder = verse_ref[len(book_name + ' .'):].lstrip()
-            return full_name + ' ' + remainder
-        elif verse_ref.startswith(book_name + '.'):
-            # Found pattern like "Job.38.4"
-            remainder = verse_ref[len(book_name + '.'):].lstrip()
-            return full_name + ' ' + remainder
-        elif verse_ref.startswith(book_name + ' ') and book_name == full_name:
-            # Found non-abbreviated book with space (e.g., "Job 38.4")
-            remainder = verse_ref[len(book_name + ' '):].lstrip()
-            return full_name + ' ' + remainder
-    
-    # If no match found, return original
-    return verse_ref
+    """
+    Stored form of an OpenBible reference, through the shared codec:
+    "Gen.1.1" -> "Genesis 1:1", "Gen.1.1-Gen.1.3" -> "Genesis 1:1-Genesis 1.3"
+    (the range form the front end reads). References the codec cannot
+    parse are kept as they are.
+    """
+    ref = parse_reference(verse_ref)
+    if ref is None:
+        return verse_ref.strip()
+    start, end = ref
+    if '-' not in verse_ref:
+        return format_reference(start)
+    return f"{format_reference(start)}-{format_reference(end, sep='.')}"
 
 def convert_crossrefs_to_csv():
     """Convert cross_references.txt to CSV format"""
@@ -318,28 +163,12 @@ def create_databases():
     
     return True
 
-def convert_dots_to_colons(verse_ref):
-    """Convert dots to colons in verse references (e.g., Genesis 1.1 -> Genesis 1:1)"""
-    # Replace the first dot after the book name with a colon
-    # This handles cases like "Genesis 1.1" -> "Genesis 1:1"
-    # but leaves ranges like "Genesis 1:1-Genesis 1:3" intact
-    
-    # Find the first space (after book name)
-    space_index = verse_ref.find(' ')
-    if space_index == -1:
-        return verse_ref
-    
-    # Get book name and verse part
-    book_name = verse_ref[:space_index]
-    verse_part = verse_ref[space_index + 1:]
-    
-    # Replace first dot with colon in the verse part
-    if '.' in verse_part:
-        verse_part = verse_part.replace('.', ':', 1)
-    
-    return book_name + ' ' + verse_part
-
 # Update the ingest_csv_to_database function
+def verse_testament(verse_ref):
+    """'OT' / 'NT' of the (first) verse of a reference; None when it does not parse."""
+    ref = parse_reference(verse_ref)
+    return testament(ref[0]) if ref else None
+
 def ingest_csv_to_databases():
     """Ingest CSV data into separate OT and NT SQLite databases"""
     
@@ -379,20 +208,16 @@ def ingest_csv_to_databases():
                 if len(first_row) >= 3:
                     from_verse = expand_verse_reference(first_row[0])
                     to_verse = expand_verse_reference(first_row[1])
-                    # Convert dots to colons
-                    from_verse = convert_dots_to_colons(from_verse)
-                    to_verse = convert_dots_to_colons(to_verse)
                     
                     # Determine which database to use based on the from_verse
-                    from_book = extract_book_name_from_verse(from_verse)
-                    testament = get_book_testament(from_book)
+                    from_testament = verse_testament(from_verse)
                     
-                    if testament == 'OT':
+                    if from_testament == 'OT':
                         ot_cursor.execute('''
                             INSERT INTO cross_references (from_verse, to_verse, votes)
                             VALUES (?, ?, ?)
                         ''', (from_verse, to_verse, int(first_row[2]) if first_row[2].isdigit() else 0))
-                    elif testament == 'NT':
+                    elif from_testament == 'NT':
                         nt_cursor.execute('''
                             INSERT INTO cross_references (from_verse, to_verse, votes)
                             VALUES (?, ?, ?)
@@ -411,40 +236,38 @@ def ingest_csv_to_databases():
                     # Convert abbreviations to full book names
                     from_verse = expand_verse_reference(row[0])
                     to_verse = expand_verse_reference(row[1])
-                    # Convert dots to colons
-                    from_verse = convert_dots_to_colons(from_verse)
-                    to_verse = convert_dots_to_colons(to_verse)
                     votes = int(row[2]) if row[2].isdigit() else 0
                     
                     # Determine which database to use based on the from_verse
-                    from_book = extract_book_name_from_verse(from_verse)
-                    testament = get_book_testament(from_book)
+                    from_testament = verse_testament(from_verse)
                     
-                    if testament == 'OT':
+                    if from_testament == 'OT':
                         ot_batch.append((from_verse, to_verse, votes))
                         
                         if len(ot_batch) >= batch_size:
-                            ot_cursor.executemany('''
-                                INSERT INTO cross_references (from_verse, to_verse, votes)
-                                VALUES (?, ?, ?)
-                            ''', ot_batch)
+                            with span("insert_batch", "sqlite", rows=len(ot_batch), testament="OT"):
+                                ot_cursor.executemany('''
+                                    INSERT INTO cross_references (from_verse, to_verse, votes)
+                                    VALUES (?, ?, ?)
+                                ''', ot_batch)
                             total_ot_rows += len(ot_batch)
                             ot_batch = []
                             
-                    elif testament == 'NT':
+                    elif from_testament == 'NT':
                         nt_batch.append((from_verse, to_verse, votes))
                         
                         if len(nt_batch) >= batch_size:
-                            nt_cursor.executemany('''
-                                INSERT INTO cross_references (from_verse, to_verse, votes)
-                                VALUES (?, ?, ?)
-                            ''', nt_batch)
+                            with span("insert_batch", "sqlite", rows=len(nt_batch), testament="NT"):
+                                nt_cursor.executemany('''
+                                    INSERT INTO cross_references (from_verse, to_verse, votes)
+                                    VALUES (?, ?, ?)
+                                ''', nt_batch)
                             total_nt_rows += len(nt_batch)
                             nt_batch = []
                     else:
                         total_skipped += 1
                         if total_skipped <= 10:  # Show first 10 skipped entries for debugging
-                            print(f"Skipped unknown book: {from_book} in verse {from_verse}")
+                            print(f"Skipped unknown book in verse {from_verse}")
                     
                     # Print progress
                     total_processed = total_ot_rows + total_nt_rows + len(ot_batch) + len(nt_batch)
@@ -453,17 +276,19 @@ def ingest_csv_to_databases():
             
             # Insert remaining batches
             if ot_batch:
-                ot_cursor.executemany('''
-                    INSERT INTO cross_references (from_verse, to_verse, votes)
-                    VALUES (?, ?, ?)
-                ''', ot_batch)
+                with span("insert_batch", "sqlite", rows=len(ot_batch), testament="OT"):
+                    ot_cursor.executemany('''
+                        INSERT INTO cross_references (from_verse, to_verse, votes)
+                        VALUES (?, ?, ?)
+                    ''', ot_batch)
                 total_ot_rows += len(ot_batch)
                 
             if nt_batch:
-                nt_cursor.executemany('''
-                    INSERT INTO cross_references (from_verse, to_verse, votes)
-                    VALUES (?, ?, ?)
-                ''', nt_batch)
+                with span("insert_batch", "sqlite", rows=len(nt_batch), testament="NT"):
+                    nt_cursor.executemany('''
+                        INSERT INTO cross_references (from_verse, to_verse, votes)
+                        VALUES (?, ?, ?)
+                    ''', nt_batch)
                 total_nt_rows += len(nt_batch)
         
         # Commit and close connections
@@ -482,6 +307,10 @@ def ingest_csv_to_databases():
         print(f"Error ingesting data: {str(e)}")
         return False
 
+def run_step(name, step):
+    with span(name):
+        return step()
+
 def main():
     """Main function to orchestrate the entire process"""
     
@@ -490,25 +319,25 @@ def main():
     
     # Step 0: Download and extract data if needed
     print("Step 0: Checking for data files...")
-    if not download_and_extract_crossrefs():
+    if not run_step("download", download_and_extract_crossrefs):
         print("Download/extraction failed. Stopping process.")
         return
     
     # Step 1: Convert to CSV
     print("\nStep 1: Converting to CSV...")
-    if not convert_crossrefs_to_csv():
+    if not run_step("convert_csv", convert_crossrefs_to_csv):
         print("CSV conversion failed. Stopping process.")
         return
     
     # Step 2: Create databases
     print("\nStep 2: Creating SQLite databases...")
-    if not create_databases():
+    if not run_step("create_db", create_databases):
         print("Database creation failed. Stopping process.")
         return
     
     # Step 3: Ingest CSV data
     print("\nStep 3: Ingesting CSV data into databases...")
-    if not ingest_csv_to_databases():
+    if not run_step("ingest", ingest_csv_to_databases):
         print("Data ingestion failed. Stopping process.")
         return
     
@@ -528,4 +357,7 @@ def main():
         print(f"Could not get record count: {str(e)}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Set SEEKFIRST_TRACE=trace.json to get a Chrome/Perfetto trace and per-stage summary
+    trace_path = enable_from_env()
+    main()
+    TRACER.finish(trace_path)
\ No newline at end of file
@@ -0,0 +1,35 @@
+from build_similar_verses import tfidf_matrix, top_similar, verse_rows
+
+TEXTS = [
+    "El Señor es mi pastor; nada me faltará.",
+    "Jehová es mi pastor, el SEÑOR me guía.",
+    "En el principio creó Dios los cielos y la tierra.",
+    "Y la tierra estaba desordenada y vacía.",
+    "Dijo Dios: Sea la luz; y fue la luz.",
+    "Y vio Dios que la luz era buena.",
+    "El señor guía al pastor por la tierra.",
+    "Bienaventurados los pobres en espíritu.",
+]
+
+def similar(block_rows, texts=TEXTS):
+    x, _ = tfidf_matrix(texts, max_df=0.5)
+    return list(top_similar(x, k=3, min_score=0.0, block_rows=block_rows))
+
+def test_accented_words_are_single_folded_terms():
+    x, terms = tfidf_matrix(["señor", "Señor pastor", "SENOR"], max_df=1.0)
+    # "señor" is one term shared by all three verses, not "se" + "or"
+    assert terms == 1 and x.nnz == 3
+
+def test_block_size_does_not_change_the_result():
+    expected = similar(len(TEXTS))
+    for block_rows in (1, 3, 5):
+        assert similar(block_rows) == expected
+
+def test_verse_is_never_similar_to_itself():
+    for row, others in similar(2, TEXTS + TEXTS):  # exact duplicates score 1.0 with each other
+        assert row not in [o for o, _ in others]
+        assert all(a >= b for (_, a), (_, b) in zip(others, others[1:]))
+
+def test_rows_follow_canonical_order():
+    rows = verse_rows({"Éxodo": {"1": {"1": "b"}}, "Génesis": {"1": {"2": "a2", "1": "a1"}, "intro": "x"}})
+    assert [text for _, text in rows] == ["a1", "a2", "b"]
@@ -0,0 +1,71 @@
+import argparse
+import os
+import sys
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE))
+sys.path.insert(0, str(HERE / "gods_words"))
+sys.path.insert(0, str(HERE / "jesus_words"))
+
+import extract_god_words_v1 as v1
+import extract_god_words_v2 as v2
+import extract_jesus_words as jesus
+from common.corpus import load_kjv_json
+from common.speakers import SpeakerEngine
+from common.tracing import TRACER, enable_from_env, span
+
+# ---------------------------------------------
+# Every speaker dataset from one corpus pass
+# ---------------------------------------------
+# name -> (build strategy from args, save_to_json of its dataset)
+STRATEGIES = {
+    "pattern": (lambda args: v1.PatternStrategy(), v1.save_to_json),
+    "refined": (lambda args: v2.RefinedStrategy(), v2.save_to_json),
+    "ont_markup": (lambda args: jesus.OntMarkupStrategy(args.ont), jesus.save_to_json),
+}
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run the speaker extraction strategies (v1 patterns, v2 refined blocks, "
+                    "ONT red-letter markup) over one shared KJV corpus")
+    parser.add_argument("--kjv", default="../bibles/KJV.json", help="path to KJV.json")
+    parser.add_argument("--ont", default="jesus_words/kjv.ont", help="KJV ONT file with <FR> markup")
+    parser.add_argument("--strategies", default=",".join(STRATEGIES),
+                        help=f"comma-separated subset of: {', '.join(STRATEGIES)}")
+    parser.add_argument("--out-dir", default="speakers", help="one <strategy>.json per strategy")
+    parser.add_argument("--refine", choices=["ollama", "classifier"],
+                        help="refine the 'refined' strategy's blocks with this backend")
+    parser.add_argument("--trace", metavar="TRACE_JSON",
+                        help="record spans and write a Chrome/Perfetto trace plus a per-stage summary")
+    args = parser.parse_args()
+    trace_path = args.trace or enable_from_env()
+    if trace_path:
+        TRACER.enable()
+    if args.refine:
+        v2.set_refine_backend(args.refine)
+
+    names = [n.strip() for n in args.strategies.split(",") if n.strip()]
+    unknown = [n for n in names if n not in STRATEGIES]
+    if unknown:
+        parser.error(f"unknown strategies: {', '.join(unknown)}")
+
+    print("Loading KJV JSON...")
+    with span("load_kjv"):
+        kjv_data = load_kjv_json(args.kjv)
+    print(f"Loaded {len(kjv_data)} books")
+
+    strategies = [STRATEGIES[n][0](args) for n in names]
+    with span("extract"):
+        results = SpeakerEngine(kjv_data, strategies).run()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    for name in names:
+        STRATEGIES[name][1](results[name], os.path.join(args.out_dir, f"{name}.json"))
+    for name in names:
+        print(f"  {name:12s} {len(results[name]):6d} citations")
+
+    TRACER.finish(trace_path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import extract_god_words_v2 as v2
+from common.tracing import TRACER
+from mock_ollama import MockOllamaConfig, MockOllamaServer
+from scoring import GATE_STATS, gate_blocks
+from windowing import WINDOW_STATS
+
+# ---------------------------------------------
+# Refinement benchmark against the mock Ollama server
+# ---------------------------------------------
+def synthetic_chapters(n_chapters=40, verses_per_chapter=30, every=6):
+    """Chapters with a 'Thus saith the LORD' opener every `every` verses."""
+    chapters = []
+    for ch in range(1, n_chapters + 1):
+        verses = {}
+        for v in range(1, verses_per_chapter + 1):
+            if v % every == 1:
+                verses[str(v)] = "Thus saith the LORD of hosts; Consider your ways."
+            elif v % every == 0:
+                verses[str(v)] = "And it came to pass in the morning, that the people rose early."
+            else:
+                verses[str(v)] = "I will fill this house with glory, saith the LORD of hosts."
+        chapters.append(("Haggai", str(ch), verses))
+    return chapters
+
+def kjv_chapters(kjv_path, books):
+    kjv_data = v2.load_kjv_json(kjv_path)
+    return [
+        (book, str(ch), verses)
+        for book in books if book in kjv_data
+        for ch, verses in kjv_data[book].items() if isinstance(verses, dict)
+    ]
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[k]
+
+def run_once(chapters, config, concurrency):
+    """
+    Refine every regex candidate of `chapters` against a fresh mock server.
+    concurrency=0 calls expand_block_with_ollama() one block at a time;
+    otherwise refine_chapters() runs with OLLAMA_CONCURRENCY=concurrency.
+    """
+    chapter_blocks = [(b, c, v, v2.find_regex_blocks(b, c, v)) for b, c, v in chapters]
+    candidates = sum(len(blocks) for *_, blocks in chapter_blocks)
+    for key in v2.REFINE_STATS:
+        v2.REFINE_STATS[key] = 0
+    for stats in (GATE_STATS, WINDOW_STATS):
+        for key in stats:
+            stats[key] = 0
+    TRACER.events = []
+
+    with MockOllamaServer(config) as server:
+        v2.OLLAMA_URL = server.url
+        v2.reset_transport()
+        start = time.perf_counter()
+        if concurrency == 0:
+            for b, c, v, blocks in chapter_blocks:
+                _, ambiguous = gate_blocks(blocks, v2.OPENER_CONFIDENCE, v2.REFINE_THRESHOLD)
+                for block in ambiguous:
+                    v2.expand_block_with_ollama(b, c, v, block["start_verse"])
+        else:
+            v2.OLLAMA_CONCURRENCY = concurrency
+            v2.refine_chapters(chapter_blocks)
+        wall = time.perf_counter() - start
+        served = dict(server.stats)
+    transport = v2.get_transport().stats
+
+    latencies = [e["dur"] / 1e6 for e in TRACER.events if e["name"] == "request"]
+    return {
+        "mode": "sequential" if concurrency == 0 else f"concurrent x{concurrency}",
+        "candidates": candidates,
+        "accepted": GATE_STATS["accepted"],
+        "requests": v2.REFINE_STATS["requests"],
+        "prompt_tokens": v2.REFINE_STATS["prompt_chars"] // 4,
+        "extended": WINDOW_STATS["extended"],
+        "server_requests": served["requests"],
+        "server_errors": served["errors"] + served["bad_json"],
+        "stalls": served["stalls"],
+        "retries": transport["retries"],
+        "timeouts": transport["timeouts"],
+        "fallbacks": v2.REFINE_STATS["failures"],
+        "wall_s": wall,
+        "blocks_per_s": candidates / wall if wall else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies, default=0.0) * 1000,
+    }
+
+def print_table(rows):
+    cols = ["mode", "candidates", "accepted", "requests", "prompt_tokens", "extended", "server_errors", "stalls",
+            "retries", "timeouts", "fallbacks",
+            "wall_s", "blocks_per_s", "p50_ms", "p95_ms", "p99_ms", "max_ms"]
+    print("  ".join(f"{c:>14}" for c in cols))
+    for r in rows:
+        cells = []
+        for c in cols:
+            v = r[c]
+            cells.append(f"{v:>14.2f}" if isinstance(v, float) else f"{v:>14}")
+        print("  ".join(cells))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Ollama block refinement against a mock server")
+    parser.add_argument("--kjv", help="KJV.json to take real chapters from (default: synthetic chapters)")
+    parser.add_argument("--books", default="Haggai,Zechariah,Malachi", help="comma-separated books with --kjv")
+    parser.add_argument("--chapters", type=int, default=40, help="synthetic chapters without --kjv")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--bad-json-rate", type=float, default=0.0)
+    parser.add_argument("--stall-rate", type=float, default=0.0, help="share of requests that hang")
+    parser.add_argument("--stall", type=float, default=5.0, help="seconds a stalled request hangs")
+    parser.add_argument("--timeout", type=float, default=v2.OLLAMA_TIMEOUT, help="per-attempt deadline")
+    parser.add_argument("--retries", type=int, default=v2.OLLAMA_RETRIES)
+    parser.add_argument("--backoff", type=float, default=0.05, help="backoff base in seconds")
+    parser.add_argument("--budget", type=float, help="run budget in seconds (default: none)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--concurrency", default="0,4,16",
+                        help="comma-separated levels; 0 = sequential expand_block_with_ollama()")
+    parser.add_argument("--refine-threshold", type=float, default=1.0,
+                        help="confidence gate; 1.0 sends every candidate")
+    parser.add_argument("--fixed-window", action="store_true", help="fixed 2+26 verse windows instead of adaptive ones")
+    parser.add_argument("--block-length", type=int,
+                        help="mock answers span this many verses (default: end where v2's terminators "
+                             "say narration resumes, like a model reading the window)")
+    parser.add_argument("--json", metavar="OUT", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    if args.kjv:
+        chapters = kjv_chapters(args.kjv, args.books.split(","))
+    else:
+        chapters = synthetic_chapters(args.chapters)
+
+    v2.USE_OLLAMA = True
+    v2.USE_CACHE = False
+    v2.REFINE_THRESHOLD = args.refine_threshold
+    v2.ADAPTIVE_WINDOW = not args.fixed_window
+    TRACER.enable()
+    v2.OLLAMA_TIMEOUT = args.timeout
+    v2.OLLAMA_RETRIES = args.retries
+    v2.OLLAMA_BACKOFF = args.backoff
+    v2.OLLAMA_RUN_BUDGET = args.budget
+    narration = None if args.block_length else "|".join(p.pattern for p in v2.TERMINATORS)
+    config = MockOllamaConfig(args.latency, args.jitter, args.error_rate, args.bad_json_rate,
+                              block_length=args.block_length or 3, narration=narration, seed=args.seed, stall_rate=args.stall_rate, stall=args.stall)
+
+    rows = [run_once(chapters, config, int(level)) for level in args.concurrency.split(",")]
+    print_table(rows)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+import argparse
+import json
+import re
+import zlib
+
+import numpy as np
+
+# ---------------------------------------------
+# Verse classifier: does the speech continue into this verse?
+# ---------------------------------------------
+TOKEN = re.compile(r"[a-z]+|[,;:.?!]")
+HEAD_WORDS = 4  # narration is usually signalled in the first few words
+MAX_BLOCK = 40  # verses a classified block may run past its start
+
+def tokens(text):
+    return TOKEN.findall(text.lower())
+
+def features(text, prev_text=""):
+    """
+    Hashed-feature names for one verse: word unigrams and bigrams, the
+    opening words (h1..h4, position-specific), and the opening words of
+    the previous verse (p1, p2) for context.
+    """
+    words = tokens(text)
+    feats = ["bias"]
+    feats.extend(f"w:{w}" for w in words)
+    feats.extend(f"b:{a}_{b}" for a, b in zip(words, words[1:]))
+    for n in range(1, min(HEAD_WORDS, len(words)) + 1):
+        feats.append(f"h{n}:{'_'.join(words[:n])}")
+    prev = tokens(prev_text)
+    for n in range(1, min(2, len(prev)) + 1):
+        feats.append(f"p{n}:{'_'.join(prev[:n])}")
+    return feats
+
+class BlockEndClassifier:
+    """
+    Logistic regression over hashed n-gram features (dim buckets, crc32),
+    predicting P(speech continues into a verse) from the verse and the one
+    before it. Rows are kept sparse as index arrays, so training and
+    scoring the whole OT take seconds with NumPy alone.
+    """
+
+    def __init__(self, dim=2 ** 16):
+        self.dim = dim
+        self.weights = np.zeros(dim, dtype=np.float64)
+        self.meta = {}
+
+    def _indices(self, text, prev_text=""):
+        idx = {zlib.crc32(f.encode("utf-8")) % self.dim for f in features(text, prev_text)}
+        return np.fromiter(idx, dtype=np.int64, count=len(idx))
+
+    def _matrix(self, pairs):
+        """CSR-style (indptr, indices) for a list of (prev_text, text)."""
+        rows = [self._indices(text, prev) for prev, text in pairs]
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum([len(r) for r in rows], out=indptr[1:])
+        indices = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+        return indptr, indices
+
+    def _scores(self, indptr, indices):
+        if len(indices) == 0:
+            return np.zeros(len(indptr) - 1)
+        return np.add.reduceat(self.weights[indices], indptr[:-1])
+
+    def fit(self, pairs, labels, epochs=200, lr=0.5, l2=1e-4):
+        """Full-batch gradient descent on the log loss; labels are 1 (continues) / 0 (narration)."""
+        indptr, indices = self._matrix(pairs)
+        y = np.asarray(labels, dtype=np.float64)
+        row_of = np.repeat(np.arange(len(y)), np.diff(indptr))
+        # Balance the classes so the rarer "narration resumes" rows are not drowned out
+        pos = max(1.0, y.sum())
+        neg = max(1.0, len(y) - y.sum())
+        sample_w = np.where(y == 1, len(y) / (2 * pos), len(y) / (2 * neg))
+        for _ in range(epochs):
+            p = 1.0 / (1.0 + np.exp(-self._scores(indptr, indices)))
+            err = (p - y) * sample_w
+            grad = np.bincount(indices, weights=err[row_of], minlength=self.dim) / len(y)
+            self.weights -= lr * (grad + l2 * self.weights)
+        return self
+
+    def predict_proba(self, pairs):
+        indptr, indices = self._matrix(pairs)
+        return 1.0 / (1.0 + np.exp(-self._scores(indptr, indices)))
+
+    def save(self, path):
+        np.savez_compressed(path, weights=self.weights, dim=self.dim, meta=json.dumps(self.meta))
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        model = cls(int(data["dim"]))
+        model.weights = data["weights"]
+        model.meta = json.loads(str(data["meta"]))
+        return model
+
+    # -----------------------------------------
+    # Block ends
+    # -----------------------------------------
+    def chapter_proba(self, verses):
+        """{verse: P(continues)} for every verse of a chapter (first verse has no predecessor)."""
+        keys = sorted(map(int, verses.keys()))
+        pairs = [(verses[str(p)] if p is not None else "", verses[str(v)])
+                 for p, v in zip([None] + keys[:-1], keys)]
+        return dict(zip(keys, self.predict_proba(pairs)))
+
+    def block_end(self, proba, start, threshold=0.5):
+        """
+        Last verse of the block starting at `start`: the block runs while
+        P(continues) >= threshold, up to MAX_BLOCK verses. Returns
+        (end_verse, confidence) where confidence is the probability of the
+        weakest decision taken.
+        """
+        keys = sorted(proba)
+        i = keys.index(int(start))
+        end = keys[i]
+        confidence = 1.0
+        for v in keys[i + 1: i + 1 + MAX_BLOCK]:
+            p = float(proba[v])
+            if p < threshold:
+                confidence = min(confidence, 1.0 - p)
+                break
+            confidence = min(confidence, p)
+            end = v
+        return end, round(confidence, 3)
+
+# ---------------------------------------------
+# Training data from god_words.json
+# ---------------------------------------------
+def training_examples(kjv_data, citations):
+    """
+    (prev_text, text, label) rows: every verse after a block's start and up
+    to its end continues the speech (1); the verse right after the block,
+    when the chapter has one, is where narration resumed (0).
+    """
+    rows = []
+    for c in citations:
+        verses = kjv_data.get(c["book"], {}).get(str(c["chapter"]))
+        if not isinstance(verses, dict):
+            continue
+        for v in range(int(c["start_verse"]) + 1, int(c["end_verse"]) + 2):
+            if str(v) not in verses:
+                break
+            label = 1 if v <= int(c["end_verse"]) else 0
+            rows.append((verses.get(str(v - 1), ""), verses[str(v)], label))
+    return rows
+
+def load_citations(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return data["citations"] if isinstance(data, dict) else data
+
+def train(kjv_data, citations, holdout_every=5, **fit_args):
+    """
+    Fit on every chapter except each `holdout_every`-th one (by citation
+    order), report held-out accuracy, then refit on everything.
+    """
+    chapters = sorted({(c["book"], str(c["chapter"])) for c in citations}, key=str)
+    held = {ch for i, ch in enumerate(chapters) if holdout_every and i % holdout_every == 0}
+    train_rows = training_examples(kjv_data, [c for c in citations if (c["book"], str(c["chapter"])) not in held])
+    test_rows = training_examples(kjv_data, [c for c in citations if (c["book"], str(c["chapter"])) in held])
+
+    model = BlockEndClassifier()
+    if test_rows:
+        model.fit([(p, t) for p, t, _ in train_rows], [l for *_, l in train_rows], **fit_args)
+        proba = model.predict_proba([(p, t) for p, t, _ in test_rows])
+        labels = np.array([l for *_, l in test_rows])
+        accuracy = float(((proba >= 0.5) == (labels == 1)).mean())
+        print(f"Held-out verses: {len(test_rows)}, accuracy {accuracy:.3f}")
+        model.meta["holdout_accuracy"] = accuracy
+
+    rows = train_rows + test_rows
+    final = BlockEndClassifier(model.dim)
+    final.meta = dict(model.meta, examples=len(rows), citations=len(citations))
+    return final.fit([(p, t) for p, t, _ in rows], [l for *_, l in rows], **fit_args)
+
+# ---------------------------------------------
+# Agreement with another backend's output
+# ---------------------------------------------
+def agreement_report(ours, theirs):
+    """
+    Compare two god_words citation lists (e.g. classifier vs. LLM): blocks
+    matched by (book, chapter, start_verse) and verse-level overlap.
+    """
+    def by_start(blocks):
+        return {(b["book"], str(b["chapter"]), int(b["start_verse"])): int(b["end_verse"]) for b in blocks}
+
+    def verse_set(blocks):
+        return {(b["book"], str(b["chapter"]), v)
+                for b in blocks for v in range(int(b["start_verse"]), int(b["end_verse"]) + 1)}
+
+    a, b = by_start(ours), by_start(theirs)
+    shared = a.keys() & b.keys()
+    same_end = sum(1 for k in shared if a[k] == b[k])
+    diffs = [abs(a[k] - b[k]) for k in shared]
+    va, vb = verse_set(ours), verse_set(theirs)
+    inter = len(va & vb)
+    precision = inter / len(va) if va else 0.0
+    recall = inter / len(vb) if vb else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {
+        "blocks": len(ours),
+        "reference_blocks": len(theirs),
+        "shared_starts": len(shared),
+        "same_end": same_end,
+        "mean_end_diff": sum(diffs) / len(diffs) if diffs else 0.0,
+        "verse_precision": precision,
+        "verse_recall": recall,
+        "verse_f1": f1,
+    }
+
+def print_agreement(report, label="classifier", reference="LLM"):
+    r = report
+    print(f"Agreement {label} vs {reference}:")
+    print(f"  blocks: {r['blocks']} vs {r['reference_blocks']}, {r['shared_starts']} with the same start")
+    if r["shared_starts"]:
+        print(f"  same end verse: {r['same_end']}/{r['shared_starts']} "
+              f"({r['same_end'] / r['shared_starts']:.1%}), mean |end diff| {r['mean_end_diff']:.2f} verses")
+    print(f"  verses: precision {r['verse_precision']:.3f}, recall {r['verse_recall']:.3f}, F1 {r['verse_f1']:.3f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Train or evaluate the God's-words block-end classifier")
+    sub = parser.add_subparsers(dest="command", required=True)
+    t = sub.add_parser("train", help="fit on an existing god_words.json")
+    t.add_argument("--kjv", default="../../bibles/KJV.json")
+    t.add_argument("--labels", default="god_words.json", help="god_words.json to learn block ends from")
+    t.add_argument("--out", default="block_classifier.npz")
+    t.add_argument("--epochs", type=int, default=200)
+    c = sub.add_parser("compare", help="agreement between two god_words.json outputs")
+    c.add_argument("ours", help="e.g. god_words.json from the classifier backend")
+    c.add_argument("reference", help="e.g. god_words.json from the Ollama backend")
+    args = parser.parse_args()
+
+    if args.command == "train":
+        with open(args.kjv, 'r', encoding='utf-8') as f:
+            kjv_data = json.load(f)
+        citations = load_citations(args.labels)
+        model = train(kjv_data, citations, epochs=args.epochs)
+        model.save(args.out)
+        print(f"Saved {args.out} ({model.meta['examples']} verses from {model.meta['citations']} blocks)")
+    else:
+        print_agreement(agreement_report(load_citations(args.ours), load_citations(args.reference)),
+                        args.ours, args.reference)
+
+if __name__ == "__main__":
+    main()
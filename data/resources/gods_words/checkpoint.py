@@ -0,0 +1,108 @@
+import json
+import os
+
+# ---------------------------------------------
+# Append-only result stream with per-book checkpoints
+# ---------------------------------------------
+class BookCheckpointStream:
+    """
+    JSONL file of extracted blocks, one object per line. The first line is
+    a header {"stream": {"rules": <fingerprint>}} naming the rule set the
+    blocks were extracted with. After the last block of a book a marker
+    line {"book_done": "<book>", "input": <fingerprint of its verses>} is
+    appended and fsync'ed; that marker is the book's checkpoint. Lines
+    written after the last marker belong to a book that was interrupted and
+    are dropped on resume.
+
+    On resume a stream written under other rules is discarded, and books
+    whose verses no longer match their marker (or that the caller asks to
+    drop) are removed with their blocks, so they are extracted again
+    rather than reused stale.
+    """
+
+    def __init__(self, path="god_words.partial.jsonl"):
+        self.path = path
+        self.inputs = {}
+
+    def start(self, resume=False, rules=None, inputs=None, drop=()):
+        """
+        Open the stream; returns the set of books already completed.
+        rules: fingerprint of the rule set; inputs: {book: fingerprint of
+        its verses}, recorded in each book's marker; drop: books whose
+        checkpoints are discarded on resume regardless.
+        """
+        self.inputs = inputs or {}
+        if resume and os.path.exists(self.path):
+            completed = self._resume(rules, set(drop))
+            if completed is not None:
+                return completed
+        self._rewrite(rules, [])
+        return set()
+
+    def _resume(self, rules, drop):
+        """Completed books still valid under rules/inputs, with the stream cut down to them; None to start over."""
+        header = None
+        books = []
+        pending = []
+        with open(self.path, 'rb') as f:
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # torn final line
+                line = json.loads(raw)
+                if header is None:
+                    header = line.get("stream")
+                    if header is None:
+                        break
+                elif "book_done" in line:
+                    books.append((line["book_done"], line.get("input"), pending + [raw]))
+                    pending = []
+                else:
+                    pending.append(raw)
+        if header is None or header.get("rules") != rules:
+            print(f"[WARN] {self.path} was written with other extraction rules; starting over")
+            return None
+
+        kept = [(book, lines) for book, fingerprint, lines in books
+                if fingerprint == self.inputs.get(book) and book not in drop]
+        stale = [book for book, fingerprint, _ in books if fingerprint != self.inputs.get(book)]
+        if stale:
+            print(f"[WARN] verses changed since checkpoint, extracting again: {', '.join(stale)}")
+        # Drop stale books and any partial book left behind by the interrupted run
+        self._rewrite(rules, [raw for _, lines in kept for raw in lines])
+        return {book for book, _ in kept}
+
+    def _rewrite(self, rules, lines):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(json.dumps({"stream": {"rules": rules}}).encode("utf-8") + b"\n")
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def write_book(self, book, blocks):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for b in blocks:
+                f.write(json.dumps(b, ensure_ascii=False) + "\n")
+            f.write(json.dumps({"book_done": book, "input": self.inputs.get(book)}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def remove(self):
+        """Delete the stream once its blocks are saved elsewhere."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def blocks(self, book_order, only=None):
+        """Checkpointed blocks (of the `only` books when given), ordered by book_order then stream order."""
+        rank = {b: i for i, b in enumerate(book_order)}
+        blocks = []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for raw in f:
+                line = json.loads(raw)
+                if "book_done" in line or "stream" in line:
+                    continue
+                if only is None or line["book"] in only:
+                    blocks.append(line)
+        blocks.sort(key=lambda b: rank.get(b["book"], len(rank)))
+        return blocks
@@ -0,0 +1,53 @@
+import copy
+import json
+
+import pytest
+
+# ---------------------------------------------
+# Small KJV-shaped corpus for the God's-words tests
+# ---------------------------------------------
+FIXTURE_KJV = {
+    "Genesis": {
+        "1": {
+            "1": "In the beginning God created the heaven and the earth.",
+            "2": "And God said, Let there be light: and there was light.",
+            "3": "And God saw the light, that it was good.",
+            "4": "And it came to pass that the evening and the morning were the first day.",
+        },
+        "2": {
+            "1": "And the LORD spake unto Moses, saying,",
+            "2": "Speak unto the children of Israel, that they go forward.",
+            "3": "And Moses told the people all these words.",
+            "4": "And the LORD said unto Moses, Now shalt thou see what I will do.",
+            "5": "Let my people go, that they may serve me.",
+            "6": "And they went out of the land.",
+        },
+    },
+    "Exodus": {
+        "1": {
+            "1": "The word of the LORD came unto Moses, saying,",
+            "2": "Hear ye the word of the LORD, O Israel.",
+            "3": "And it came to pass on the morrow.",
+            "4": "God spake all these words, saying,",
+            "5": "I am the LORD thy God.",
+            "6": "Then Moses went up into the mount.",
+        },
+    },
+    "Leviticus": {
+        "1": {
+            "1": "And the LORD called unto Moses out of the tabernacle.",
+            "2": "Thus saith the LORD of hosts; Consider your ways.",
+            "3": "And Aaron did so.",
+        },
+    },
+}
+
+@pytest.fixture
+def kjv_data():
+    return copy.deepcopy(FIXTURE_KJV)
+
+@pytest.fixture
+def kjv_path(tmp_path, kjv_data):
+    path = tmp_path / "KJV.json"
+    path.write_text(json.dumps(kjv_data), encoding="utf-8")
+    return path
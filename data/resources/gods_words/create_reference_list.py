@@ -1,69 +1,20 @@
 import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.intervals import citation_verses, reference_map
+from common.verse_bitmap import write_bitmap
 
 # Load the god_words.json file
 with open('god_words.json', 'r') as f:
     data = json.load(f)
 
-# Create a structured output with verse ranges
-god_refs = {}
-
-for citation in data['citations']:
-    if not citation['book'] or not citation['chapter']:
-        continue
-    
-    book = citation['book']
-    chapter = str(citation['chapter'])
-    start_verse = int(citation['start_verse'])
-    end_verse = int(citation['end_verse'])
-    
-    # Initialize book if not exists
-    if book not in god_refs:
-        god_refs[book] = {}
-    
-    # Initialize chapter if not exists  
-    if chapter not in god_refs[book]:
-        god_refs[book][chapter] = []
-    
-    # Add verse range
-    for verse in range(start_verse, end_verse + 1):
-        if verse not in god_refs[book][chapter]:
-            god_refs[book][chapter].append(verse)
-
-# Sort verses in each chapter
-for book in god_refs:
-    for chapter in god_refs[book]:
-        god_refs[book][chapter].sort()
-
-# Convert to more readable format with verse ranges
-god_refs_formatted = {}
-for book in god_refs:
-    god_refs_formatted[book] = {}
-    for chapter in god_refs[book]:
-        verses = god_refs[book][chapter]
-        
-        # Group consecutive verses into ranges
-        ranges = []
-        start = verses[0]
-        end = verses[0]
-        
-        for i in range(1, len(verses)):
-            if verses[i] == end + 1:
-                end = verses[i]
-            else:
-                if start == end:
-                    ranges.append(str(start))
-                else:
-                    ranges.append(f"{start}-{end}")
-                start = verses[i]
-                end = verses[i]
-        
-        # Add the last range
-        if start == end:
-            ranges.append(str(start))
-        else:
-            ranges.append(f"{start}-{end}")
-        
-        god_refs_formatted[book][chapter] = ranges
+# Every cited verse as one set of verse-id ranges; overlapping and
+# adjacent citations coalesce into the "a-b" ranges written below
+god_verses = citation_verses(data['citations'])
+god_refs_formatted = reference_map(god_verses)
 
 # Save the formatted output
 output = {
@@ -77,11 +28,15 @@ with open('god_words_references.json', 'w', encoding='utf-8') as f:
     json.dump(output, f, indent=2, ensure_ascii=False)
 
 print(f"Created god_words_references.json")
+
+# Same verses as one bit per KJV verse, for O(1) per-chapter highlighting
+write_bitmap(god_verses, 'god_words.bitmap')
+
 print(f"Total books with God's words: {len(god_refs_formatted)}")
 print(f"\nBooks included: {', '.join(sorted(god_refs_formatted.keys()))}")
 
 # Print summary statistics
-total_verses = sum(len(verses) for book in god_refs for chapter in god_refs[book] for verses in [god_refs[book][chapter]])
+total_verses = len(god_verses)
 print(f"\nTotal individual verses with God's words: {total_verses}")
 
 # Print first few examples
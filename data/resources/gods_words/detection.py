@@ -0,0 +1,159 @@
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.corpus import Corpus  # noqa: F401  (re-exported for the extractors)
+
+# ---------------------------------------------
+# Combined opener/terminator matcher
+# ---------------------------------------------
+class CombinedMatcher:
+    """
+    All openers compiled into one alternation of named groups (o0, o1, ..)
+    and all terminators into another (t0, t1, ..), scanned over the whole
+    corpus at once to shortlist the verses where any of them matches. An
+    alternation only reports the alternative that won, so the individual
+    patterns are then run on the shortlisted verses alone to find every
+    pattern that matches.
+
+    prefilter is an optional case-insensitive regex of literals that every
+    opener match must contain (e.g. r'lord|god'); one fast literal pass
+    over the corpus picks the verses worth running the opener alternation
+    on. Terminators are anchored at the start of a verse, so they are only
+    tried at verse offsets.
+    """
+
+    def __init__(self, openers, terminators=(), prefilter=None, flags=re.IGNORECASE):
+        self.openers = [getattr(p, "pattern", p) for p in openers]
+        self.terminators = [getattr(p, "pattern", p) for p in terminators]
+        self.opener_regex = self._combine("o", self.openers, flags)
+        self.terminator_regex = self._combine("t", self.terminators, flags)
+        self.opener_patterns = [re.compile(p, flags) for p in self.openers]
+        self.terminator_patterns = [re.compile(p, flags) for p in self.terminators]
+        self.prefilter = re.compile(prefilter, re.IGNORECASE) if prefilter else None
+
+    @staticmethod
+    def _combine(prefix, patterns, flags):
+        if not patterns:
+            return None
+        parts = [f"(?P<{prefix}{i}>{p})" for i, p in enumerate(patterns)]
+        return re.compile("|".join(parts), flags | re.MULTILINE)
+
+    def scan(self, corpus, books=None):
+        return CorpusScan(self, corpus, books)
+
+class CorpusScan:
+    """
+    Result of one pass over a Corpus: for every verse, the indices of all
+    opener patterns that match it (in pattern order, so the first is what
+    a per-pattern loop would find first) and whether a terminator matched.
+    hits counts the verses each pattern matches, as a by-product.
+
+    books limits the pass to those books of a larger shared corpus (e.g.
+    the OT of a whole-Bible Corpus); None scans everything.
+    """
+
+    def __init__(self, matcher, corpus, books=None):
+        self.matcher = matcher
+        self.corpus = corpus
+        self.hits = Counter()
+        self._openers = {}
+        self._terminator = set()
+        text = corpus.text
+        ends = corpus.offsets[1:] + [len(text) + 1]
+        if books is None:
+            spans = [(0, len(corpus.offsets))]
+        else:
+            spans = sorted(corpus.book_span(b) for b in books if b in corpus.spans)
+
+        if matcher.terminator_regex is not None:
+            match = matcher.terminator_regex.match
+            for first, last in spans:
+                for idx in range(first, last):
+                    if match(text, corpus.offsets[idx], ends[idx] - 1):
+                        self._terminator.add(idx)
+                        self._count("t", matcher.terminator_patterns, corpus.verse_text(idx))
+
+        if matcher.opener_regex is not None:
+            candidates = []
+            for first, last in spans:
+                if first == last:
+                    continue
+                if matcher.prefilter is not None:
+                    end = ends[last - 1] - 1
+                    found = matcher.prefilter.finditer(text, corpus.offsets[first], end)
+                    candidates.extend(sorted({corpus.verse_at(m.start()) for m in found}))
+                else:
+                    candidates.extend(range(first, last))
+            search = matcher.opener_regex.search
+            for idx in candidates:
+                if search(text, corpus.offsets[idx], ends[idx] - 1):
+                    self._openers[idx] = self._count("o", matcher.opener_patterns, corpus.verse_text(idx))
+
+        self._chapters = {}
+        for first, last in spans:
+            for idx in range(first, last):
+                book, chapter, verse = corpus.refs[idx]
+                self._chapters.setdefault((book, chapter), {})[verse] = idx
+
+    def _count(self, prefix, patterns, verse):
+        """Indices of the patterns matching a shortlisted verse, each counted in hits."""
+        matched = tuple(i for i, p in enumerate(patterns) if p.search(verse))
+        for i in matched:
+            self.hits[f"{prefix}{i}"] += 1
+        return matched
+
+    def chapter_flags(self, book, chapter):
+        """{verse: (matching opener indices, empty when none; is_terminator)} for one chapter."""
+        return {
+            verse: (self._openers.get(idx, ()), idx in self._terminator)
+            for verse, idx in self._chapters.get((book, str(chapter)), {}).items()
+        }
+
+    def is_opener(self, book, chapter, verse):
+        idx = self._chapters.get((book, str(chapter)), {}).get(int(verse))
+        return idx is not None and idx in self._openers
+
+    def pattern_stats(self):
+        return pattern_stats(self.matcher, self.hits)
+
+    def print_stats(self):
+        print_pattern_stats(self.matcher, self.hits)
+
+def pattern_stats(matcher, hits):
+    """[(kind, index, pattern, hits)] in pattern order."""
+    stats = []
+    for i, p in enumerate(matcher.terminators):
+        stats.append(("terminator", i, p, hits.get(f"t{i}", 0)))
+    for i, p in enumerate(matcher.openers):
+        stats.append(("opener", i, p, hits.get(f"o{i}", 0)))
+    return stats
+
+def print_pattern_stats(matcher, hits):
+    """hits may be summed across several scans (e.g. one per worker process)."""
+    print("Pattern hits:")
+    for kind, i, p, n in pattern_stats(matcher, hits):
+        print(f"  {n:6d}  {kind} {i}: {p[:70]}")
+
+def verify_scan(scan, openers, terminators=()):
+    """
+    Check a CorpusScan against the per-verse search() it replaces.
+    Returns a list of (ref, expected, got) mismatches.
+    """
+    openers = [re.compile(getattr(p, "pattern", p), re.IGNORECASE) for p in openers]
+    terminators = [re.compile(getattr(p, "pattern", p), re.IGNORECASE) for p in terminators]
+    corpus = scan.corpus
+    mismatches = []
+    for idx, ref in enumerate(corpus.refs):
+        start = corpus.offsets[idx]
+        end = corpus.offsets[idx + 1] - 1 if idx + 1 < len(corpus.offsets) else len(corpus.text)
+        t = corpus.text[start:end]
+        expected = (tuple(i for i, p in enumerate(openers) if p.search(t)),
+                    any(p.search(t) for p in terminators))
+        got = (scan._openers.get(idx, ()), idx in scan._terminator)
+        if expected != got:
+            mismatches.append((ref, expected, got))
+    return mismatches
@@ -1,79 +1,74 @@
 import json
-import re
+import sys
 from pathlib import Path
 
-def load_kjv_json(kjv_path="KJV.json"):
-    """Load the KJV JSON file to get proper verse references"""
-    with open(kjv_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-def normalize_text(text):
-    """Normalize text for comparison - remove punctuation, lowercase, remove extra spaces"""
-    text = text.lower()
-    text = re.sub(r'[^\w\s]', '', text)
-    text = re.sub(r'\s+', ' ', text)
-    return text.strip()
+from common.corpus import load_kjv_json
+from common.speakers import SpeakerStrategy, run_strategy
+from detection import CombinedMatcher
+
+PATTERNS = [
+    r'\bGod said\b',
+    r'\bthe LORD said\b',
+    r'\bthe LORD spake unto .*?, saying\b',
+    r'\bthe LORD commanded\b',
+    r'\bThus saith the LORD\b',
+    r'\bSaith the LORD\b',
+    r'\bSaith the LORD of hosts\b',
+    r'\bThe word of the LORD came unto .*?, saying\b',
+    r'\bHear the word of the LORD\b'
+]
+
+OT_BOOKS = [
+    'Genesis', 'Exodus', 'Leviticus', 'Numbers', 'Deuteronomy', 'Joshua', 'Judges', 'Ruth',
+    '1 Samuel', '2 Samuel', '1 Kings', '2 Kings', '1 Chronicles', '2 Chronicles', 'Ezra',
+    'Nehemiah', 'Esther', 'Job', 'Psalms', 'Proverbs', 'Ecclesiastes', 'Song of Solomon',
+    'Isaiah', 'Jeremiah', 'Lamentations', 'Ezekiel', 'Daniel', 'Hosea', 'Joel', 'Amos',
+    'Obadiah', 'Jonah', 'Micah', 'Nahum', 'Habakkuk', 'Zephaniah', 'Haggai', 'Zechariah', 'Malachi'
+]
+
+class PatternStrategy(SpeakerStrategy):
+    """Every OT verse matching one of PATTERNS, as a single-verse citation."""
+
+    name = "pattern"
+    books = OT_BOOKS
+
+    def __init__(self, print_stats=True):
+        self.print_stats = print_stats
+        self.citations = []
+
+    def prepare(self, corpus):
+        # Compile once and scan the whole OT in one pass
+        self.scan = CombinedMatcher(PATTERNS, prefilter=r'lord|god').scan(corpus, self.books)
+
+    def book(self, book, chapters):
+        for chapter_num, verses in chapters:
+            for verse_num, verse_text in verses.items():
+                if self.scan.is_opener(book, chapter_num, verse_num):
+                    self.citations.append({
+                        "id": len(self.citations) + 1,
+                        "reference": f"{book} {chapter_num}:{verse_num}",
+                        "book": book,
+                        "chapter": chapter_num,
+                        "start_verse": verse_num,
+                        "end_verse": verse_num,
+                        "text": verse_text.strip(),
+                        "context": "",  # No context available from JSON
+                        "word_count": len(verse_text.split())
+                    })
+
+    def finish(self):
+        if self.print_stats:
+            self.scan.print_stats()
+        return self.citations
 
 def extract_god_words(kjv_data):
     """
     Extract all quotes from the Old Testament where God spoke,
     based on the provided patterns.
     """
-    patterns = [
-        r'\bGod said\b',
-        r'\bthe LORD said\b',
-        r'\bthe LORD spake unto .*?, saying\b',
-        r'\bthe LORD commanded\b',
-        r'\bThus saith the LORD\b',
-        r'\bSaith the LORD\b',
-        r'\bSaith the LORD of hosts\b',
-        r'\bThe word of the LORD came unto .*?, saying\b',
-        r'\bHear the word of the LORD\b'
-    ]
-    
-    ot_books = [
-        'Genesis', 'Exodus', 'Leviticus', 'Numbers', 'Deuteronomy', 'Joshua', 'Judges', 'Ruth',
-        '1 Samuel', '2 Samuel', '1 Kings', '2 Kings', '1 Chronicles', '2 Chronicles', 'Ezra',
-        'Nehemiah', 'Esther', 'Job', 'Psalms', 'Proverbs', 'Ecclesiastes', 'Song of Solomon',
-        'Isaiah', 'Jeremiah', 'Lamentations', 'Ezekiel', 'Daniel', 'Hosea', 'Joel', 'Amos',
-        'Obadiah', 'Jonah', 'Micah', 'Nahum', 'Habakkuk', 'Zephaniah', 'Haggai', 'Zechariah', 'Malachi'
-    ]
-    
-    god_words = []
-    citation_id = 1
-    
-    for book in ot_books:
-        if book not in kjv_data:
-            continue
-        
-        for chapter_num, verses in kjv_data[book].items():
-            if not isinstance(verses, dict):
-                continue
-            
-            for verse_num, verse_text in verses.items():
-                for pattern in patterns:
-                    if re.search(pattern, verse_text, re.IGNORECASE):
-                        # Format the reference string
-                        ref_string = f"{book} {chapter_num}:{verse_num}"
-                        
-                        # Count words in the verse
-                        word_count = len(verse_text.split())
-                        
-                        god_words.append({
-                            "id": citation_id,
-                            "reference": ref_string,
-                            "book": book,
-                            "chapter": chapter_num,
-                            "start_verse": verse_num,
-                            "end_verse": verse_num,
-                            "text": verse_text.strip(),
-                            "context": "",  # No context available from JSON
-                            "word_count": word_count
-                        })
-                        citation_id += 1
-                        break  # Avoid duplicate matches for the same verse
-    
-    return god_words
+    return run_strategy(kjv_data, PatternStrategy(), OT_BOOKS)
 
 def save_to_json(data, output_file):
     """Save the extracted data to a JSON file"""
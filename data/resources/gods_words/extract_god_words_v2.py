@@ -1,14 +1,54 @@
+import argparse
+import hashlib
 import json
+import os
 import re
-import requests
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.corpus import load_kjv_json
+from common.incremental import BookManifest, content_hash, manifest_path, splice_citations
+from common.speakers import SpeakerStrategy
+from common.tracing import TRACER, enable_from_env, span
+from checkpoint import BookCheckpointStream
+from detection import CombinedMatcher, Corpus, print_pattern_stats
+from ollama_async import AsyncOllamaRefiner
+from planning import ChapterPlan, plan_summary, reconcile_blocks
+from refine_cache import RefineCache, cache_key
+from scoring import gate_blocks, gate_summary
+from transport import OllamaTransport
+from windowing import RefineWindow, window_summary
+
 # ---------------------------------------------
 # Ollama settings
 # ---------------------------------------------
 USE_OLLAMA = False  # set False if you want regex only
+REFINE_BACKEND = "ollama"  # "classifier": block_classifier.py model trained offline, no LLM
+CLASSIFIER_PATH = "block_classifier.npz"
+CLASSIFIER_THRESHOLD = 0.5  # a block runs while P(speech continues) stays at or above this
 OLLAMA_URL = "http://localhost:11434/api/chat"
 OLLAMA_MODEL = "llama3.1:8b"
+OLLAMA_TIMEOUT = 60  # per-attempt deadline (seconds)
+OLLAMA_RETRIES = 2  # extra attempts after a timeout, 5xx or non-JSON answer
+OLLAMA_BACKOFF = 1.0  # base of the exponential backoff (seconds, full jitter)
+OLLAMA_RUN_BUDGET = 4 * 3600  # seconds spent in Ollama requests per run (summed); None = no limit
+OLLAMA_BREAKER_FAILURES = 5  # consecutive failures before falling back to regex-only
+OLLAMA_BREAKER_COOLDOWN = 120  # seconds before probing a tripped circuit again
+OLLAMA_CONCURRENCY = 4  # requests in flight; 1 keeps the old one-at-a-time path
+OLLAMA_BATCH_CHAPTERS = False  # one prompt per chapter listing every candidate start
+VALIDATE_BATCH = False  # batch mode only: also ask per block and report agreement
+PLAN_BLOCKS = True  # skip candidates already covered by a refined block; no overlapping output
+USE_CACHE = True  # reuse answers for unchanged model/prompt/verse windows
+CACHE_PATH = "ollama_cache.sqlite"
+ADAPTIVE_WINDOW = True  # size per-block windows to the next terminator; False = fixed 2 before / 26 after
+WINDOW_TOKENS = 800  # prompt budget for the verses of one window (~4 chars per token)
+WINDOW_LOOKAHEAD = 1  # verses shown past the first terminator
+WINDOW_MAX_EXTENSIONS = 2  # re-asks with a wider window when an answer ends on the window edge
+REFINE_THRESHOLD = 0.8  # blocks scoring >= this skip the model; 1.0 sends every block
 
 # ---------------------------------------------
 # Regex patterns
@@ -50,23 +90,44 @@ OPENERS = [
 ]
 OPENERS = [re.compile(p, re.IGNORECASE) for p in OPENERS]
 
+# How much an opener alone says the block is God speaking (same order as
+# OPENERS); generic narrative openers are weaker than the prophetic formulas
+OPENER_CONFIDENCE = [
+    0.9, 0.85,              # Ex 20:1, Deut 5:22
+    0.6, 0.6,               # generic "God said" / "the LORD spake"
+    0.85, 0.75,             # "spake unto X, saying" / without saying
+    0.9, 0.9,               # "came the word of the LORD ..., saying"
+    0.9, 0.85,              # "Thus speaketh" / "Thus saith"
+    0.85, 0.9,              # Haggai messenger, "The word of the LORD came"
+    0.5,                    # "the LORD commanded"
+    0.6,                    # "Hear the word of the LORD"
+]
+assert len(OPENER_CONFIDENCE) == len(OPENERS)
+
 TERMINATORS = [
     r'^(?:And|Then|So|Now)\s+(?:Moses|Aaron|Joshua|Samuel|David|Solomon|Jeremiah|Isaiah|Ezekiel|the king|the prophet|the people|all the people|the children of Israel|he|they)\b',
     r'^And it came to pass\b'
 ]
 TERMINATORS = [re.compile(p, re.IGNORECASE) for p in TERMINATORS]
 
+# Openers and terminators combined and run once over the whole corpus; every
+# opener mentions the LORD or God, which makes a cheap literal prefilter
+DETECTOR = CombinedMatcher(OPENERS, TERMINATORS, prefilter=r'lord|god')
+PRINT_PATTERN_STATS = True  # per-pattern hit counts from the detection pass
+REGEX_WORKERS = os.cpu_count() or 1  # processes for the regex-only path (USE_OLLAMA=False)
+
 # ---------------------------------------------
 # Helpers
 # ---------------------------------------------
-def load_kjv_json(kjv_path="KJV.json"):
-    with open(kjv_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
-
 def is_any(text: str, patterns) -> bool:
     t = text.strip()
     return any(p.search(t) for p in patterns)
 
+def matching(text: str, patterns):
+    """Indices of every pattern found in the text, in pattern order."""
+    t = text.strip()
+    return tuple(i for i, p in enumerate(patterns) if p.search(t))
+
 # ---------------------------------------------
 # Ollama integration
 # ---------------------------------------------
@@ -93,42 +154,474 @@ Rules:
 Return JSON: {{"start_verse":INT, "end_verse":INT, "via":"direct|prophet|angel|narration", "evidence_phrases":[STR], "confidence":FLOAT}}
 """
 
-def expand_block_with_ollama(book, chapter, verses_dict, candidate_start):
-    try:
+BATCH_PROMPT_TMPL = """BOOK: {book}
+CHAPTER: {chapter}
+CANDIDATE_START_VERSES: {starts}
+VERSES (ordered):
+{verses}
+
+Rules:
+- Use explicit KJV cues: 'God spake/said', 'the LORD spake/said ... saying',
+  'Thus saith the LORD', 'saith the LORD (of hosts)', 'the LORD called ... saying',
+  'The word of the LORD came unto ... saying'.
+- Return exactly one block per candidate start verse, in the same order.
+- If speech continues into following verses, include them until narration resumes
+  (e.g., 'And Moses said', 'And the people answered', etc.).
+- If mediated through a prophet, via='prophet'; if angelic, via='angel'; else 'direct'.
+- Only quote phrases actually present in the supplied verses.
+- If uncertain, prefer a shorter block and lower confidence.
+Return JSON: {{"blocks":[{{"candidate_start":INT, "start_verse":INT, "end_verse":INT, "via":"direct|prophet|angel|narration", "evidence_phrases":[STR], "confidence":FLOAT}}]}}
+"""
+
+# Requests actually sent to the model (cache hits excluded); prompt tokens
+# are estimated at ~4 characters per token. Failures kept their regex range.
+REFINE_STATS = {"requests": 0, "prompt_chars": 0, "failures": 0}
+
+def chat_payload(prompt):
+    return {
+      "model": OLLAMA_MODEL,
+      "messages": [
+        {"role":"system","content": SYSTEM},
+        {"role":"user","content": prompt}
+      ],
+      "format": "json",
+      "options": {"temperature": 0}
+    }
+
+def format_verses(verses_dict, window_keys):
+    return "\n".join(f"{k} {verses_dict[str(k)]}" for k in window_keys)
+
+def refine_window(verses_dict, candidate_start):
+    """Adaptive window for one candidate, or None for the fixed one."""
+    if not ADAPTIVE_WINDOW:
+        return None
+    return RefineWindow(verses_dict, candidate_start, TERMINATORS,
+                        lookahead=WINDOW_LOOKAHEAD, token_budget=WINDOW_TOKENS)
+
+def build_refine_payload(book, chapter, verses_dict, candidate_start, window=None):
+    if window is not None:
+        window_keys = window.keys
+    else:
         keys = sorted(map(int, verses_dict.keys()))
         i = keys.index(int(candidate_start))
         window_keys = keys[max(0, i-2): min(len(keys), i+26)]
-        ordered = "\n".join(f"{k} {verses_dict[str(k)]}" for k in window_keys)
-
-        prompt = PROMPT_TMPL.format(book=book, chapter=chapter, start=candidate_start, verses=ordered)
-        payload = {
-          "model": OLLAMA_MODEL,
-          "messages": [
-            {"role":"system","content": SYSTEM},
-            {"role":"user","content": prompt}
-          ],
-          "format": "json",
-          "options": {"temperature": 0}
-        }
-        r = requests.post(OLLAMA_URL, json=payload, timeout=120)
-        r.raise_for_status()
-        data = r.json()
-        content = data["message"]["content"]
-        return json.loads(content)
+    ordered = format_verses(verses_dict, window_keys)
+
+    prompt = PROMPT_TMPL.format(book=book, chapter=chapter, start=candidate_start, verses=ordered)
+    return chat_payload(prompt)
+
+def build_batch_payload(book, chapter, verses_dict, candidate_starts):
+    """One prompt covering every candidate start of a chapter, sharing a single window."""
+    keys = sorted(map(int, verses_dict.keys()))
+    first = keys.index(int(min(candidate_starts)))
+    last = keys.index(int(max(candidate_starts)))
+    window_keys = keys[max(0, first-2): min(len(keys), last+26)]
+    ordered = format_verses(verses_dict, window_keys)
+
+    starts = ", ".join(str(s) for s in candidate_starts)
+    prompt = BATCH_PROMPT_TMPL.format(book=book, chapter=chapter, starts=starts, verses=ordered)
+    return chat_payload(prompt)
+
+def split_batch_answer(answer, candidate_starts):
+    """
+    Map a batched answer back onto the candidate starts. Blocks are matched
+    by candidate_start, falling back to position when the model omitted it.
+    Missing blocks come back as None so those candidates keep their regex range.
+    """
+    if isinstance(answer, dict):
+        answer = answer.get("blocks")
+    if not isinstance(answer, list):
+        return [None] * len(candidate_starts)
+    blocks = [b for b in answer if isinstance(b, dict)]
+    by_start = {}
+    for b in blocks:
+        try:
+            by_start.setdefault(int(b["candidate_start"]), b)
+        except (KeyError, TypeError, ValueError):
+            pass
+    if by_start:
+        return [by_start.get(int(s)) for s in candidate_starts]
+    if len(blocks) == len(candidate_starts):
+        return blocks
+    return [None] * len(candidate_starts)
+
+def refinement_jobs(book, chapter_num, verses, citations):
+    """
+    Requests needed to refine one chapter, as (label, payload, template,
+    citations, window, verses) tuples: one per block, or a single batched
+    prompt when OLLAMA_BATCH_CHAPTERS is on and the chapter has several
+    candidates. window is the block's RefineWindow (None when batched or
+    with ADAPTIVE_WINDOW off); verses bound the ranges answers may set.
+    """
+    if OLLAMA_BATCH_CHAPTERS and len(citations) > 1:
+        starts = [c["start_verse"] for c in citations]
+        payload = build_batch_payload(book, chapter_num, verses, starts)
+        return [(f"{book} {chapter_num}", payload, BATCH_PROMPT_TMPL, citations, None, verses)]
+    jobs = []
+    for c in citations:
+        label = f"{book} {chapter_num}:{c['start_verse']}"
+        window = refine_window(verses, c["start_verse"])
+        payload = build_refine_payload(book, chapter_num, verses, c["start_verse"], window)
+        jobs.append((label, payload, PROMPT_TMPL, [c], window, verses))
+    return jobs
+
+def extension_job(job, answer):
+    """
+    Follow-up job with a wider window when `answer` ends on the last verse
+    of its window before the chapter does; None when no re-ask is needed.
+    """
+    label, _, template, citations, window, verses = job
+    if window is None or window.extensions >= WINDOW_MAX_EXTENSIONS or not window.at_edge(answer):
+        return None
+    c = citations[0]
+    wider = window.extended()
+    payload = build_refine_payload(c["book"], c["chapter"], window.verses, window.start, wider)
+    return (label, payload, template, citations, wider, verses)
+
+def answers_for(citations, template, answer):
+    if template is BATCH_PROMPT_TMPL:
+        return split_batch_answer(answer, [c["start_verse"] for c in citations])
+    return [answer]
+
+_refine_cache = None
+
+def get_refine_cache():
+    global _refine_cache
+    if USE_CACHE and _refine_cache is None:
+        _refine_cache = RefineCache(CACHE_PATH)
+    return _refine_cache if USE_CACHE else None
+
+def cached_answer(payload, template=PROMPT_TMPL):
+    cache = get_refine_cache()
+    if cache is None:
+        return None, None
+    key = cache_key(payload, template)
+    return key, cache.get(key)
+
+def store_answer(key, result):
+    cache = get_refine_cache()
+    if cache is not None and key is not None and result is not None:
+        cache.put(key, result, OLLAMA_MODEL)
+
+def record_request(payload, stats=REFINE_STATS):
+    stats["requests"] += 1
+    stats["prompt_chars"] += sum(len(m["content"]) for m in payload["messages"])
+
+_transport = None
+
+def get_transport():
+    """One transport per run, so the run budget and circuit breaker span every request."""
+    global _transport
+    if _transport is None:
+        _transport = OllamaTransport(
+            OLLAMA_URL, timeout=OLLAMA_TIMEOUT, retries=OLLAMA_RETRIES, backoff=OLLAMA_BACKOFF,
+            budget=OLLAMA_RUN_BUDGET, breaker_failures=OLLAMA_BREAKER_FAILURES,
+            breaker_cooldown=OLLAMA_BREAKER_COOLDOWN,
+        )
+    return _transport
+
+def reset_transport():
+    global _transport
+    _transport = None
+
+def post_refinement(label, payload, stats=REFINE_STATS):
+    record_request(payload, stats)
+    answer = get_transport().chat(label, payload)
+    if answer is None:
+        stats["failures"] += 1
+    return answer
+
+def request_refinement(label, payload, template=PROMPT_TMPL, stats=REFINE_STATS):
+    key, hit = cached_answer(payload, template)
+    if hit is not None:
+        return hit
+    result = post_refinement(label, payload, stats)
+    store_answer(key, result)
+    return result
+
+def expand_block_with_ollama(book, chapter, verses_dict, candidate_start, stats=REFINE_STATS):
+    """stats: where requests are counted (BATCH_VALIDATION for validation re-asks)."""
+    label = f"{book} {chapter}:{candidate_start}"
+    try:
+        window = refine_window(verses_dict, candidate_start)
+        payload = build_refine_payload(book, chapter, verses_dict, candidate_start, window)
     except Exception as e:
-        print(f"[WARN] Ollama failed at {book} {chapter}:{candidate_start} -> {e}")
+        print(f"[WARN] Ollama failed at {label} -> {e}")
         return None
+    job = (label, payload, PROMPT_TMPL, [{"book": book, "chapter": chapter}], window, verses_dict)
+    answer = request_refinement(label, payload, stats=stats)
+    while (wider := extension_job(job, answer)) is not None:
+        job = wider
+        answer = request_refinement(label, job[1], stats=stats) or answer
+    return answer
+
+def dispatch_jobs(jobs, refiner=None):
+    """
+    Send refinement jobs (label, payload, template, citations, window, verses) and
+    apply the answers to their citations in place. Answers that run to the
+    edge of their window are asked again with a wider one, as a further
+    wave, until WINDOW_MAX_EXTENSIONS.
+    """
+    while jobs:
+        answered = dispatch_wave(jobs, refiner)
+        jobs = [wider for job, answer in answered if (wider := extension_job(job, answer)) is not None]
+
+def dispatch_wave(jobs, refiner=None):
+    """
+    Cache hits are applied directly; misses go through the concurrent
+    refiner when one is given, otherwise one request at a time. Returns
+    (job, answer) pairs; a failed answer (None) leaves the citations as
+    they were, so a failed re-ask keeps the previous answer.
+    """
+    answered = []
+    pending = []
+    for job in jobs:
+        key, hit = cached_answer(job[1], job[2])
+        if hit is not None:
+            apply_answer(job, hit)
+            answered.append((job, hit))
+        else:
+            pending.append((job, key))
+
+    if refiner is None:
+        for job, key in pending:
+            label, payload = job[:2]
+            with span("block", "ollama", ref=label):
+                answer = post_refinement(label, payload)
+                store_answer(key, answer)
+                apply_answer(job, answer)
+            answered.append((job, answer))
+        return answered
+
+    def on_result(index, answer):
+        store_answer(pending[index][1], answer)
+
+    for (_, payload, *_), _ in pending:
+        record_request(payload)
+    results = refiner.refine_all([(job[0], job[1]) for job, _ in pending], on_result)
+    for (job, _), answer in zip(pending, results):
+        if answer is None:
+            REFINE_STATS["failures"] += 1
+        apply_answer(job, answer)
+        answered.append((job, answer))
+    return answered
+
+_classifier = None
+CLASSIFIER_STATS = {"chapters": 0, "blocks": 0}
+
+def get_classifier():
+    global _classifier
+    if _classifier is None:
+        # NumPy is only needed for this backend
+        from block_classifier import BlockEndClassifier
+        if not os.path.exists(CLASSIFIER_PATH):
+            raise FileNotFoundError(f"{CLASSIFIER_PATH} not found; train it with "
+                                    f"`python block_classifier.py train --labels god_words.json`")
+        _classifier = BlockEndClassifier.load(CLASSIFIER_PATH)
+    return _classifier
+
+def classify_block(verses_dict, candidate_start, proba=None):
+    """Classifier counterpart of expand_block_with_ollama(), with the same answer shape."""
+    model = get_classifier()
+    if proba is None:
+        proba = model.chapter_proba(verses_dict)
+    end, confidence = model.block_end(proba, candidate_start, CLASSIFIER_THRESHOLD)
+    CLASSIFIER_STATS["blocks"] += 1
+    return {"start_verse": int(candidate_start), "end_verse": end, "via": "direct",
+            "evidence_phrases": [], "confidence": confidence}
+
+def classify_chapters(chapter_blocks):
+    """refine_chapters() with REFINE_BACKEND = "classifier": every block, one scoring pass per chapter."""
+    results = []
+    for b, c, v, blocks in chapter_blocks:
+        if blocks:
+            CLASSIFIER_STATS["chapters"] += 1
+            with span("classify", "classifier", chapter=c, blocks=len(blocks)):
+                proba = get_classifier().chapter_proba(v)
+                for block in blocks:
+                    apply_refinement(block, classify_block(v, block["start_verse"], proba), v)
+        results.append(reconcile_blocks(blocks) if PLAN_BLOCKS else blocks)
+    return results
+
+def classifier_summary():
+    meta = get_classifier().meta
+    line = (f"Classifier: {CLASSIFIER_STATS['blocks']} blocks in {CLASSIFIER_STATS['chapters']} chapters "
+            f"({CLASSIFIER_PATH}, trained on {meta.get('citations', '?')} blocks")
+    if "holdout_accuracy" in meta:
+        line += f", held-out verse accuracy {meta['holdout_accuracy']:.3f}"
+    return line + ")"
+
+def chapter_jobs_or_warn(book, chapter_num, verses, citations):
+    try:
+        return refinement_jobs(book, chapter_num, verses, citations)
+    except Exception as e:
+        print(f"[WARN] Ollama failed at {book} {chapter_num} -> {e}")
+        return []
+
+def refine_chapters(chapter_blocks):
+    """
+    Refine the regex blocks of several chapters. chapter_blocks is a list of
+    (book, chapter, verses, citations); returns the refined block list of
+    each chapter, in the same order.
+
+    With PLAN_BLOCKS (and per-block prompts) each chapter is walked in verse
+    order, one candidate at a time, so candidates already covered by an
+    earlier refined block never reach the model. Chapters advance together
+    in rounds, which keeps up to OLLAMA_CONCURRENCY requests in flight
+    across chapters. Refined blocks are reconciled into non-overlapping
+    ranges per chapter.
+
+    Blocks whose regex evidence scores at least REFINE_THRESHOLD are
+    accepted as they are and never sent to the model.
+
+    With REFINE_BACKEND = "classifier" every block is refined by the local
+    classifier instead (see classify_chapters()).
+    """
+    if REFINE_BACKEND == "classifier":
+        return classify_chapters(chapter_blocks)
+    gated = [gate_blocks(blocks, OPENER_CONFIDENCE, REFINE_THRESHOLD) for *_, blocks in chapter_blocks]
+    refiner = AsyncOllamaRefiner(get_transport(), OLLAMA_CONCURRENCY) if OLLAMA_CONCURRENCY > 1 else None
+    try:
+        if not PLAN_BLOCKS or OLLAMA_BATCH_CHAPTERS:
+            jobs = [
+                job
+                for (b, c, v, _), (_, ambiguous) in zip(chapter_blocks, gated)
+                for job in chapter_jobs_or_warn(b, c, v, ambiguous)
+            ]
+            with span("refine_round", "ollama", blocks=len(jobs)):
+                dispatch_jobs(jobs, refiner)
+            if not PLAN_BLOCKS:
+                return [blocks for *_, blocks in chapter_blocks]
+            return [reconcile_blocks(blocks) for *_, blocks in chapter_blocks]
+
+        plans = [
+            ChapterPlan(b, c, v, ambiguous, accepted)
+            for (b, c, v, _), (accepted, ambiguous) in zip(chapter_blocks, gated)
+        ]
+        while True:
+            jobs = []
+            taken = []
+            for plan in plans:
+                c = plan.next_candidate()
+                if c is None:
+                    continue
+                taken.append((plan, c))
+                jobs.extend(chapter_jobs_or_warn(plan.book, plan.chapter, plan.verses, [c]))
+            if not taken:
+                break
+            with span("refine_round", "ollama", blocks=len(jobs)):
+                dispatch_jobs(jobs, refiner)
+            for plan, c in taken:
+                plan.record(c)
+        return [plan.reconcile() for plan in plans]
+    finally:
+        if refiner is not None:
+            refiner.close()
+
+def apply_answer(job, answer):
+    _, _, template, citations, _, verses = job
+    answers = answers_for(citations, template, answer)
+    if template is BATCH_PROMPT_TMPL and VALIDATE_BATCH:
+        record_batched(citations, answers)
+    for c, res in zip(citations, answers):
+        apply_refinement(c, res, verses)
+
+# ---------------------------------------------
+# Batch validation
+# ---------------------------------------------
+# requests/prompt_chars/failures count the per-block re-asks, which are
+# kept out of REFINE_STATS so the batch request savings stay measurable
+BATCH_VALIDATION = {"blocks": 0, "same_range": 0, "same_end": 0, "missing": 0,
+                    "requests": 0, "prompt_chars": 0, "failures": 0}
+# (book, chapter) -> [(candidate_start, raw batched answer or None)]
+BATCHED_ANSWERS = {}
+
+def record_batched(citations, answers):
+    """Keep a chapter's batched answers as returned, before they are merged into its citations."""
+    if citations:
+        key = (citations[0]["book"], str(citations[0]["chapter"]))
+        BATCHED_ANSWERS[key] = [(c["start_verse"], res) for c, res in zip(citations, answers)]
+
+def validate_batched_chapter(book, chapter_num, verses, batched):
+    """
+    Compare batch-refined blocks with per-block answers for the same
+    candidates. batched is a list of (candidate_start, raw batched answer)
+    pairs from BATCHED_ANSWERS.
+    """
+    for start, res in batched:
+        single = expand_block_with_ollama(book, chapter_num, verses, start, BATCH_VALIDATION)
+        BATCH_VALIDATION["blocks"] += 1
+        if not res or "end_verse" not in res or not single or "end_verse" not in single:
+            BATCH_VALIDATION["missing"] += 1
+            continue
+        if res["end_verse"] == single["end_verse"]:
+            BATCH_VALIDATION["same_end"] += 1
+            if res.get("start_verse") == single.get("start_verse"):
+                BATCH_VALIDATION["same_range"] += 1
+        else:
+            print(f"[DIFF] {book} {chapter_num}:{start} batched={res.get('start_verse')}-{res['end_verse']} "
+                  f"single={single.get('start_verse')}-{single['end_verse']}")
+
+def refine_summary():
+    lines = [f"Ollama requests: {REFINE_STATS['requests']} "
+             f"(~{REFINE_STATS['prompt_chars'] // 4} prompt tokens), "
+             f"{REFINE_STATS['failures']} failed"]
+    lines.append(gate_summary(REFINE_THRESHOLD))
+    if ADAPTIVE_WINDOW:
+        lines.append(window_summary())
+    if PLAN_BLOCKS:
+        lines.append(plan_summary())
+    if BATCH_VALIDATION["blocks"]:
+        v = BATCH_VALIDATION
+        lines.append(f"Batch validation: {v['same_range']}/{v['blocks']} identical ranges, "
+                     f"{v['same_end']}/{v['blocks']} identical end verses, {v['missing']} unanswered "
+                     f"({v['requests']} per-block requests, not counted above)")
+    return "\n".join(lines)
+
+def apply_refinement(c, res, verses):
+    """
+    Take the range of a model or classifier answer for citation c. Answers
+    whose start is not a verse of the chapter or whose end comes before
+    their start are ignored (c keeps its range); an end past the chapter's
+    last verse is clamped to the last verse up to it.
+    """
+    if res and "start_verse" in res and "end_verse" in res:
+        try:
+            start, end = int(res["start_verse"]), int(res["end_verse"])
+        except (TypeError, ValueError):
+            return c
+        if end < start or str(start) not in verses:
+            print(f"[WARN] ignoring answer {start}-{end} for {c['book']} {c['chapter']}:{c['start_verse']}")
+            return c
+        end = max(v for v in map(int, verses) if v <= end)
+        c["start_verse"] = start
+        c["end_verse"] = end
+        c["via"] = res.get("via", "direct")
+        c["confidence"] = res.get("confidence", 1.0)
+        c["evidence"] = res.get("evidence_phrases", [])
+    return c
 
 # ---------------------------------------------
 # Block extraction
 # ---------------------------------------------
-def extract_blocks_for_chapter(book: str, chapter_num: str, verses: dict):
+def find_regex_blocks(book: str, chapter_num: str, verses: dict, flags: dict = None):
+    """
+    flags: optional {verse: (opener indices, is_terminator)} from a corpus
+    scan; without it every verse is searched with OPENERS/TERMINATORS.
+    Citations keep the indices of every opener matching their start verse
+    ("openers") and the first of them ("opener").
+    """
     vkeys = sorted(map(int, verses.keys()))
+    if flags is None:
+        flags = {
+            v: (matching(verses[str(v)], OPENERS), is_any(verses[str(v)], TERMINATORS))
+            for v in vkeys
+        }
     citations = []
     in_block = False
     start_v = None
 
-    def close_block(last_v):
+    def close_block(last_v, terminated):
         nonlocal in_block, start_v
         if in_block and start_v is not None:
             citations.append({
@@ -136,81 +629,256 @@ def extract_blocks_for_chapter(book: str, chapter_num: str, verses: dict):
                 "chapter": chapter_num,
                 "start_verse": int(start_v),
                 "end_verse": int(last_v),
-                "text": verses[str(start_v)]
+                "text": verses[str(start_v)],
+                "opener": flags[start_v][0][0],
+                "openers": list(flags[start_v][0]),
+                "terminated": terminated
             })
         in_block = False
         start_v = None
 
     for v in vkeys:
-        text = verses[str(v)]
+        openers, terminator = flags[v]
         if not in_block:
-            if is_any(text, OPENERS):
+            if openers:
                 in_block = True
                 start_v = v
         else:
-            if is_any(text, TERMINATORS):
-                close_block(v-1)
-                if is_any(text, OPENERS):
+            if terminator:
+                close_block(v-1, True)
+                if openers:
                     in_block = True
                     start_v = v
     if in_block:
-        close_block(vkeys[-1])
+        close_block(vkeys[-1], False)
+    return citations
+
+def extract_blocks_for_chapter(book: str, chapter_num: str, verses: dict):
+    citations = find_regex_blocks(book, chapter_num, verses)
 
     # Optionally refine with Ollama
     if USE_OLLAMA:
-        refined = []
-        for c in citations:
-            res = expand_block_with_ollama(book, chapter_num, verses, c["start_verse"])
-            if res and "start_verse" in res and "end_verse" in res:
-                c["start_verse"] = res["start_verse"]
-                c["end_verse"] = res["end_verse"]
-                c["via"] = res.get("via", "direct")
-                c["confidence"] = res.get("confidence", 1.0)
-                c["evidence"] = res.get("evidence_phrases", [])
-            refined.append(c)
-        return refined
+        return refine_chapters([(book, chapter_num, verses, citations)])[0]
     return citations
 
 # ---------------------------------------------
 # Extract across OT
 # ---------------------------------------------
-def extract_god_words(kjv_data):
-    ot_books = [
-        'Genesis','Exodus','Leviticus','Numbers','Deuteronomy','Joshua','Judges','Ruth',
-        '1 Samuel','2 Samuel','1 Kings','2 Kings','1 Chronicles','2 Chronicles','Ezra',
-        'Nehemiah','Esther','Job','Psalms','Proverbs','Ecclesiastes','Song of Solomon',
-        'Isaiah','Jeremiah','Lamentations','Ezekiel','Daniel','Hosea','Joel','Amos',
-        'Obadiah','Jonah','Micah','Nahum','Habakkuk','Zephaniah','Haggai','Zechariah','Malachi'
+OT_BOOKS = [
+    'Genesis','Exodus','Leviticus','Numbers','Deuteronomy','Joshua','Judges','Ruth',
+    '1 Samuel','2 Samuel','1 Kings','2 Kings','1 Chronicles','2 Chronicles','Ezra',
+    'Nehemiah','Esther','Job','Psalms','Proverbs','Ecclesiastes','Song of Solomon',
+    'Isaiah','Jeremiah','Lamentations','Ezekiel','Daniel','Hosea','Joel','Amos',
+    'Obadiah','Jonah','Micah','Nahum','Habakkuk','Zephaniah','Haggai','Zechariah','Malachi'
+]
+
+def extract_book(kjv_data, book, scan):
+    """Regex pass plus optional refinement for one book; returns its blocks in order."""
+    with span("book", book=book):
+        return _extract_book(kjv_data, book, scan)
+
+def _extract_book(kjv_data, book, scan):
+    chapters = []
+    for chapter_num, verses in kjv_data[book].items():
+        if not isinstance(verses, dict):
+            continue
+        chapters.append((book, str(chapter_num), verses))
+
+    # Regex pass first, then (optionally) refine; with OLLAMA_CONCURRENCY > 1
+    # the model calls overlap across all chapters of the book
+    chapter_blocks = []
+    for b, c, v in chapters:
+        with span("chapter", chapter=c):
+            chapter_blocks.append((b, c, v, find_regex_blocks(b, c, v, scan.chapter_flags(b, c))))
+    if USE_OLLAMA:
+        refined = refine_chapters(chapter_blocks)
+        if REFINE_BACKEND == "ollama" and OLLAMA_BATCH_CHAPTERS and VALIDATE_BATCH:
+            # only the starts that went out in a batched prompt, against its raw answers
+            for b, c, v, _ in chapter_blocks:
+                batched = BATCHED_ANSWERS.pop((b, c), None)
+                if batched:
+                    validate_batched_chapter(b, c, v, batched)
+        chapter_blocks = [(b, c, v, blocks) for (b, c, v, _), blocks in zip(chapter_blocks, refined)]
+
+    return [
+        {
+            "book": b["book"],
+            "chapter": b["chapter"],
+            "start_verse": b["start_verse"],
+            "end_verse": b["end_verse"],
+            "text": b["text"].strip(),
+            "via": b.get("via", "direct"),
+            "confidence": b.get("confidence", 1.0),
+            "evidence": b.get("evidence", [])
+        }
+        for *_, blocks in chapter_blocks for b in blocks
     ]
 
+def number_citations(blocks):
     god_words = []
-    citation_id = 1
-    for book in ot_books:
-        if book not in kjv_data:
-            continue
-        for chapter_num, verses in kjv_data[book].items():
-            if not isinstance(verses, dict):
-                continue
-            blocks = extract_blocks_for_chapter(book, str(chapter_num), verses)
-            for b in blocks:
-                god_words.append({
-                    "id": citation_id,
-                    "reference": f"{b['book']} {b['chapter']}:{b['start_verse']}-{b['end_verse']}",
-                    "book": b["book"],
-                    "chapter": b["chapter"],
-                    "start_verse": b["start_verse"],
-                    "end_verse": b["end_verse"],
-                    "text": b["text"].strip(),
-                    "via": b.get("via", "direct"),
-                    "confidence": b.get("confidence", 1.0),
-                    "evidence": b.get("evidence", [])
-                })
-                citation_id += 1
+    for citation_id, b in enumerate(blocks, start=1):
+        god_words.append({
+            "id": citation_id,
+            "reference": f"{b['book']} {b['chapter']}:{b['start_verse']}-{b['end_verse']}",
+            **b
+        })
     return god_words
 
+def _regex_book_worker(job):
+    book, chapters, trace = job
+    if trace:
+        TRACER.enable()
+        TRACER.events = []
+    with span("scan", book=book):
+        scan = DETECTOR.scan(Corpus({book: chapters}, [book]))
+    blocks = extract_book({book: chapters}, book, scan)
+    return blocks, scan.hits, TRACER.events
+
+def extract_books_in_processes(kjv_data, books, workers):
+    """
+    Regex-only extraction with one task per book spread over a process
+    pool. Yields (book, blocks, pattern_hits) in the order of books, so the
+    merged output and citation ids match a serial run exactly.
+    """
+    jobs = [(book, kjv_data[book], TRACER.enabled) for book in books]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for book, (blocks, hits, events) in zip(books, pool.map(_regex_book_worker, jobs)):
+            TRACER.merge(events)
+            yield book, blocks, hits
+
+def extract_books_serially(kjv_data, books):
+    """Same contract as extract_books_in_processes(), with one corpus-wide scan."""
+    with span("scan", books=len(books)):
+        scan = DETECTOR.scan(Corpus(kjv_data, books))
+    hits = scan.hits  # reported once, with the first book
+    for book in books:
+        yield book, extract_book(kjv_data, book, scan), hits
+        hits = Counter()
+
+def extract_god_words(kjv_data, stream=None, resume=False, only=None):
+    """
+    stream: optional BookCheckpointStream. Each finished book is appended
+    to it and checkpointed; with resume=True books already checkpointed are
+    skipped, unless the rule set or the book's verses changed since. The
+    returned citations are compacted from the stream, so they have the
+    same shape and numbering as an uninterrupted run.
+
+    only: optional subset of OT_BOOKS to extract (incremental runs). Their
+    checkpoints are discarded before resuming, and only their blocks are
+    returned.
+    """
+    completed = set()
+    if stream:
+        inputs = {b: content_hash(kjv_data[b]) for b in OT_BOOKS if b in kjv_data}
+        completed = stream.start(resume, content_hash(rule_set()), inputs, drop=only or ())
+    books = []
+    for book in OT_BOOKS:
+        if book not in kjv_data or (only is not None and book not in only):
+            continue
+        if book in completed:
+            print(f"Skipping {book} (checkpointed)")
+            continue
+        books.append(book)
+
+    # The regex pass is CPU-bound, so without the model it is spread over
+    # processes; with the model, time goes to Ollama and books run in turn
+    if not USE_OLLAMA and REGEX_WORKERS > 1 and len(books) > 1:
+        results = extract_books_in_processes(kjv_data, books, REGEX_WORKERS)
+    else:
+        results = extract_books_serially(kjv_data, books)
+
+    blocks = []
+    hits = Counter()
+    for book, book_blocks, book_hits in results:
+        hits.update(book_hits)
+        if stream:
+            stream.write_book(book, book_blocks)
+        else:
+            blocks.extend(book_blocks)
+
+    if PRINT_PATTERN_STATS:
+        print_pattern_stats(DETECTOR, hits)
+    if stream:
+        blocks = stream.blocks(OT_BOOKS, only)
+    return number_citations(blocks)
+
+class RefinedStrategy(SpeakerStrategy):
+    """
+    extract_god_words() as a SpeakerEngine strategy: regex blocks over the
+    shared corpus, refined per the module settings (USE_OLLAMA,
+    REFINE_BACKEND, ...). No checkpoint stream or process pool; for
+    resumable long runs use this script directly.
+    """
+
+    name = "refined"
+    books = OT_BOOKS
+
+    def __init__(self):
+        self.blocks = []
+
+    def prepare(self, corpus):
+        self.kjv_data = corpus.kjv_data
+        self.scan = DETECTOR.scan(corpus, self.books)
+
+    def book(self, book, chapters):
+        self.blocks.extend(extract_book(self.kjv_data, book, self.scan))
+
+    def finish(self):
+        if PRINT_PATTERN_STATS:
+            self.scan.print_stats()
+        return number_citations(self.blocks)
+
 # ---------------------------------------------
 # Save results
 # ---------------------------------------------
+def rule_set():
+    """Everything besides a book's verses that decides its blocks."""
+    rules = {
+        "openers": [p.pattern for p in OPENERS],
+        "terminators": [p.pattern for p in TERMINATORS],
+        "refine": None,
+    }
+    if USE_OLLAMA and REFINE_BACKEND == "classifier":
+        with open(CLASSIFIER_PATH, 'rb') as f:
+            model = hashlib.sha256(f.read()).hexdigest()
+        rules["refine"] = {"backend": "classifier", "model": model, "threshold": CLASSIFIER_THRESHOLD,
+                           "plan": PLAN_BLOCKS}
+    elif USE_OLLAMA:
+        rules["refine"] = {
+            "backend": "ollama", "model": OLLAMA_MODEL, "system": SYSTEM,
+            "prompt": BATCH_PROMPT_TMPL if OLLAMA_BATCH_CHAPTERS else PROMPT_TMPL,
+            "plan": PLAN_BLOCKS, "threshold": REFINE_THRESHOLD, "opener_confidence": OPENER_CONFIDENCE,
+            "window": [ADAPTIVE_WINDOW, WINDOW_TOKENS, WINDOW_LOOKAHEAD, WINDOW_MAX_EXTENSIONS],
+        }
+    return rules
+
+def citation_key(c):
+    return (c["book"], str(c["chapter"]), int(c["start_verse"]))
+
+def extract_incrementally(kjv_data, output_file, stream=None, resume=False):
+    """
+    Re-extract only the books whose verses or rule set changed since the
+    manifest next to output_file was written, and splice them into the
+    existing output (ids of unchanged citations are kept). Falls back to a
+    full run when there is no previous output. Returns (citations, manifest).
+    """
+    manifest = BookManifest(manifest_path(output_file))
+    books = [b for b in OT_BOOKS if b in kjv_data]
+    rules = content_hash(rule_set())
+    if not os.path.exists(output_file):
+        print("No previous output; extracting every book")
+        citations = extract_god_words(kjv_data, stream, resume)
+    else:
+        with open(output_file, 'r', encoding='utf-8') as f:
+            old = json.load(f)["citations"]
+        changed = manifest.changed(kjv_data, books, rules)
+        print(f"Incremental: {len(changed)} of {len(books)} books changed"
+              + (f" ({', '.join(changed)})" if changed else ""))
+        fresh = extract_god_words(kjv_data, stream, resume, only=changed) if changed else []
+        citations = splice_citations(old, fresh, changed, OT_BOOKS, citation_key)
+    manifest.update(kjv_data, books, rules)
+    return citations, manifest
+
 def save_to_json(data, output_file):
     with open(output_file, 'w', encoding='utf-8') as f:
         json.dump({
@@ -224,23 +892,87 @@ def save_to_json(data, output_file):
 # ---------------------------------------------
 # Main
 # ---------------------------------------------
+def set_regex_workers(n):
+    global REGEX_WORKERS
+    REGEX_WORKERS = max(1, n)
+
+def set_refine_backend(name):
+    global USE_OLLAMA, REFINE_BACKEND
+    USE_OLLAMA = True
+    REFINE_BACKEND = name
+
+def set_refine_threshold(t):
+    global REFINE_THRESHOLD
+    REFINE_THRESHOLD = t
+
 def main():
-    kjv_json_file = "../../bibles/KJV.json"
-    output_file = "god_words.json"
+    parser = argparse.ArgumentParser(description="Extract blocks of God's speech from the KJV Old Testament")
+    parser.add_argument("--kjv", default="../../bibles/KJV.json", help="path to KJV.json")
+    parser.add_argument("--output", default="god_words.json", help="compacted output file")
+    parser.add_argument("--stream", default="god_words.partial.jsonl",
+                        help="append-only JSONL of blocks, checkpointed after every book; "
+                             "removed once --output is saved")
+    parser.add_argument("--resume", action="store_true",
+                        help="skip books already checkpointed in --stream")
+    parser.add_argument("--incremental", action="store_true",
+                        help="re-extract only books whose verses or rules changed since the last run "
+                             "(per the .manifest.json next to --output, written by --incremental runs) "
+                             "and splice them into it")
+    parser.add_argument("--workers", type=int, default=REGEX_WORKERS,
+                        help="processes for the regex-only pass (1 = serial)")
+    parser.add_argument("--refine", choices=["ollama", "classifier"],
+                        help="refine regex blocks with this backend (default: USE_OLLAMA / REFINE_BACKEND)")
+    parser.add_argument("--refine-threshold", type=float, default=REFINE_THRESHOLD,
+                        help="with USE_OLLAMA, blocks scoring at least this skip the model (1.0 = refine all)")
+    parser.add_argument("--trace", metavar="TRACE_JSON",
+                        help="record spans and write a Chrome/Perfetto trace plus a per-stage summary")
+    args = parser.parse_args()
+    set_regex_workers(args.workers)
+    set_refine_threshold(args.refine_threshold)
+    if args.refine:
+        set_refine_backend(args.refine)
+    trace_path = args.trace or enable_from_env()
+    if trace_path:
+        TRACER.enable()
+    kjv_json_file = args.kjv
+    output_file = args.output
 
     print(f"Loading KJV JSON...")
-    kjv_data = load_kjv_json(kjv_json_file)
+    with span("load_kjv"):
+        kjv_data = load_kjv_json(kjv_json_file)
     print(f"Loaded {len(kjv_data)} books")
 
     print("Extracting...")
-    god_words = extract_god_words(kjv_data)
+    stream = BookCheckpointStream(args.stream)
+    manifest = None
+    with span("extract"):
+        if args.incremental:
+            god_words, manifest = extract_incrementally(kjv_data, output_file, stream, args.resume)
+        else:
+            god_words = extract_god_words(kjv_data, stream, args.resume)
 
     print(f"Found {len(god_words)} blocks of divine speech")
-    save_to_json(god_words, output_file)
+    with span("save"):
+        save_to_json(god_words, output_file)
+        stream.remove()
+        if manifest is not None:
+            manifest.save()
+        elif os.path.exists(manifest_path(output_file)):
+            # it describes an earlier output, not the one just written
+            os.remove(manifest_path(output_file))
+    if USE_OLLAMA and REFINE_BACKEND == "classifier":
+        print(classifier_summary())
+    elif USE_OLLAMA:
+        print(refine_summary())
+        print(get_transport().summary())
+        if get_refine_cache() is not None:
+            print(get_refine_cache().summary())
 
     for c in god_words[:5]:
         print(f"{c['reference']} via={c['via']} conf={c['confidence']}")
         print(" evidence:", c.get("evidence"))
 
+    TRACER.finish(trace_path)
+
 if __name__ == "__main__":
     main()
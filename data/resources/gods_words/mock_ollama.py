@@ -0,0 +1,236 @@
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ---------------------------------------------
+# Deterministic stand-in for Ollama's /api/chat
+# ---------------------------------------------
+class MockOllamaConfig:
+    """
+    latency/jitter: seconds per request (uniform in latency +/- jitter).
+    error_rate: share of requests answered with HTTP 500.
+    bad_json_rate: share answered 200 with content that is not JSON.
+    stall_rate/stall: share of requests that hang for `stall` seconds before
+    answering, like a model that has stopped making progress.
+    block_length: verses per block in generated answers (end = start + block_length - 1).
+    narration: optional regex for verses where narration resumes; when set,
+    a generated block ends just before the first such verse after its start
+    in the prompt's window (or on the window's last verse), the way a
+    model reading the verses would.
+    answers: canned answers keyed by "<book> <chapter>:<start>", used instead
+    of generated ones when present.
+    """
+
+    def __init__(self, latency=0.2, jitter=0.0, error_rate=0.0, bad_json_rate=0.0,
+                 block_length=3, answers=None, seed=0, stall_rate=0.0, stall=30.0, narration=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.bad_json_rate = bad_json_rate
+        self.block_length = block_length
+        self.answers = answers or {}
+        self.seed = seed
+        self.stall_rate = stall_rate
+        self.stall = stall
+        self.narration = re.compile(narration, re.IGNORECASE) if narration else None
+
+def _field(prompt, name):
+    m = re.search(rf'^{name}: (.+)$', prompt, re.MULTILINE)
+    return m.group(1).strip() if m else None
+
+def _window(prompt):
+    """[(verse, text)] listed under VERSES in the prompt."""
+    m = re.search(r'^VERSES \(ordered\):\n(.*?)\n\n', prompt, re.MULTILINE | re.DOTALL)
+    if not m:
+        return []
+    pairs = []
+    for line in m.group(1).splitlines():
+        num, _, text = line.partition(" ")
+        if num.isdigit():
+            pairs.append((int(num), text))
+    return pairs
+
+def generate_answer(prompt, config):
+    """The JSON content the mock model returns for one prompt."""
+    book, chapter = _field(prompt, "BOOK"), _field(prompt, "CHAPTER")
+    window = _window(prompt) if config.narration else []
+
+    def end_for(start):
+        if not window:
+            return start + config.block_length - 1
+        end = start
+        for v, text in window:
+            if v <= start:
+                continue
+            if config.narration.search(text):
+                break
+            end = v
+        return end
+
+    def block(start):
+        canned = config.answers.get(f"{book} {chapter}:{start}")
+        if canned is not None:
+            return dict(canned)
+        return {
+            "start_verse": start,
+            "end_verse": end_for(start),
+            "via": "direct",
+            "evidence_phrases": [],
+            "confidence": 0.9,
+        }
+
+    starts = _field(prompt, "CANDIDATE_START_VERSES")
+    if starts is not None:
+        blocks = []
+        for s in starts.split(","):
+            b = block(int(s))
+            b["candidate_start"] = int(s)
+            blocks.append(b)
+        return {"blocks": blocks}
+    return block(int(_field(prompt, "CANDIDATE_START_VERSE")))
+
+class MockOllamaServer:
+    """
+    Threaded HTTP server answering POST /api/chat like Ollama with
+    format=json. Latency and failures are drawn from an RNG seeded by
+    (seed, prompt, attempt number for that prompt), so a run is repeatable
+    regardless of the order concurrent requests arrive in, and a retried
+    prompt sees a fresh draw.
+    """
+
+    def __init__(self, config=None, host="127.0.0.1", port=0):
+        self.config = config or MockOllamaConfig()
+        self.stats = {"requests": 0, "errors": 0, "bad_json": 0, "stalls": 0}
+        self._attempts = {}
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/api/chat"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _rng(self, prompt):
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        with self._lock:
+            attempt = self._attempts.get(digest, 0)
+            self._attempts[digest] = attempt + 1
+            self.stats["requests"] += 1
+        return random.Random(f"{self.config.seed}:{digest}:{attempt}")
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Keep-alive clients would otherwise hit Nagle/delayed-ACK stalls
+            # between the header and body writes
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                if self.path != "/api/chat":
+                    self._send(404, {"error": "not found"})
+                    return
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                prompt = next((m["content"] for m in body.get("messages", []) if m.get("role") == "user"), "")
+                config = server.config
+                rng = server._rng(prompt)
+
+                delay = config.latency + rng.uniform(-config.jitter, config.jitter)
+                if rng.random() < config.stall_rate:
+                    server._count("stalls")
+                    delay = config.stall
+                time.sleep(max(0.0, delay))
+
+                roll = rng.random()
+                if roll < config.error_rate:
+                    server._count("errors")
+                    self._send(500, {"error": "mock failure"})
+                    return
+                if roll < config.error_rate + config.bad_json_rate:
+                    server._count("bad_json")
+                    content = "not json"
+                else:
+                    content = json.dumps(generate_answer(prompt, config))
+                self._send(200, {
+                    "model": body.get("model"),
+                    "message": {"role": "assistant", "content": content},
+                    "done": True,
+                    "prompt_eval_count": len(prompt) // 4,
+                })
+
+            def _send(self, status, payload):
+                out = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(out)))
+                try:
+                    self.end_headers()
+                    self.wfile.write(out)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # client gave up (e.g. its deadline passed during a stall)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a mock Ollama /api/chat server")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--bad-json-rate", type=float, default=0.0)
+    parser.add_argument("--stall-rate", type=float, default=0.0)
+    parser.add_argument("--stall", type=float, default=30.0)
+    parser.add_argument("--block-length", type=int, default=3)
+    parser.add_argument("--narration", help="regex for verses where narration resumes (ends generated blocks)")
+    parser.add_argument("--answers", help='JSON file of canned answers keyed by "<book> <chapter>:<start>"')
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    answers = None
+    if args.answers:
+        with open(args.answers, 'r', encoding='utf-8') as f:
+            answers = json.load(f)
+    config = MockOllamaConfig(args.latency, args.jitter, args.error_rate, args.bad_json_rate,
+                              args.block_length, answers, args.seed, args.stall_rate, args.stall, args.narration)
+    server = MockOllamaServer(config, port=args.port)
+    print(f"Mock Ollama listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+if __name__ == "__main__":
+    main()
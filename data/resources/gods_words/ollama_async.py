@@ -0,0 +1,66 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+# ---------------------------------------------
+# Concurrent Ollama client
+# ---------------------------------------------
+class AsyncOllamaRefiner:
+    """
+    Send many /api/chat payloads to Ollama with at most `concurrency`
+    requests in flight, through an OllamaTransport (retries, deadlines,
+    circuit breaker). The transport keeps a requests.Session per worker
+    thread, so TCP connections are reused across blocks and chapters.
+
+    Results come back in the same order as the payloads; a failed request
+    yields None, matching expand_block_with_ollama().
+    """
+
+    def __init__(self, transport, concurrency=4):
+        self.transport = transport
+        self.concurrency = max(1, int(concurrency))
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _get_executor(self):
+        # Kept across refine() calls so worker threads (and their sessions)
+        # survive between waves of requests.
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        return self._executor
+
+    async def _refine_one(self, loop, executor, semaphore, index, label, payload, on_result):
+        async with semaphore:
+            result = await loop.run_in_executor(executor, self.transport.chat, label, payload)
+        if on_result is not None:
+            on_result(index, result)
+        return result
+
+    async def refine(self, jobs, on_result=None):
+        """
+        jobs: list of (label, payload). Returns parsed JSON answers in order.
+        on_result(index, result) is called as each request finishes, in
+        completion order, so callers can persist answers as they arrive.
+        """
+        if not jobs:
+            return []
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        executor = self._get_executor()
+        tasks = [
+            self._refine_one(loop, executor, semaphore, i, label, payload, on_result)
+            for i, (label, payload) in enumerate(jobs)
+        ]
+        return list(await asyncio.gather(*tasks))
+
+    def refine_all(self, jobs, on_result=None):
+        return asyncio.run(self.refine(jobs, on_result))
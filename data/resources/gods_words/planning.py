@@ -0,0 +1,86 @@
+from collections import deque
+
+# ---------------------------------------------
+# Overlap-aware block planning
+# ---------------------------------------------
+PLAN_STATS = {"candidates": 0, "merged_candidates": 0, "skipped_covered": 0, "reconciled": 0}
+
+def merge_overlapping(blocks):
+    """
+    Merge blocks whose verse ranges overlap. Blocks must be sorted by
+    start_verse; the earlier block keeps its text and via, the merged block
+    keeps the lower confidence and the union of the evidence.
+    """
+    merged = []
+    for b in blocks:
+        if merged and b["start_verse"] <= merged[-1]["end_verse"]:
+            prev = merged[-1]
+            prev["end_verse"] = max(prev["end_verse"], b["end_verse"])
+            if "confidence" in b or "confidence" in prev:
+                prev["confidence"] = min(prev.get("confidence", 1.0), b.get("confidence", 1.0))
+            evidence = prev.get("evidence", []) + [e for e in b.get("evidence", []) if e not in prev.get("evidence", [])]
+            if evidence:
+                prev["evidence"] = evidence
+            continue
+        merged.append(b)
+    return merged
+
+class ChapterPlan:
+    """
+    Refinement order for one chapter's candidates. Candidates are handed
+    out one at a time, in verse order; a candidate whose start verse is
+    already inside a refined block is skipped instead of being sent to the
+    model. accepted blocks (taken without the model) count as refined from
+    the start. reconcile() turns the refined blocks into a non-overlapping
+    set.
+    """
+
+    def __init__(self, book, chapter, verses, candidates, accepted=()):
+        self.book = book
+        self.chapter = chapter
+        self.verses = verses
+        ordered = sorted(candidates, key=lambda c: c["start_verse"])
+        merged = merge_overlapping(ordered)
+        PLAN_STATS["candidates"] += len(candidates)
+        PLAN_STATS["merged_candidates"] += len(ordered) - len(merged)
+        self.pending = deque(merged)
+        self.done = list(accepted)
+        self.in_flight = None
+
+    def covered(self, verse):
+        return any(b["start_verse"] <= verse <= b["end_verse"] for b in self.done)
+
+    def next_candidate(self):
+        """Next candidate that still needs the model, or None when finished."""
+        if self.in_flight is not None:
+            return None
+        while self.pending:
+            c = self.pending.popleft()
+            if self.covered(c["start_verse"]):
+                PLAN_STATS["skipped_covered"] += 1
+                continue
+            self.in_flight = c
+            return c
+        return None
+
+    def record(self, c):
+        """Store a candidate after refinement (or with its regex range on failure)."""
+        self.done.append(c)
+        if c is self.in_flight:
+            self.in_flight = None
+
+    def reconcile(self):
+        return reconcile_blocks(self.done)
+
+def reconcile_blocks(blocks):
+    """Non-overlapping, start-ordered version of a chapter's refined blocks."""
+    ordered = sorted(blocks, key=lambda b: (b["start_verse"], b["end_verse"]))
+    result = merge_overlapping(ordered)
+    PLAN_STATS["reconciled"] += len(ordered) - len(result)
+    return result
+
+def plan_summary():
+    s = PLAN_STATS
+    return (f"Planning: {s['candidates']} candidates, {s['merged_candidates']} merged before refinement, "
+            f"{s['skipped_covered']} model calls avoided (already covered), "
+            f"{s['reconciled']} overlapping refined blocks reconciled")
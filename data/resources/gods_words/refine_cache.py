@@ -0,0 +1,75 @@
+import hashlib
+import json
+import sqlite3
+
+# ---------------------------------------------
+# Persistent cache for Ollama refinement answers
+# ---------------------------------------------
+def cache_key(payload, template=""):
+    """
+    Hash everything that can change the model's answer: model name, system
+    prompt, options and the filled-in user prompt (which carries the verse
+    window), plus the raw prompt template.
+    """
+    material = json.dumps({"template": template, "payload": payload},
+                          sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+class RefineCache:
+    """
+    SQLite-backed map from cache_key() to the parsed model answer.
+    Every put() is committed immediately, so an interrupted run keeps
+    everything it already paid for.
+    """
+
+    def __init__(self, path="ollama_cache.sqlite"):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS refinements (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                response TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        self.conn.commit()
+
+    def get(self, key):
+        row = self.conn.execute(
+            'SELECT response FROM refinements WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key, response, model=None):
+        self.conn.execute(
+            'INSERT OR REPLACE INTO refinements (key, model, response) VALUES (?, ?, ?)',
+            (key, model, json.dumps(response, ensure_ascii=False))
+        )
+        self.conn.commit()
+        self.writes += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def summary(self):
+        s = self.stats()
+        return (f"cache {self.path}: {s['hits']} hits, {s['misses']} misses, "
+                f"{s['writes']} writes ({s['hit_rate']:.1%} hit rate)")
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,60 @@
+import re
+
+# ---------------------------------------------
+# Confidence gate for model refinement
+# ---------------------------------------------
+GATE_STATS = {"scored": 0, "accepted": 0, "sent": 0}
+
+SAYING = re.compile(r'\bsaying\b', re.IGNORECASE)
+MAX_SCORE = 0.95  # regex evidence alone never reaches 1.0
+
+def score_block(block, opener_confidence):
+    """
+    Confidence in a regex block from its own evidence:
+      - base strength of the strongest opener matching the start verse
+        (opener_confidence[index] over block["openers"]),
+      - +0.1 when the opener verse says "saying" (a quotation follows),
+      - how it ended: a terminator close by is good, running to the end of
+        the chapter or a long stretch before the terminator is not,
+      - +0.05 for a single-verse block (a formula like "Thus saith the LORD").
+    Blocks need the "openers" and "terminated" keys from find_regex_blocks().
+    """
+    openers = block.get("openers") or []
+    score = max((opener_confidence[i] for i in openers), default=0.5)
+    if SAYING.search(block.get("text", "")):
+        score += 0.1
+
+    length = block["end_verse"] - block["start_verse"] + 1
+    if block.get("terminated"):
+        if length <= 5:
+            score += 0.1
+        elif length > 12:
+            score -= 0.15
+    elif length > 1:
+        score -= 0.15
+    if length == 1:
+        score += 0.05
+    return round(max(0.0, min(MAX_SCORE, score)), 3)
+
+def gate_blocks(blocks, opener_confidence, threshold):
+    """
+    Split a chapter's regex blocks into (accepted, ambiguous). Accepted
+    blocks get their score as confidence and are not sent to the model.
+    """
+    accepted, ambiguous = [], []
+    for b in blocks:
+        score = score_block(b, opener_confidence)
+        GATE_STATS["scored"] += 1
+        if score >= threshold:
+            b["confidence"] = score
+            accepted.append(b)
+        else:
+            ambiguous.append(b)
+    GATE_STATS["accepted"] += len(accepted)
+    GATE_STATS["sent"] += len(ambiguous)
+    return accepted, ambiguous
+
+def gate_summary(threshold):
+    s = GATE_STATS
+    return (f"Confidence gate (threshold {threshold}): {s['accepted']}/{s['scored']} blocks accepted "
+            f"from regex evidence, {s['sent']} left for the model")
@@ -0,0 +1,58 @@
+import pytest
+
+import extract_god_words_v2 as v2
+from mock_ollama import MockOllamaConfig, MockOllamaServer
+
+CHAPTER = {
+    "1": "And the LORD spake unto Moses, saying,",  # confident: never sent to the model
+    "2": "Speak unto the children of Israel.",
+    "3": "And Moses told the people.",
+    "4": "God said, Go up to the mount.",
+    "5": "Go up and see the land.",
+    "6": "And they went up.",
+    "7": "Then the LORD commanded the people to rest.",
+    "8": "And they rested.",
+}
+
+@pytest.fixture
+def batched_run(monkeypatch):
+    for stats in (v2.REFINE_STATS, v2.BATCH_VALIDATION):
+        for key in stats:
+            stats[key] = 0
+    v2.BATCHED_ANSWERS.clear()
+    for name, value in [("USE_OLLAMA", True), ("REFINE_BACKEND", "ollama"), ("OLLAMA_BATCH_CHAPTERS", True),
+                        ("VALIDATE_BATCH", True), ("USE_CACHE", False), ("OLLAMA_CONCURRENCY", 1),
+                        ("OLLAMA_RETRIES", 0), ("REFINE_THRESHOLD", 0.9), ("PRINT_PATTERN_STATS", False)]:
+        monkeypatch.setattr(v2, name, value)
+    with MockOllamaServer(MockOllamaConfig(latency=0.0, block_length=2)) as server:
+        monkeypatch.setattr(v2, "OLLAMA_URL", server.url)
+        v2.reset_transport()
+        yield server
+    v2.reset_transport()
+
+def test_validation_covers_only_batched_starts(batched_run):
+    scan = v2.DETECTOR.scan(v2.Corpus({"Genesis": {"9": CHAPTER}}, ["Genesis"]))
+    blocks = v2.extract_book({"Genesis": {"9": CHAPTER}}, "Genesis", scan)
+
+    assert [b["start_verse"] for b in blocks] == [1, 4, 7]
+    # one batched prompt for the two ambiguous starts; verse 1 passed the gate
+    assert v2.REFINE_STATS["requests"] == 1
+    v = v2.BATCH_VALIDATION
+    assert (v["blocks"], v["requests"], v["same_range"], v["missing"]) == (2, 2, 2, 0)
+    assert batched_run.stats["requests"] == 3
+    assert not v2.BATCHED_ANSWERS
+
+def test_malformed_batched_answers_are_bounded_to_the_chapter(batched_run):
+    batched_run.config.answers = {
+        "Genesis 9:4": {"start_verse": 4, "end_verse": 300},  # runs past the chapter
+        "Genesis 9:7": {"start_verse": 7, "end_verse": 5},  # ends before it starts
+    }
+    kjv = {"Genesis": {"9": CHAPTER}}
+    blocks = v2.extract_book(kjv, "Genesis", v2.DETECTOR.scan(v2.Corpus(kjv, ["Genesis"])))
+    # 4 is clamped to the last verse and absorbs 7, which kept its regex range
+    assert [(b["start_verse"], b["end_verse"]) for b in blocks] == [(1, 2), (4, 8)]
+
+def test_answers_starting_outside_the_chapter_are_ignored():
+    c = {"book": "Genesis", "chapter": "9", "start_verse": 4, "end_verse": 6}
+    for res in ({"start_verse": 300, "end_verse": 301}, {"start_verse": 0, "end_verse": 5}):
+        assert v2.apply_refinement(dict(c), res, CHAPTER) == c
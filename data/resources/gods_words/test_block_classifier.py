@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from block_classifier import BlockEndClassifier, agreement_report, load_citations, train
+
+# LLM-refined blocks over the conftest corpus, as god_words.json stores them
+LLM_BLOCKS = [
+    {"book": "Genesis", "chapter": "2", "start_verse": 1, "end_verse": 2},
+    {"book": "Genesis", "chapter": "2", "start_verse": 4, "end_verse": 5},
+    {"book": "Exodus", "chapter": "1", "start_verse": 1, "end_verse": 2},
+    {"book": "Exodus", "chapter": "1", "start_verse": 4, "end_verse": 5},
+    {"book": "Leviticus", "chapter": "1", "start_verse": 2, "end_verse": 2},
+]
+
+@pytest.fixture
+def labels(tmp_path):
+    path = tmp_path / "god_words.json"
+    path.write_text(json.dumps({"citations": LLM_BLOCKS}), encoding="utf-8")
+    return str(path)
+
+def classify(model, kjv_data, blocks):
+    out = []
+    for b in blocks:
+        proba = model.chapter_proba(kjv_data[b["book"]][b["chapter"]])
+        end, _ = model.block_end(proba, b["start_verse"])
+        out.append(dict(b, end_verse=end))
+    return out
+
+def test_trained_classifier_agrees_with_the_llm_blocks(kjv_data, labels, tmp_path):
+    citations = load_citations(labels)
+    model = train(kjv_data, citations, holdout_every=0, epochs=100)
+    assert (model.meta["examples"], model.meta["citations"]) == (9, 5)
+    model.save(str(tmp_path / "model.npz"))
+    model = BlockEndClassifier.load(str(tmp_path / "model.npz"))
+
+    report = agreement_report(classify(model, kjv_data, citations), citations)
+    assert report["blocks"] == report["reference_blocks"] == report["shared_starts"] == 5
+    assert report["same_end"] == 5 and report["mean_end_diff"] == 0.0
+    assert report["verse_f1"] == 1.0
+
+def test_agreement_counts():
+    ours = [dict(LLM_BLOCKS[0], end_verse=3), LLM_BLOCKS[1], dict(LLM_BLOCKS[2], start_verse=2)]
+    report = agreement_report(ours, LLM_BLOCKS)
+    assert (report["blocks"], report["reference_blocks"], report["shared_starts"], report["same_end"]) == (3, 5, 2, 1)
+    assert report["mean_end_diff"] == 0.5
+    # ours: Gen 2:1-3, 2:4-5, Exod 1:2 = 6 verses, 5 of them in the 9 reference verses
+    assert report["verse_precision"] == pytest.approx(5 / 6)
+    assert report["verse_recall"] == pytest.approx(5 / 9)
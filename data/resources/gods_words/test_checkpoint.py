@@ -0,0 +1,56 @@
+import json
+
+import extract_god_words_v2 as v2
+from checkpoint import BookCheckpointStream
+
+BLOCK = {"book": "Genesis", "chapter": "1", "start_verse": 1, "end_verse": 2}
+
+def write_stream(path, inputs):
+    stream = BookCheckpointStream(str(path))
+    stream.start(False, "rules-1", inputs)
+    stream.write_book("Genesis", [BLOCK])
+    stream.write_book("Exodus", [{**BLOCK, "book": "Exodus"}])
+    return stream
+
+def test_resume_truncates_interrupted_book(tmp_path):
+    path = tmp_path / "s.jsonl"
+    inputs = {"Genesis": "g", "Exodus": "e", "Leviticus": "l"}
+    write_stream(path, inputs)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps({**BLOCK, "book": "Leviticus"}) + "\n")
+        f.write('{"book": "Levi')  # torn line
+
+    stream = BookCheckpointStream(str(path))
+    assert stream.start(True, "rules-1", inputs) == {"Genesis", "Exodus"}
+    assert [b["book"] for b in stream.blocks(["Genesis", "Exodus", "Leviticus"])] == ["Genesis", "Exodus"]
+    stream.write_book("Leviticus", [])
+    assert BookCheckpointStream(str(path)).start(True, "rules-1", inputs) == {"Genesis", "Exodus", "Leviticus"}
+
+def test_resume_drops_books_whose_verses_changed(tmp_path):
+    path = tmp_path / "s.jsonl"
+    write_stream(path, {"Genesis": "g", "Exodus": "e"})
+    stream = BookCheckpointStream(str(path))
+    assert stream.start(True, "rules-1", {"Genesis": "g", "Exodus": "e2"}) == {"Genesis"}
+    assert [b["book"] for b in stream.blocks(["Genesis", "Exodus"])] == ["Genesis"]
+
+def test_resume_under_other_rules_starts_over(tmp_path):
+    path = tmp_path / "s.jsonl"
+    write_stream(path, {"Genesis": "g", "Exodus": "e"})
+    stream = BookCheckpointStream(str(path))
+    assert stream.start(True, "rules-2", {"Genesis": "g", "Exodus": "e"}) == set()
+    assert stream.blocks(["Genesis", "Exodus"]) == []
+
+def test_resumed_run_matches_uninterrupted_one(tmp_path, kjv_data, monkeypatch):
+    monkeypatch.setattr(v2, "PRINT_PATTERN_STATS", False)
+    monkeypatch.setattr(v2, "REGEX_WORKERS", 1)
+    full = v2.extract_god_words(kjv_data, BookCheckpointStream(str(tmp_path / "full.jsonl")))
+
+    path = tmp_path / "partial.jsonl"
+    v2.extract_god_words({"Genesis": kjv_data["Genesis"]}, BookCheckpointStream(str(path)))
+    stream = BookCheckpointStream(str(path))
+    assert v2.extract_god_words(kjv_data, stream, resume=True) == full
+
+    kjv_data["Genesis"]["1"]["2"] = "And there was light."
+    resumed = v2.extract_god_words(kjv_data, BookCheckpointStream(str(path)), resume=True)
+    assert resumed == v2.extract_god_words(kjv_data)
+    assert resumed != full
@@ -0,0 +1,35 @@
+from collections import Counter
+
+import extract_god_words_v2 as v2
+from detection import Corpus, verify_scan
+
+def scan(kjv_data):
+    return v2.DETECTOR.scan(Corpus(kjv_data, list(kjv_data)))
+
+def test_scan_matches_per_verse_search(kjv_data):
+    assert verify_scan(scan(kjv_data), v2.OPENERS, v2.TERMINATORS) == []
+
+def test_scan_records_every_matching_opener(kjv_data):
+    flags = scan(kjv_data).chapter_flags("Genesis", "2")
+    # o3 wins the alternation on both; the more specific o4 / o5 must still be seen
+    assert flags[1] == ((3, 4), False)
+    assert flags[4] == ((3, 5), False)
+    assert flags[2] == ((), False)
+
+def test_hits_match_per_pattern_counts(kjv_data):
+    expected = Counter()
+    for chapters in kjv_data.values():
+        for verses in chapters.values():
+            for text in verses.values():
+                for i in v2.matching(text, v2.OPENERS):
+                    expected[f"o{i}"] += 1
+                for i in v2.matching(text, v2.TERMINATORS):
+                    expected[f"t{i}"] += 1
+    assert scan(kjv_data).hits == expected
+
+def test_regex_blocks_same_with_and_without_scan(kjv_data):
+    s = scan(kjv_data)
+    for book, chapters in kjv_data.items():
+        for chapter, verses in chapters.items():
+            assert (v2.find_regex_blocks(book, chapter, verses, s.chapter_flags(book, chapter))
+                    == v2.find_regex_blocks(book, chapter, verses))
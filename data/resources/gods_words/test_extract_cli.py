@@ -0,0 +1,27 @@
+import subprocess
+import sys
+from pathlib import Path
+
+SCRIPT = Path(__file__).resolve().parent / "extract_god_words_v2.py"
+
+def run(cwd, kjv_path, *args):
+    subprocess.run([sys.executable, str(SCRIPT), "--kjv", str(kjv_path), *args],
+                   cwd=cwd, check=True, capture_output=True)
+
+def test_plain_run_leaves_only_the_output(tmp_path, kjv_path):
+    (tmp_path / "god_words.manifest.json").write_text('{"books": {}}', encoding="utf-8")
+    run(tmp_path, kjv_path, "--workers", "1")
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["KJV.json", "god_words.json"]
+
+def test_incremental_run_keeps_its_manifest(tmp_path, kjv_path):
+    run(tmp_path, kjv_path, "--workers", "1", "--incremental")
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["KJV.json", "god_words.json", "god_words.manifest.json"]
+
+def test_workers_output_is_byte_identical_to_serial(tmp_path, kjv_path):
+    outputs = []
+    for workers in ("1", "3"):
+        out = tmp_path / f"god_words.{workers}.json"
+        run(tmp_path, kjv_path, "--workers", workers, "--output", str(out))
+        outputs.append(out.read_bytes())
+    assert b'"Leviticus' in outputs[0]
+    assert outputs[0] == outputs[1]
@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+import extract_god_words_v2 as v2
+from checkpoint import BookCheckpointStream
+
+@pytest.fixture(autouse=True)
+def serial(monkeypatch):
+    monkeypatch.setattr(v2, "PRINT_PATTERN_STATS", False)
+    monkeypatch.setattr(v2, "REGEX_WORKERS", 1)
+
+def run(kjv_data, output, stream, resume=False):
+    """main() with --incremental, keeping the stream as an interrupted save would."""
+    citations, manifest = v2.extract_incrementally(kjv_data, str(output), stream, resume)
+    v2.save_to_json(citations, str(output))
+    manifest.save()
+    return citations
+
+def test_incremental_resume_reextracts_only_the_edited_book(tmp_path, kjv_data):
+    output = tmp_path / "god_words.json"
+    stream = BookCheckpointStream(str(tmp_path / "god_words.partial.jsonl"))
+    before = run(kjv_data, output, stream)
+
+    kjv_data["Exodus"]["1"]["3"] = "Thus saith the LORD, Let my people go."
+    after = run(kjv_data, output, stream, resume=True)
+
+    expected = v2.extract_god_words(kjv_data)
+    assert len(after) == len(expected)
+    assert [c["reference"] for c in after] == [c["reference"] for c in expected]
+    exodus = [c["reference"] for c in after if c["book"] == "Exodus"]
+    assert exodus != [c["reference"] for c in before if c["book"] == "Exodus"]
+    assert exodus == ["Exodus 1:1-5"]  # the terminator at 1:3 is gone
+
+    unchanged = [c for c in before if c["book"] != "Exodus"]
+    assert [c for c in after if c["book"] != "Exodus"] == unchanged
+    with open(output, 'r', encoding='utf-8') as f:
+        assert json.load(f)["total_citations"] == len(expected)
+
+def test_unchanged_input_reextracts_nothing(tmp_path, kjv_data, capsys):
+    output = tmp_path / "god_words.json"
+    first = run(kjv_data, output, None)
+    assert run(kjv_data, output, None) == first
+    assert "Incremental: 0 of 3 books changed" in capsys.readouterr().out
@@ -0,0 +1,49 @@
+import threading
+
+import requests
+
+from mock_ollama import MockOllamaConfig, MockOllamaServer
+from ollama_async import AsyncOllamaRefiner
+from transport import OllamaTransport
+
+FAILING = "Genesis 1:5"
+
+def job(start):
+    content = f"BOOK: Genesis\nCHAPTER: 1\nCANDIDATE_START_VERSE: {start}\n"
+    return f"Genesis 1:{start}", {"messages": [{"role": "user", "content": content}]}
+
+class CountingTransport(OllamaTransport):
+    """Records the peak number of requests in flight; FAILING always fails to connect."""
+
+    def __init__(self, url):
+        super().__init__(url, timeout=5, retries=0, backoff=0.0, breaker_failures=100)
+        self.in_flight = 0
+        self.peak = 0
+        self._gauge = threading.Lock()
+
+    def _attempt(self, label, payload, attempt, timeout):
+        with self._gauge:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            if label == FAILING:
+                raise requests.ConnectionError("refused")
+            return super()._attempt(label, payload, attempt, timeout)
+        finally:
+            with self._gauge:
+                self.in_flight -= 1
+
+def test_refine_all_bounds_concurrency_and_keeps_job_order():
+    jobs = [job(start) for start in range(1, 13)]
+    seen = {}
+    with MockOllamaServer(MockOllamaConfig(latency=0.03, jitter=0.025, block_length=2)) as server:
+        transport = CountingTransport(server.url)
+        with AsyncOllamaRefiner(transport, concurrency=3) as refiner:
+            results = refiner.refine_all(jobs, on_result=lambda i, answer: seen.setdefault(i, answer))
+
+    assert 1 < transport.peak <= 3
+    # results and on_result indexes line up with the jobs, whatever order requests finished in
+    assert [r and r["start_verse"] for r in results] == [s if s != 5 else None for s in range(1, 13)]
+    assert seen == dict(enumerate(results))
+    # the failed job fell back alone; every other job was answered
+    assert transport.stats["errors"] == 1 and server.stats["requests"] == 11
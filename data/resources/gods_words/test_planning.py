@@ -0,0 +1,24 @@
+from planning import ChapterPlan, merge_overlapping, reconcile_blocks
+
+def block(start, end, **extra):
+    return {"start_verse": start, "end_verse": end, **extra}
+
+def test_merge_keeps_lower_confidence_and_all_evidence():
+    merged = merge_overlapping([block(1, 4, confidence=0.9, evidence=["a"]),
+                                block(3, 6, confidence=0.7, evidence=["a", "b"]),
+                                block(8, 9)])
+    assert merged == [block(1, 6, confidence=0.7, evidence=["a", "b"]), block(8, 9)]
+
+def test_candidates_inside_refined_blocks_are_skipped():
+    plan = ChapterPlan("Genesis", "1", {}, [block(5, 5), block(2, 2), block(9, 9)],
+                       accepted=[block(1, 1)])
+    c = plan.next_candidate()
+    assert c["start_verse"] == 2
+    assert plan.next_candidate() is None  # one candidate in flight at a time
+    c["end_verse"] = 6  # the model extended it over verse 5
+    plan.record(c)
+    assert plan.next_candidate()["start_verse"] == 9
+    assert [b["start_verse"] for b in plan.done] == [1, 2]
+
+def test_reconcile_orders_and_merges():
+    assert reconcile_blocks([block(7, 8), block(1, 3), block(2, 5)]) == [block(1, 5), block(7, 8)]
@@ -0,0 +1,54 @@
+import pytest
+
+import extract_god_words_v2 as v2
+from mock_ollama import MockOllamaConfig, MockOllamaServer
+from refine_cache import RefineCache, cache_key
+
+VERSES = {"1": "And God said, Let there be light.", "2": "And there was light.", "3": "And God saw it."}
+
+def payload(model=v2.OLLAMA_MODEL):
+    p = v2.build_refine_payload("Genesis", "1", VERSES, 1)
+    p["model"] = model
+    return p
+
+def test_same_payload_and_template_hit(tmp_path):
+    cache = RefineCache(str(tmp_path / "cache.sqlite"))
+    cache.put(cache_key(payload(), v2.PROMPT_TMPL), {"start_verse": 1, "end_verse": 2})
+    assert cache.get(cache_key(payload(), v2.PROMPT_TMPL)) == {"start_verse": 1, "end_verse": 2}
+    assert (cache.hits, cache.misses) == (1, 0)
+
+def test_template_or_model_change_misses(tmp_path):
+    cache = RefineCache(str(tmp_path / "cache.sqlite"))
+    cache.put(cache_key(payload(), v2.PROMPT_TMPL), {"start_verse": 1, "end_verse": 2})
+    assert cache.get(cache_key(payload(), v2.BATCH_PROMPT_TMPL)) is None
+    assert cache.get(cache_key(payload("other:7b"), v2.PROMPT_TMPL)) is None
+    assert cache.misses == 2
+
+def test_answers_survive_reopening(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = RefineCache(path)
+    cache.put(cache_key(payload()), {"start_verse": 1, "end_verse": 3}, "llama")
+    cache.close()
+    reopened = RefineCache(path)
+    assert reopened.get(cache_key(payload())) == {"start_verse": 1, "end_verse": 3}
+
+@pytest.fixture
+def cached_refiner(tmp_path, monkeypatch):
+    monkeypatch.setattr(v2, "USE_CACHE", True)
+    monkeypatch.setattr(v2, "CACHE_PATH", str(tmp_path / "cache.sqlite"))
+    monkeypatch.setattr(v2, "_refine_cache", None)
+    monkeypatch.setattr(v2, "OLLAMA_RETRIES", 0)
+    with MockOllamaServer(MockOllamaConfig(latency=0.0)) as server:
+        monkeypatch.setattr(v2, "OLLAMA_URL", server.url)
+        v2.reset_transport()
+        yield server
+    v2.get_refine_cache().close()
+    v2.reset_transport()
+
+def test_cache_hit_skips_the_transport(cached_refiner):
+    first = v2.request_refinement("Genesis 1:1", payload())
+    second = v2.request_refinement("Genesis 1:1", payload())
+    assert first == second and first["start_verse"] == 1
+    assert cached_refiner.stats["requests"] == 1
+    assert v2.get_transport().stats["requests"] == 1
+    assert v2.get_refine_cache().stats()["hits"] == 1
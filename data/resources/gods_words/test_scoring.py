@@ -0,0 +1,30 @@
+import extract_god_words_v2 as v2
+from scoring import gate_blocks, score_block
+
+def block(kjv_data, chapter, start):
+    blocks = v2.find_regex_blocks("Genesis", chapter, kjv_data["Genesis"][chapter])
+    return next(b for b in blocks if b["start_verse"] == start)
+
+def test_specific_openers_set_the_base_score(kjv_data):
+    saying = block(kjv_data, "2", 1)  # "the LORD spake unto Moses, saying," (o3, o4)
+    bare = block(kjv_data, "2", 4)  # "the LORD said unto Moses, Now ..." (o3, o5)
+    assert saying["openers"] == [3, 4] and bare["openers"] == [3, 5]
+    # both are two verses closed by a terminator (+0.1); only the first says "saying" (+0.1)
+    assert score_block(saying, v2.OPENER_CONFIDENCE) == 0.95  # 0.85 + 0.2, capped
+    assert score_block(bare, v2.OPENER_CONFIDENCE) == 0.85  # 0.75 + 0.1
+    # with entries 4 and 5 weakened, opener 3 (0.6) decides
+    confidence = list(v2.OPENER_CONFIDENCE)
+    confidence[4] = confidence[5] = 0.1
+    assert score_block(saying, confidence) == 0.8
+    assert score_block(bare, confidence) == 0.7
+
+def test_block_without_opener_scores_neutral():
+    b = {"start_verse": 1, "end_verse": 1, "text": "", "openers": [], "terminated": True}
+    assert score_block(b, v2.OPENER_CONFIDENCE) == 0.65
+
+def test_gate_splits_on_threshold(kjv_data):
+    blocks = v2.find_regex_blocks("Genesis", "2", kjv_data["Genesis"]["2"])
+    accepted, ambiguous = gate_blocks(blocks, v2.OPENER_CONFIDENCE, 0.9)
+    assert [b["start_verse"] for b in accepted] == [1]
+    assert [b["start_verse"] for b in ambiguous] == [4]
+    assert accepted[0]["confidence"] == 0.95
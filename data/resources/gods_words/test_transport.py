@@ -0,0 +1,77 @@
+import time
+
+import pytest
+
+from mock_ollama import MockOllamaConfig, MockOllamaServer
+from transport import CircuitBreaker, OllamaTransport
+
+PAYLOAD = {"messages": [{"role": "user", "content": "BOOK: Genesis\nCHAPTER: 1\nCANDIDATE_START_VERSE: 2\n"}]}
+
+@pytest.fixture
+def server():
+    with MockOllamaServer(MockOllamaConfig(latency=0.0)) as s:
+        yield s
+
+def transport(server, **kwargs):
+    kwargs.setdefault("backoff", 0.0)
+    return OllamaTransport(server.url, timeout=5, **kwargs)
+
+def test_answer_is_parsed(server):
+    t = transport(server)
+    assert t.chat("Genesis 1:2", PAYLOAD) == {"start_verse": 2, "end_verse": 4, "via": "direct",
+                                             "evidence_phrases": [], "confidence": 0.9}
+    assert (t.stats["attempts"], t.stats["fallbacks"]) == (1, 0)
+
+def test_bad_json_is_retried_then_falls_back(server):
+    server.config.bad_json_rate = 1.0
+    t = transport(server, retries=2)
+    assert t.chat("Genesis 1:2", PAYLOAD) is None
+    assert server.stats["requests"] == 3
+    assert {k: t.stats[k] for k in ("attempts", "retries", "bad_json", "fallbacks")} == \
+        {"attempts": 3, "retries": 2, "bad_json": 3, "fallbacks": 1}
+
+def test_http_4xx_is_not_retried(server):
+    t = OllamaTransport(server.url.replace("/api/chat", "/missing"), timeout=5, retries=3, backoff=0.0)
+    assert t.chat("Genesis 1:2", PAYLOAD) is None
+    assert (t.stats["attempts"], t.stats["errors"], server.stats["requests"]) == (1, 1, 0)
+
+def test_open_circuit_skips_requests(server):
+    server.config.error_rate = 1.0
+    t = transport(server, retries=0, breaker_failures=2, breaker_cooldown=None)
+    for _ in range(4):
+        assert t.chat("Genesis 1:2", PAYLOAD) is None
+    assert t.breaker.is_open
+    assert server.stats["requests"] == 2
+    assert (t.stats["errors"], t.stats["circuit_skips"], t.stats["fallbacks"]) == (2, 2, 4)
+
+def test_half_open_probe_closes_the_circuit(server):
+    server.config.error_rate = 1.0
+    t = transport(server, retries=0, breaker_failures=1, breaker_cooldown=0.0)
+    assert t.chat("Genesis 1:2", PAYLOAD) is None
+    assert t.breaker.is_open
+    server.config.error_rate = 0.0
+    assert t.chat("Genesis 1:2", PAYLOAD) is not None
+    assert not t.breaker.is_open and t.breaker.consecutive == 0
+
+def test_failed_probe_reopens_without_a_second_probe():
+    b = CircuitBreaker(failures=1, cooldown=0.0)
+    assert b.record_failure() and b.is_open
+    assert b.allow()  # the probe
+    assert not b.allow()  # only one probe at a time
+    assert not b.record_failure() and b.is_open and not b.probing
+
+def test_spent_budget_skips_without_a_request(server):
+    t = transport(server, budget=0.0)
+    assert t.chat("Genesis 1:2", PAYLOAD) is None
+    assert (t.stats["budget_skips"], server.stats["requests"]) == (1, 0)
+
+def test_budget_is_charged_request_time_only(server):
+    server.config.latency = 0.05
+    t = transport(server, budget=0.08)
+    time.sleep(0.1)  # time outside requests (regex pass, cache lookups) is free
+    assert t.chat("Genesis 1:2", PAYLOAD) is not None
+    assert 0.05 <= t.spent < 0.08
+    assert t.chat("Genesis 1:2", PAYLOAD) is None  # times out on what is left, then its retry is skipped
+    assert t.chat("Genesis 1:2", PAYLOAD) is None
+    assert t.remaining() <= 0
+    assert (t.stats["timeouts"], t.stats["budget_skips"], server.stats["requests"]) == (1, 2, 2)
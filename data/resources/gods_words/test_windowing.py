@@ -0,0 +1,23 @@
+import extract_god_words_v2 as v2
+from windowing import RefineWindow
+
+def chapter(terminator):
+    verses = {str(v): "I will fill this house with glory, saith the LORD." for v in range(1, 31)}
+    verses["1"] = "Thus saith the LORD of hosts; Consider your ways."
+    verses["5"] = terminator
+    return verses
+
+def test_window_stops_after_first_terminator():
+    window = RefineWindow(chapter("And it came to pass in the morning."), 1, v2.TERMINATORS, lookahead=1)
+    assert window.keys == [1, 2, 3, 4, 5, 6]
+
+def test_terminator_with_surrounding_whitespace_still_ends_window():
+    # terminators are anchored at the verse start, so leading whitespace used to hide them
+    window = RefineWindow(chapter("  And it came to pass in the morning.\n"), 1, v2.TERMINATORS, lookahead=1)
+    assert window.keys == [1, 2, 3, 4, 5, 6]
+
+def test_answer_on_window_edge_extends_window():
+    window = RefineWindow(chapter("And it came to pass in the morning."), 1, v2.TERMINATORS, lookahead=1)
+    assert window.at_edge({"end_verse": 6}) and not window.at_edge({"end_verse": 4})
+    wider = window.extended()
+    assert wider.extensions == 1 and wider.keys[-1] > window.keys[-1]
@@ -0,0 +1,212 @@
+import json
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.tracing import span
+
+# ---------------------------------------------
+# Ollama transport: deadlines, retries, circuit breaker, run budget
+# ---------------------------------------------
+class _NoRetry(Exception):
+    pass
+
+class CircuitBreaker:
+    """
+    Opens after `failures` consecutive failed attempts. While open every
+    call is refused; after `cooldown` seconds one probe request is let
+    through (half-open) and its outcome closes or re-opens the circuit.
+    cooldown=None keeps it open for the rest of the run.
+    """
+
+    def __init__(self, failures=5, cooldown=120.0):
+        self.failures = failures
+        self.cooldown = cooldown
+        self.consecutive = 0
+        self.opened_at = None
+        self.probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self.cooldown is None or self.probing:
+                return False
+            if time.monotonic() - self.opened_at >= self.cooldown:
+                self.probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.consecutive = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        """Returns True when this failure opened the circuit."""
+        with self._lock:
+            self.consecutive += 1
+            if self.probing:
+                self.probing = False
+                self.opened_at = time.monotonic()
+                return False
+            if self.opened_at is None and self.consecutive >= self.failures:
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+class OllamaTransport:
+    """
+    POSTs /api/chat payloads and returns the parsed JSON answer, or None
+    when the block should keep its regex range.
+
+    - timeout: per-attempt deadline in seconds (connect is capped at
+      connect_timeout), further capped by what is left of the run budget.
+    - retries: extra attempts after a timeout, connection error, HTTP 5xx
+      or an answer that is not JSON, with exponential backoff and full
+      jitter (uniform in [0, min(backoff_max, backoff * 2**attempt)]).
+    - budget: seconds of request time for the whole run, summed over every
+      attempt (concurrent requests each count their own time); time spent
+      outside requests, such as the regex pass, cache lookups or backoff
+      sleeps, is not charged. Once spent, remaining blocks fall back without
+      a request. None = no limit.
+    - breaker: after breaker_failures consecutive failed attempts the
+      circuit opens and blocks fall back to regex-only.
+
+    Sessions are kept per thread, so the transport can be shared by the
+    sequential path and the concurrent refiner's worker threads.
+    """
+
+    def __init__(self, url, timeout=60, connect_timeout=5, retries=2,
+                 backoff=1.0, backoff_max=20.0, budget=None,
+                 breaker_failures=5, breaker_cooldown=120.0):
+        self.url = url
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.budget = budget
+        self.breaker = CircuitBreaker(breaker_failures, breaker_cooldown)
+        self.stats = {"requests": 0, "attempts": 0, "retries": 0, "timeouts": 0,
+                      "errors": 0, "bad_json": 0, "fallbacks": 0,
+                      "circuit_skips": 0, "budget_skips": 0}
+        self.spent = 0.0
+        self._budget_warned = False
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self.stats[key] += n
+
+    def _session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            self._local.session = session
+        return session
+
+    def remaining(self):
+        if self.budget is None:
+            return None
+        with self._lock:
+            return self.budget - self.spent
+
+    def backoff_delay(self, attempt):
+        return random.uniform(0, min(self.backoff_max, self.backoff * 2 ** attempt))
+
+    def _skip(self, label, key):
+        self._count(key)
+        self._count("fallbacks")
+        if key == "budget_skips" and not self._budget_warned:
+            self._budget_warned = True
+            print(f"[WARN] Ollama run budget of {self.budget}s spent at {label}; "
+                  f"remaining blocks keep their regex ranges")
+        return None
+
+    def _attempt(self, label, payload, attempt, timeout):
+        began = time.monotonic()
+        try:
+            with span("request", "ollama", ref=label, attempt=attempt):
+                r = self._session().post(self.url, json=payload,
+                                         timeout=(min(self.connect_timeout, timeout), timeout))
+        finally:
+            with self._lock:
+                self.spent += time.monotonic() - began
+        if r.status_code >= 500:
+            r.raise_for_status()
+        if r.status_code >= 400:
+            # The request itself is wrong; asking again will not help
+            raise _NoRetry(f"HTTP {r.status_code}")
+        return json.loads(r.json()["message"]["content"])
+
+    def chat(self, label, payload):
+        self._count("requests")
+        last_error = None
+        for attempt in range(self.retries + 1):
+            if not self.breaker.allow():
+                return self._skip(label, "circuit_skips")
+            remaining = self.remaining()
+            if remaining is not None and remaining <= 0:
+                return self._skip(label, "budget_skips")
+            timeout = self.timeout if remaining is None else min(self.timeout, remaining)
+
+            self._count("attempts")
+            retryable = True
+            try:
+                answer = self._attempt(label, payload, attempt, timeout)
+            except _NoRetry as e:
+                self._count("errors")
+                last_error = e
+                retryable = False
+            except requests.Timeout as e:
+                self._count("timeouts")
+                last_error = e
+            except (ValueError, KeyError, TypeError) as e:
+                self._count("bad_json")
+                last_error = e
+            except requests.RequestException as e:
+                self._count("errors")
+                last_error = e
+            else:
+                self.breaker.record_success()
+                return answer
+
+            if self.breaker.record_failure():
+                print(f"[WARN] Ollama circuit open after {self.breaker.failures} consecutive failures; "
+                      f"falling back to regex-only")
+            if not retryable:
+                break
+            if attempt < self.retries:
+                delay = self.backoff_delay(attempt)
+                remaining = self.remaining()
+                if remaining is not None:
+                    delay = min(delay, max(0.0, remaining))
+                self._count("retries")
+                time.sleep(delay)
+
+        print(f"[WARN] Ollama failed at {label} -> {last_error}")
+        self._count("fallbacks")
+        return None
+
+    def summary(self):
+        s = self.stats
+        line = (f"Ollama transport: {s['requests']} blocks, {s['attempts']} attempts, {s['retries']} retries, "
+                f"{s['timeouts']} timeouts, {s['errors']} errors, {s['bad_json']} bad JSON, "
+                f"{s['fallbacks']} fell back to regex")
+        if s["circuit_skips"] or s["budget_skips"]:
+            line += f" ({s['circuit_skips']} with the circuit open, {s['budget_skips']} over budget)"
+        return line
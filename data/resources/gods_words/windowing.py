@@ -0,0 +1,99 @@
+# ---------------------------------------------
+# Adaptive verse windows for per-block prompts
+# ---------------------------------------------
+WINDOW_STATS = {"windows": 0, "verses": 0, "fixed_verses": 0, "extended": 0}
+
+def estimate_tokens(text):
+    return len(text) // 4 + 1
+
+class RefineWindow:
+    """
+    Verses shown to the model for one candidate start: `before` verses of
+    context, then verses up to the first terminator after the start (where
+    narration usually resumes) and `lookahead` verses beyond it, cut off once the
+    window would exceed `token_budget` or `max_after` verses after the
+    start. At least one verse after the start is kept when the chapter has
+    one.
+
+    When the model ends the block on the last verse of a window that stops
+    short of the chapter end, extended() gives the next window: same start,
+    continuing to the next terminator past the old edge, with twice the
+    token budget.
+    """
+
+    def __init__(self, verses, start, terminators, before=2, lookahead=1,
+                 token_budget=800, max_after=26, extensions=0, edge=None):
+        self.verses = verses
+        self.start = int(start)
+        self.terminators = terminators
+        self.before = before
+        self.lookahead = lookahead
+        self.token_budget = token_budget
+        self.max_after = max_after
+        self.extensions = extensions
+        self.chapter_keys = sorted(map(int, verses.keys()))
+        i = self.chapter_keys.index(self.start)
+        head = self.chapter_keys[max(0, i - before): i + 1]
+        tail = self._tail(i, edge)
+        self.keys = head + tail
+
+        WINDOW_STATS["windows"] += 1
+        WINDOW_STATS["verses"] += len(self.keys)
+        if extensions == 0:
+            WINDOW_STATS["fixed_verses"] += len(self.chapter_keys[max(0, i - 2): i + 26])
+        else:
+            WINDOW_STATS["extended"] += 1
+
+    def is_terminator(self, v):
+        text = self.verses[str(v)].strip()  # as is_any() in the extractor
+        return any(p.search(text) for p in self.terminators)
+
+    def _tail(self, i, edge):
+        """Verses after the start; with edge, keep going past that verse to the next terminator."""
+        after = self.chapter_keys[i + 1: i + 1 + self.max_after]
+        tokens = sum(estimate_tokens(self.verses[str(v)]) for v in self.chapter_keys[max(0, i - self.before): i + 1])
+        tail = []
+        stop = None
+        for v in after:
+            if stop is not None and v > stop:
+                break
+            cost = estimate_tokens(self.verses[str(v)])
+            if tail and tokens + cost > self.token_budget:
+                break
+            tail.append(v)
+            tokens += cost
+            if stop is None and (edge is None or v > edge) and self.is_terminator(v):
+                stop = self._lookahead_end(v)
+        return tail
+
+    def _lookahead_end(self, terminator):
+        j = self.chapter_keys.index(terminator)
+        return self.chapter_keys[min(len(self.chapter_keys) - 1, j + self.lookahead)]
+
+    @property
+    def last(self):
+        return self.keys[-1]
+
+    def at_edge(self, answer):
+        """True when the answer runs to the window's last verse and the chapter goes on."""
+        if not isinstance(answer, dict) or self.last >= self.chapter_keys[-1]:
+            return False
+        try:
+            return int(answer["end_verse"]) >= self.last
+        except (KeyError, TypeError, ValueError):
+            return False
+
+    def extended(self):
+        return RefineWindow(
+            self.verses, self.start, self.terminators, self.before, self.lookahead,
+            self.token_budget * 2, self.max_after * 2, self.extensions + 1, edge=self.last,
+        )
+
+def window_summary():
+    s = WINDOW_STATS
+    if not s["windows"]:
+        return "Windows: none built"
+    first = s["windows"] - s["extended"]
+    return (f"Windows: {s['windows']} prompts, {s['verses'] / s['windows']:.1f} verses on average "
+            f"(fixed 2+26 window: {s['fixed_verses'] / max(1, first):.1f}), "
+            f"{s['extended']} extended after an answer ran to the edge")
@@ -1,65 +1,155 @@
+import hashlib
 import json
+import os
 import re
+import sys
 from pathlib import Path
 from difflib import SequenceMatcher
 
-def load_kjv_json(kjv_path="KJV.json"):
-    """Load the KJV JSON file to get proper verse references"""
-    with open(kjv_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-def normalize_text(text):
-    """Normalize text for comparison - remove punctuation, lowercase, remove extra spaces"""
-    text = text.lower()
-    text = re.sub(r'[^\w\s]', '', text)
-    text = re.sub(r'\s+', ' ', text)
-    return text.strip()
+from common.corpus import Corpus, load_kjv_json, normalize_text
+from common.incremental import content_hash
+from common.speakers import SpeakerStrategy, run_strategy
 
-def find_verse_reference(quote_text, kjv_data, context=""):
+# Focus on NT books where Jesus speaks
+NT_BOOKS = ['Matthew', 'Mark', 'Luke', 'John', 'Acts', 'Revelation']
+
+# Reference matching
+MIN_RATIO = 0.7  # a quote's best match is accepted above this
+PREFIX_CHARS = 50  # quotes longer than this are also looked up by their first PREFIX_CHARS
+PREFIX_RATIO = 0.9  # ratio given to a multi-verse match found by its prefix
+MAX_QUOTE_VERSES = 50  # how far find_quote_end() looks for the end of a quote
+
+# Per-book reference lookups kept between runs (None = always search)
+LOOKUP_CACHE = "jesus_words.lookup.json"
+# Memo entries are only valid for the matching constants they were computed with
+LOOKUP_RULES = {"min_ratio": MIN_RATIO, "prefix_chars": PREFIX_CHARS,
+                "prefix_ratio": PREFIX_RATIO, "max_quote_verses": MAX_QUOTE_VERSES}
+
+def verse_index(corpus):
+    """[(book, [(chapter, verse, normalized text)])] for NT_BOOKS, each verse normalized once."""
+    index = []
+    for book in NT_BOOKS:
+        first, last = corpus.book_span(book)
+        if first == last:
+            continue
+        entries = []
+        for idx in range(first, last):
+            _, chapter_num, verse_num = corpus.refs[idx]
+            entries.append((chapter_num, str(verse_num), corpus.normalized(idx)))
+        index.append((book, entries))
+    return index
+
+class ReferenceMemo:
+    """
+    Best match of each quote within each book, saved between runs. A
+    book's entries are dropped when its verses or LOOKUP_RULES change, so
+    a corrected book is searched again while every other book's matches
+    are reused.
+    """
+
+    def __init__(self, path, kjv_data):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.hashes = {b: content_hash({"verses": kjv_data[b], "rules": LOOKUP_RULES})
+                       for b in NT_BOOKS if b in kjv_data}
+        books = {}
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                books = json.load(f).get("books", {})
+        self.books = {b: e for b, e in books.items() if e.get("hash") == self.hashes.get(b)}
+        self.stale = sorted(set(books) - set(self.books))
+
+    def best(self, book, normalized_quote, compute):
+        """(ratio, match) for the quote in one book, from the memo or compute()."""
+        entry = self.books.setdefault(book, {"hash": self.hashes[book], "quotes": {}})
+        key = hashlib.sha1(normalized_quote.encode("utf-8")).hexdigest()
+        if key in entry["quotes"]:
+            self.hits += 1
+            ratio, match = entry["quotes"][key]
+            return ratio, tuple(match) if match else None
+        self.misses += 1
+        ratio, match = compute()
+        entry["quotes"][key] = [ratio, list(match) if match else None]
+        return ratio, match
+
+    def save(self):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({"books": self.books}, f, ensure_ascii=False)
+
+    def summary(self):
+        line = f"Reference lookups: {self.hits} reused, {self.misses} searched"
+        if self.stale:
+            line += f" (changed books: {', '.join(self.stale)})"
+        return line
+
+def containment_ratio(quote, verse):
+    """
+    SequenceMatcher(None, quote, verse).ratio() for a pair where one string
+    contains the other: the only matching block is the shorter string, so
+    the ratio is 2*len(shorter)/(len(quote)+len(verse)). Verses of 200+
+    characters trigger difflib's autojunk heuristic and still go through
+    SequenceMatcher.
+    """
+    if len(verse) >= 200 or not (quote or verse):
+        return SequenceMatcher(None, quote, verse).ratio()
+    return 2.0 * min(len(quote), len(verse)) / (len(quote) + len(verse))
+
+def find_verse_reference(quote_text, kjv_data, context="", index=None, memo=None):
     """
     Find the Bible reference for a given quote by searching through KJV JSON
     Returns (book, chapter, start_verse, end_verse) or None
+
+    index: verse_index() to search; built from kjv_data when not given
+    memo: optional ReferenceMemo with per-book results of earlier runs.
+    The earliest best match wins, per book and then across books, which is
+    the same as one search over all books in order.
     """
     normalized_quote = normalize_text(quote_text)
-    
-    # Focus on NT books where Jesus speaks
-    nt_books = ['Matthew', 'Mark', 'Luke', 'John', 'Acts', 'Revelation']
-    
+    if index is None:
+        index = verse_index(Corpus(kjv_data, NT_BOOKS))
+
+    best_match = None
+    best_ratio = 0.0
+    for book, entries in index:
+        def compute():
+            return best_in_book(normalized_quote, kjv_data, book, entries)
+        ratio, match = memo.best(book, normalized_quote, compute) if memo else compute()
+        if ratio > best_ratio:
+            best_ratio = ratio
+            best_match = match
+
+    return best_match if best_ratio > MIN_RATIO else None
+
+def best_in_book(normalized_quote, kjv_data, book, entries):
+    """(best ratio, match) of a quote within one book's verse_index() entries"""
     best_match = None
     best_ratio = 0.0
     
-    for book in nt_books:
-        if book not in kjv_data:
-            continue
-            
-        for chapter_num, verses in kjv_data[book].items():
-            if not isinstance(verses, dict):
-                continue
-                
-            for verse_num, verse_text in verses.items():
-                normalized_verse = normalize_text(verse_text)
-                
-                # Check if quote is contained in this verse
-                if normalized_quote in normalized_verse or normalized_verse in normalized_quote:
-                    ratio = SequenceMatcher(None, normalized_quote, normalized_verse).ratio()
+    for chapter_num, verse_num, normalized_verse in entries:
+        # Check if quote is contained in this verse
+        if normalized_quote in normalized_verse or normalized_verse in normalized_quote:
+            ratio = containment_ratio(normalized_quote, normalized_verse)
+            if ratio > best_ratio:
+                best_ratio = ratio
+                best_match = (book, chapter_num, verse_num, verse_num)
+        
+        # Check if quote starts in this verse (for multi-verse quotes)
+        if len(normalized_quote) > PREFIX_CHARS:  # Only for longer quotes
+            quote_start = normalized_quote[:PREFIX_CHARS]
+            if quote_start in normalized_verse:
+                # This might be the start - try to find the end
+                start_ref = (book, chapter_num, verse_num)
+                end_verse = find_quote_end(normalized_quote, kjv_data, book, chapter_num, verse_num)
+                if end_verse:
+                    ratio = PREFIX_RATIO  # High confidence for multi-verse matches
                     if ratio > best_ratio:
                         best_ratio = ratio
-                        best_match = (book, chapter_num, verse_num, verse_num)
-                
-                # Check if quote starts in this verse (for multi-verse quotes)
-                if len(normalized_quote) > 50:  # Only for longer quotes
-                    quote_start = normalized_quote[:50]
-                    if quote_start in normalized_verse:
-                        # This might be the start - try to find the end
-                        start_ref = (book, chapter_num, verse_num)
-                        end_verse = find_quote_end(normalized_quote, kjv_data, book, chapter_num, verse_num)
-                        if end_verse:
-                            ratio = 0.9  # High confidence for multi-verse matches
-                            if ratio > best_ratio:
-                                best_ratio = ratio
-                                best_match = (book, chapter_num, verse_num, end_verse)
+                        best_match = (book, chapter_num, verse_num, end_verse)
     
-    return best_match if best_ratio > 0.7 else None
+    return best_ratio, best_match
 
 def find_quote_end(normalized_quote, kjv_data, book, chapter, start_verse):
     """Find the ending verse of a multi-verse quote"""
@@ -76,21 +166,26 @@ def find_quote_end(normalized_quote, kjv_data, book, chapter, start_verse):
                 return str(verse_num)
             
             verse_num += 1
-            if verse_num > int(start_verse) + 50:  # Safety limit
+            if verse_num > int(start_verse) + MAX_QUOTE_VERSES:  # Safety limit
                 break
         
         return start_verse  # Fallback
     except:
         return start_verse
 
-def extract_jesus_words(file_path, kjv_data):
+def extract_jesus_words(file_path, kjv_data, index=None, memo=None):
     """
     Extract all citations marked with <FR>/<Fr> tags (Jesus' words in red)
     from the KJV ONT file and create a JSON output.
     
     The FR tags wrap individual words, so we extract consecutive
     FR-tagged segments and combine them into complete quotes.
+
+    index: verse_index() shared by every quote lookup; built once here
+    when not given. memo: optional ReferenceMemo (see find_verse_reference)
     """
+    if index is None:
+        index = verse_index(Corpus(kjv_data, NT_BOOKS))
     
     # Read the file - try multiple encodings
     encodings = ['latin-1', 'iso-8859-1', 'cp1252', 'utf-8']
@@ -161,7 +256,7 @@ def extract_jesus_words(file_path, kjv_data):
                     context_snippet = sentences[-1].strip() if sentences else ""
                     
                     # Find the Bible reference
-                    reference = find_verse_reference(clean_text, kjv_data, context_snippet)
+                    reference = find_verse_reference(clean_text, kjv_data, context_snippet, index, memo)
                     
                     if reference:
                         book, chapter, start_verse, end_verse = reference
@@ -206,7 +301,7 @@ def extract_jesus_words(file_path, kjv_data):
             context_snippet = sentences[-1].strip() if sentences else ""
             
             # Find the Bible reference
-            reference = find_verse_reference(clean_text, kjv_data, context_snippet)
+            reference = find_verse_reference(clean_text, kjv_data, context_snippet, index, memo)
             
             if reference:
                 book, chapter, start_verse, end_verse = reference
@@ -232,6 +327,76 @@ def extract_jesus_words(file_path, kjv_data):
     
     return jesus_words
 
+class OntMarkupStrategy(SpeakerStrategy):
+    """Red-letter quotes from the ONT file, located in the shared corpus."""
+
+    name = "ont_markup"
+    books = NT_BOOKS
+
+    def __init__(self, ont_path="kjv.ont", lookup_cache=None):
+        self.ont_path = ont_path
+        self.lookup_cache = lookup_cache
+        self.memo = None
+
+    def prepare(self, corpus):
+        self.kjv_data = corpus.kjv_data
+        self.index = verse_index(corpus)
+        if self.lookup_cache:
+            self.memo = ReferenceMemo(self.lookup_cache, corpus.kjv_data)
+
+    def finish(self):
+        words = extract_jesus_words(self.ont_path, self.kjv_data, self.index, self.memo)
+        if self.memo:
+            self.memo.save()
+            print(self.memo.summary())
+        return words
+
+def citation_key(c):
+    """A citation's identity across runs: its reference, and the quote for several quotes of one verse."""
+    return c["reference"], c["text"]
+
+def splice_previous(fresh, output_file):
+    """
+    Keep the ids of the previous output_file. Books whose citations come
+    out the same keep their old entries as they were; the entries of
+    changed books (and of quotes with no reference) are replaced by the
+    fresh ones, each taking the id of the old entry with the same
+    citation_key(), or a new id above the previous maximum. Citations stay
+    in ONT order. Returns (citations, changed books or None without a
+    previous output).
+    """
+    if not os.path.exists(output_file):
+        return fresh, None
+    with open(output_file, 'r', encoding='utf-8') as f:
+        old = json.load(f)["citations"]
+
+    def by_book(citations):
+        books = {}
+        for c in citations:
+            books.setdefault(c["book"], []).append({k: v for k, v in c.items() if k != "id"})
+        return books
+
+    old_books, fresh_books = by_book(old), by_book(fresh)
+    changed = {b for b in set(old_books) | set(fresh_books) if old_books.get(b) != fresh_books.get(b)}
+    previous = {}
+    for c in old:
+        previous.setdefault(citation_key(c), []).append(c)
+    next_id = max((c["id"] for c in old), default=0) + 1
+
+    spliced = []
+    for c in fresh:
+        matches = previous.get(citation_key(c))
+        if c["book"] not in changed:
+            spliced.append(matches.pop(0))
+            continue
+        if matches:
+            cid = matches.pop(0)["id"]
+        else:
+            cid, next_id = next_id, next_id + 1
+        spliced.append({"id": cid, **{k: v for k, v in c.items() if k != "id"}})
+    order = {b: i for i, b in enumerate(NT_BOOKS)}
+    return spliced, sorted(changed, key=lambda b: order.get(b, len(order)))
+
 def save_to_json(data, output_file):
     """Save the extracted data to a JSON file"""
     with open(output_file, 'w', encoding='utf-8') as f:
@@ -255,7 +420,11 @@ def main():
     print(f"Loaded {len(kjv_data)} books from KJV")
     
     print(f"\nReading file: {input_file}")
-    jesus_words = extract_jesus_words(input_file, kjv_data)
+    jesus_words = run_strategy(kjv_data, OntMarkupStrategy(input_file, LOOKUP_CACHE))
+    jesus_words, changed = splice_previous(jesus_words, output_file)
+    if changed is not None:
+        names = ", ".join(b or "no reference" for b in changed)
+        print(f"Ids kept from {output_file}; {len(changed)} books changed" + (f" ({names})" if changed else ""))
     
     print(f"Found {len(jesus_words)} complete quotes/citations of Jesus' words")
     
@@ -0,0 +1,61 @@
+import json
+
+import extract_jesus_words as ejw
+from extract_jesus_words import save_to_json, splice_previous
+
+def quote(cid, reference, text):
+    book = reference.rsplit(" ", 1)[0] if reference != "Reference not found" else None
+    return {"id": cid, "reference": reference, "book": book, "text": text}
+
+def previous(tmp_path, citations):
+    path = tmp_path / "jesus_words.json"
+    save_to_json(citations, str(path))
+    return str(path)
+
+def test_first_run_keeps_fresh_ids(tmp_path):
+    fresh = [quote(1, "Matthew 5:3", "Blessed are the poor")]
+    assert splice_previous(fresh, str(tmp_path / "missing.json")) == (fresh, None)
+
+def test_changed_book_keeps_ids_of_matching_references(tmp_path):
+    old = [
+        quote(1, "Matthew 5:3", "Blessed are the poor"),
+        quote(2, "Mark 1:15", "Repent ye"),
+        quote(3, "Mark 2:5", "Son, thy sins be forgiven thee"),
+        quote(4, "John 3:3", "Ye must be born again"),
+    ]
+    path = previous(tmp_path, old)
+    # Mark was corrected: one quote moved to another verse and one was added before it
+    fresh = [
+        quote(1, "Matthew 5:3", "Blessed are the poor"),
+        quote(2, "Mark 1:11", "Follow me"),
+        quote(3, "Mark 1:15", "Repent ye"),
+        quote(4, "Mark 2:6", "Son, thy sins be forgiven thee"),
+        quote(5, "John 3:3", "Ye must be born again"),
+    ]
+    spliced, changed = splice_previous(fresh, path)
+    assert changed == ["Mark"]
+    assert [(c["id"], c["reference"]) for c in spliced] == [
+        (1, "Matthew 5:3"), (5, "Mark 1:11"), (2, "Mark 1:15"), (6, "Mark 2:6"), (4, "John 3:3"),
+    ]
+    assert spliced[0] is not fresh[0] and spliced[0] == old[0]
+
+def test_repeated_references_keep_their_order(tmp_path):
+    old = [quote(1, "Reference not found", "Verily"), quote(2, "Reference not found", "Verily")]
+    path = previous(tmp_path, old)
+    fresh = [quote(1, "Luke 4:4", "It is written"), *[quote(i, "Reference not found", "Verily") for i in (2, 3, 4)]]
+    spliced, changed = splice_previous(fresh, path)
+    assert changed == ["Luke", None]
+    assert [c["id"] for c in spliced] == [3, 1, 2, 4]
+    with open(path, 'r', encoding='utf-8') as f:
+        assert json.load(f)["total_citations"] == 2
+
+def test_reference_memo_dropped_when_matching_constant_changes(tmp_path, monkeypatch):
+    kjv = {"Mark": {"1": {"15": "Repent ye, and believe the gospel."}}}
+    path = str(tmp_path / "lookup.json")
+    memo = ejw.ReferenceMemo(path, kjv)
+    memo.best("Mark", "repent ye", lambda: (1.0, ("1", "15", "15")))
+    memo.save()
+    assert ejw.ReferenceMemo(path, kjv).books
+    monkeypatch.setitem(ejw.LOOKUP_RULES, "min_ratio", 0.8)
+    reloaded = ejw.ReferenceMemo(path, kjv)
+    assert reloaded.books == {} and reloaded.stale == ["Mark"]
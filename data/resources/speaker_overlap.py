@@ -0,0 +1,48 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from common.intervals import citation_verses, reference_map
+
+# ---------------------------------------------
+# Set algebra between two speaker datasets
+# ---------------------------------------------
+def load_verses(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return citation_verses(data['citations'] if isinstance(data, dict) else data)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Verses shared by, or only in, two citation files (e.g. God's and Jesus' words)")
+    parser.add_argument("first", nargs="?", default="gods_words/god_words.json")
+    parser.add_argument("second", nargs="?", default="jesus_words/jesus_words.json")
+    parser.add_argument("--out", help="write the shared verses as a references JSON")
+    args = parser.parse_args()
+
+    a = load_verses(args.first)
+    b = load_verses(args.second)
+    both = a & b
+    print(f"{args.first}: {len(a)} verses")
+    print(f"{args.second}: {len(b)} verses")
+    print(f"  in both:         {len(both)}")
+    print(f"  only in first:   {len(a - b)}")
+    print(f"  only in second:  {len(b - a)}")
+    print(f"  in either:       {len(a | b)}")
+
+    if args.out:
+        refs = reference_map(both)
+        output = {
+            "description": f"Verses cited in both {args.first} and {args.second}",
+            "total_books": len(refs),
+            "references": refs,
+        }
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(output, f, indent=2, ensure_ascii=False)
+        print(f"Saved {args.out}")
+
+if __name__ == "__main__":
+    main()